@@ -51,6 +51,15 @@ def cmd_run(args):
     if args.dry_run:
         main_args.append("--dry-run")
     
+    if args.no_cache:
+        main_args.append("--no-cache")
+    
+    for target in args.ci_target or []:
+        main_args.extend(["--ci-target", target])
+    
+    if args.wave_size:
+        main_args.extend(["--wave-size", str(args.wave_size)])
+    
     return run_main_with_args(main_args)
 
 
@@ -113,6 +122,15 @@ def cmd_full(args):
     if args.dry_run:
         main_args.append("--dry-run")
     
+    if args.no_cache:
+        main_args.append("--no-cache")
+    
+    for target in args.ci_target or []:
+        main_args.extend(["--ci-target", target])
+    
+    if args.wave_size:
+        main_args.extend(["--wave-size", str(args.wave_size)])
+    
     return run_main_with_args(main_args)
 
 
@@ -223,6 +241,7 @@ def cmd_sweep(args):
         src_path = get_src_path()
         sys.path.insert(0, src_path)
         from experiments.sweep import run_parameter_sweep
+        from experiments.adaptive_sweep import run_adaptive_sweep
         from experiments.aggregate_sweep import aggregate_parameter_sweep
         
         # Determine config file
@@ -242,15 +261,27 @@ def cmd_sweep(args):
         print(f"  Grid: {args.grid}")
         print(f"  Config: {config_file}")
         print(f"  Jobs: {args.njobs}")
+        print(f"  Executor: {args.executor}")
+        if args.resume:
+            print(f"  Resume: {args.resume}")
+        if args.adaptive:
+            print(f"  Adaptive: refine on {args.metric}, budget {args.budget} points")
         
         # 1. Run parameter sweep
-        sweep_result = run_parameter_sweep(
+        sweep_options = dict(
             grid_path=args.grid,
             base_config_path=config_file,
             output_dir="runs",
             n_jobs=args.njobs,
-            timeout=args.timeout if hasattr(args, 'timeout') else 300
+            timeout=args.timeout if hasattr(args, 'timeout') else 300,
+            executor=args.executor,
+            resume=args.resume
         )
+        if args.adaptive:
+            sweep_result = run_adaptive_sweep(metric=args.metric, budget=args.budget,
+                                              batch_size=args.batch_size, **sweep_options)
+        else:
+            sweep_result = run_parameter_sweep(**sweep_options)
         
         if sweep_result['failed_runs'] > 0:
             print(f"⚠ {sweep_result['failed_runs']} runs failed")
@@ -279,6 +310,69 @@ def cmd_sweep(args):
         return 1
 
 
+def cmd_convert_logs(args):
+    """Handle 'calvano convert-logs' subcommand."""
+    try:
+        src_path = get_src_path()
+        sys.path.insert(0, src_path)
+        from run_logs import convert_json_logs
+        
+        path = convert_json_logs(args.logdir, output=args.output, remove=args.remove_json)
+        print(f"✅ Converted JSON run logs to: {path}")
+        return 0
+    except Exception as e:
+        print(f"❌ Log conversion failed: {e}")
+        return 1
+
+
+def cmd_validate_precision(args):
+    """Handle 'calvano validate-precision' subcommand."""
+    try:
+        import json
+        import numpy as np
+        
+        # The learning engines use package-relative imports
+        sys.path.insert(0, str(Path(get_src_path()).parent))
+        from src.params import SimParams
+        from src.precision_check import validate_precision
+        
+        with open(args.config) as f:
+            config = json.load(f)
+        params = SimParams(config)
+        alpha = args.alpha if args.alpha is not None else params.alpha
+        delta = args.delta if args.delta is not None else params.delta
+        epsilon = args.epsilon if args.epsilon is not None else params.epsilon
+        sessions = range(args.sessions) if args.sessions else None
+        
+        report = validate_precision(
+            params, alpha, np.full(params.n_agents, epsilon), delta,
+            precision=args.precision, sessions=sessions
+        )
+        print(report.summary())
+        return 0
+    except Exception as e:
+        print(f"❌ Precision validation failed: {e}")
+        return 1
+
+
+def cmd_cache(args):
+    """Handle 'calvano cache' subcommand."""
+    try:
+        src_path = get_src_path()
+        sys.path.insert(0, src_path)
+        from result_cache import ResultCache
+        
+        cache = ResultCache(args.cache_dir)
+        if args.action == "prune":
+            n_removed, freed = cache.prune(args.max_bytes)
+            print(f"✅ Pruned {n_removed} entries ({freed / 2 ** 20:.1f} MiB)")
+        print(cache.stats().summary())
+        return 0
+    except Exception as e:
+        print(f"❌ Cache command failed: {e}")
+        return 1
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -303,6 +397,25 @@ Examples:
   
   # Quick full pipeline (alias)
   calvano full --config configs/base.json
+  
+  # Up to 500 runs, stopping once the convergence rate is known to within ±0.03
+  calvano run --config configs/base.json --n-runs 500 --ci-target convergence_rate=0.03
+  
+  # Resume the latest interrupted parameter sweep
+  calvano sweep --grid grids/example_grid.json --resume
+  
+  # Refine a coarse grid where profit gain changes fastest, 40 grid points in total
+  calvano sweep --grid grids/example_grid.json --adaptive --metric profit_gain --budget 40
+  
+  # Convert per-run JSON logs of older runs to the columnar run-log store
+  calvano convert-logs --logdir runs/20250613_120045
+  
+  # Show the result cache, or shrink it to 100 MiB
+  calvano cache stats
+  calvano cache prune --max-bytes 104857600
+  
+  # Check float32 Q storage against the float64 reference
+  calvano validate-precision --config config.json --sessions 100
         """
     )
     
@@ -320,6 +433,13 @@ Examples:
                            help="Number of simulation runs (overrides config)")
     run_parser.add_argument("--dry-run", action="store_true", 
                            help="Dry run mode (validate only)")
+    run_parser.add_argument("--no-cache", action="store_true",
+                           help="Neither read nor fill the result cache")
+    run_parser.add_argument("--ci-target", type=str, action="append", metavar="METRIC=HALF_WIDTH",
+                           help="Stop early once the confidence interval of METRIC (convergence_rate, "
+                                "mean_profit or profit_gain) is this tight; --n-runs is then the maximum")
+    run_parser.add_argument("--wave-size", type=int,
+                           help="Runs per wave of sequential early stopping (default: 10)")
     run_parser.set_defaults(func=cmd_run)
     
     # 'analyse' subcommand
@@ -361,6 +481,13 @@ Examples:
                             help="Number of simulation runs (overrides config)")
     full_parser.add_argument("--dry-run", action="store_true",
                             help="Dry run mode (validate only)")
+    full_parser.add_argument("--no-cache", action="store_true",
+                            help="Neither read nor fill the result cache")
+    full_parser.add_argument("--ci-target", type=str, action="append", metavar="METRIC=HALF_WIDTH",
+                            help="Stop early once the confidence interval of METRIC (convergence_rate, "
+                                 "mean_profit or profit_gain) is this tight; --n-runs is then the maximum")
+    full_parser.add_argument("--wave-size", type=int,
+                            help="Runs per wave of sequential early stopping (default: 10)")
     full_parser.set_defaults(func=cmd_full)
     
     # 'benchmark-paper' subcommand
@@ -389,8 +516,60 @@ Examples:
                                help="Number of jobs (default: CPU count)")
     sweep_parser.add_argument("--timeout", type=int, default=300,
                                help="Timeout in seconds (default: 300)")
+    sweep_parser.add_argument("--executor", type=str, choices=["pool", "subprocess"], default="pool",
+                               help="Run grid points on warm worker processes (pool) or "
+                                    "one subprocess each (subprocess, for isolation)")
+    sweep_parser.add_argument("--resume", type=str, nargs="?", const="latest",
+                               help="Resume an interrupted sweep, skipping completed points "
+                                    "(default: the latest sweep in runs/)")
+    sweep_parser.add_argument("--adaptive", action="store_true",
+                               help="Start from the grid as a coarse grid and refine it where "
+                                    "--metric changes fastest")
+    sweep_parser.add_argument("--metric", type=str, default="profit_gain",
+                               choices=["convergence_rate", "avg_convergence_time", "mean_profit",
+                                        "profit_gain", "nash_gap", "cooperative_gap"],
+                               help="Metric that drives adaptive refinement (default: profit_gain)")
+    sweep_parser.add_argument("--budget", type=int, default=64,
+                               help="Total grid points of an adaptive sweep (default: 64)")
+    sweep_parser.add_argument("--batch-size", type=int,
+                               help="Grid points added per refinement round (default: --njobs)")
     sweep_parser.set_defaults(func=cmd_sweep)
     
+    # 'convert-logs' subcommand
+    convert_parser = subparsers.add_parser("convert-logs", help="Convert per-run JSON logs to the columnar run-log store")
+    convert_parser.add_argument("--logdir", type=str, required=True,
+                                help="Run directory containing JSON run logs")
+    convert_parser.add_argument("--output", type=str,
+                                help="Output file (default: runs.npz next to the JSON logs)")
+    convert_parser.add_argument("--remove-json", action="store_true",
+                                help="Delete the JSON logs after conversion")
+    convert_parser.set_defaults(func=cmd_convert_logs)
+    
+    # 'cache' subcommand
+    cache_parser = subparsers.add_parser("cache", help="Inspect or prune the simulation result cache")
+    cache_parser.add_argument("action", choices=["stats", "prune"],
+                              help="stats: show size and entries; prune: evict least recently used entries")
+    cache_parser.add_argument("--cache-dir", type=str,
+                              help="Cache directory (default: $CALVANO_CACHE_DIR or ~/.cache/calvano/results)")
+    cache_parser.add_argument("--max-bytes", type=int,
+                              help="Size to prune down to (default: the cache size cap; 0 empties the cache)")
+    cache_parser.set_defaults(func=cmd_cache)
+    
+    # 'validate-precision' subcommand
+    precision_parser = subparsers.add_parser("validate-precision",
+                                             help="Compare reduced-precision Q storage with the float64 reference")
+    precision_parser.add_argument("--config", type=str, required=True,
+                                  help="Path to configuration JSON file")
+    precision_parser.add_argument("--precision", type=str, choices=["mixed"], default="mixed",
+                                  help="Precision policy to validate (default: mixed)")
+    precision_parser.add_argument("--sessions", type=int,
+                                  help="Number of sessions to compare (default: n_sessions from config)")
+    precision_parser.add_argument("--alpha", type=float, help="Learning rate (default: from config)")
+    precision_parser.add_argument("--delta", type=float, help="Discount factor (default: from config)")
+    precision_parser.add_argument("--epsilon", type=float,
+                                  help="Exploration parameter of every agent (default: from config)")
+    precision_parser.set_defaults(func=cmd_validate_precision)
+    
     # Parse arguments
     args = parser.parse_args()
     
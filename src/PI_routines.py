@@ -1,9 +1,15 @@
 import numpy as np
 from typing import List, Tuple, Optional
-from .globals import GlobalVars
-from . import globals
-from .generic_routines import RandomNumberGenerator
-from .params import SimParams
+try:
+    from .globals import GlobalVars
+    from . import globals
+    from .generic_routines import RandomNumberGenerator
+    from .params import SimParams
+except ImportError:
+    from globals import GlobalVars
+    import globals
+    from generic_routines import RandomNumberGenerator
+    from params import SimParams
 
 def compute_pi_matrices_singh_vives(globals: GlobalVars) -> None:
     """
@@ -1,8 +1,15 @@
 import numpy as np
 from typing import List, Tuple, Optional, Any
-from .params import SimParams
-from .worker import get_worker_rng
-from .dtype_policy import DTYPE, zeros, array
+
+# Handle imports for both package and standalone usage
+try:
+    from .params import SimParams
+    from .worker import get_worker_rng
+    from .dtype_policy import DTYPE, zeros, array
+except ImportError:
+    from params import SimParams
+    from worker import get_worker_rng
+    from dtype_policy import DTYPE, zeros, array
 
 def init_q_matrices(
     params: SimParams,
@@ -69,10 +76,11 @@ def init_q_matrices(
     
     return q_matrices, q_max, q_max_loc
 
-def init_state(params: SimParams) -> int:
-    """Initialize state randomly."""
+def init_state(params: SimParams, rng: Any = None) -> int:
+    """Initialize state randomly (from the worker RNG unless ``rng`` is given)."""
     try:
-        rng = get_worker_rng()
+        if rng is None:
+            rng = get_worker_rng()
         actions = [int(rng.ran2() * params.n_actions) for _ in range(params.n_agents)]
     except:
         # Fallback to numpy random
@@ -93,13 +101,14 @@ def compute_action_number(actions: List[int], params: SimParams) -> int:
         action_num += action * (params.n_actions ** i)
     return action_num
 
-def max_loc_break_ties(array: np.ndarray, params: SimParams) -> Tuple[float, int]:
-    """Find index of maximum value, breaking ties randomly."""
+def max_loc_break_ties(array: np.ndarray, params: SimParams, u: Optional[float] = None) -> Tuple[float, int]:
+    """Find index of maximum value, breaking ties randomly (with ``u`` if pre-drawn)."""
     try:
-        rng = get_worker_rng()
+        if u is None:
+            u = get_worker_rng().ran2()
         max_val = np.max(array)
         max_indices = np.where(array == max_val)[0]
-        max_loc = max_indices[int(rng.ran2() * len(max_indices))]
+        max_loc = max_indices[int(u * len(max_indices))]
     except:
         # Fallback
         max_val = np.max(array)
@@ -263,64 +263,121 @@ def find_optimal_shock_time(
     return best_time, best_result
 
 
-def simulate_impulse(params, shock_price: float, shock_agent: int, 
-                    shock_duration: int = 1, steps: int = 50) -> Any:
+def _grid_benchmarks(profits: np.ndarray, price_grid: np.ndarray, weights: np.ndarray) -> Tuple[float, float]:
     """
-    Simulate impulse response with price shock.
-    
+    Symmetric Nash and cooperative prices on the price grid.
+
+    The cooperative price maximizes joint profit over symmetric profiles; the
+    Nash price is the symmetric profile with the smallest gain from a
+    unilateral deviation (zero for a grid Nash equilibrium).
+    """
+    n_prices = len(price_grid)
+    n_agents = len(weights)
+    symmetric = np.arange(n_prices) * np.sum(weights)
+    coop_index = int(np.argmax(np.sum(profits[symmetric], axis=1)))
+
+    deviation_gain = np.zeros(n_prices)
+    for agent in range(n_agents):
+        # Profiles where only ``agent`` moves away from the symmetric price
+        deviations = symmetric[:, None] + (np.arange(n_prices)[None, :] - np.arange(n_prices)[:, None]) * weights[agent]
+        gain = np.max(profits[deviations, agent], axis=1) - profits[symmetric, agent]
+        deviation_gain = np.maximum(deviation_gain, gain)
+    nash_index = int(np.argmin(deviation_gain))
+    return float(price_grid[nash_index]), float(price_grid[coop_index])
+
+
+def simulate_impulse(params, shock_price, shock_agent, shock_duration=1, steps: int = 50,
+                     strategy: Optional[np.ndarray] = None,
+                     q_matrices: Optional[np.ndarray] = None,
+                     initial_state=None,
+                     nash_price: Optional[float] = None,
+                     coop_price: Optional[float] = None) -> Any:
+    """
+    Simulate the response of a learned strategy to price shocks.
+
+    The shocked agent plays ``shock_price`` for ``shock_duration`` periods
+    (``PERMANENT_DEVIATION`` for a permanent shock) while the others follow
+    the strategy; afterwards everyone follows the strategy. The dynamics are
+    deterministic and run on the precomputed profit table, with all shocks
+    advanced together by ``impulse_engine.simulate_impulse_batch``.
+    ``shock_price``, ``shock_agent``, ``shock_duration`` and ``initial_state``
+    broadcast against each other, one shock per element.
+
     Args:
-        params: Simulation parameters
-        shock_price: Price level for shock
-        shock_agent: Agent receiving the shock
-        shock_duration: Duration of shock in periods
-        steps: Number of time steps to simulate
-        
+        params: Simulation parameters (demand model and price grid)
+        shock_price: Price level(s) of the shock, snapped to the price grid
+        shock_agent: Agent(s) receiving the shock
+        shock_duration: Duration(s) of the shock in periods
+        steps: Number of periods recorded per shock, starting with the shock
+        strategy: Learned strategy, shape (n_states, n_agents) of price indices
+        q_matrices: Learned Q matrices, shape (n_agents, n_states, n_actions);
+            used for the greedy strategy when ``strategy`` is not given
+        initial_state: Pre-shock state(s); defaults to the first state of the
+            cycle the strategy reaches from state 0
+        nash_price: Reference Nash price (default: symmetric grid Nash price)
+        coop_price: Reference cooperative price (default: symmetric grid
+            joint-profit maximizer)
+
     Returns:
-        DataFrame with time series of system response
+        DataFrame with one row per (shock, period), built column-wise
     """
     import pandas as pd
-    
-    # Create time series data
-    time_series = []
-    
-    for t in range(steps):
-        # Determine if shock is active
-        shock_active = t < shock_duration
-        
-        # Simulate basic price dynamics (simplified)
-        if shock_active:
-            # During shock period
-            if hasattr(params, 'n_agents'):
-                prices = [shock_price if i == shock_agent else 0.5 for i in range(params.n_agents)]
-            else:
-                prices = [shock_price, 0.5]  # Default to 2 agents
-        else:
-            # Post-shock convergence (simplified exponential decay)
-            if hasattr(params, 'n_agents'):
-                base_prices = [0.5] * params.n_agents
-            else:
-                base_prices = [0.5, 0.5]  # Default to 2 agents
-            
-            # Add some decay towards equilibrium
-            decay_factor = np.exp(-0.1 * (t - shock_duration)) if t >= shock_duration else 1.0
-            prices = [p + 0.1 * decay_factor * np.sin(0.3 * t) for p in base_prices]
-        
-        # Calculate simplified Nash and cooperative gaps
-        nash_equilibrium = 0.5  # Simplified assumption
-        coop_equilibrium = 0.6  # Simplified assumption
-        
-        avg_price = np.mean(prices)
-        nash_gap = abs(avg_price - nash_equilibrium)
-        coop_gap = abs(avg_price - coop_equilibrium)
-        
-        # Store time step data
-        time_series.append({
-            'time': t,
-            'shock_active': shock_active,
-            'agent_0_price': prices[0],
-            'agent_1_price': prices[1] if len(prices) > 1 else prices[0],
-            'nash_gap': nash_gap,
-            'coop_gap': coop_gap
-        })
-    
-    return pd.DataFrame(time_series) 
\ No newline at end of file
+
+    try:
+        from ..game_tables import get_game_tables
+        from ..impulse_engine import PERMANENT_DEVIATION, simulate_impulse_batch
+        from ..strategy_graph import get_strategy_graph
+    except ImportError:
+        from game_tables import get_game_tables
+        from impulse_engine import PERMANENT_DEVIATION, simulate_impulse_batch
+        from strategy_graph import get_strategy_graph
+
+    if strategy is None:
+        if q_matrices is None:
+            raise ValueError("simulate_impulse needs a learned strategy or Q matrices")
+        strategy = np.argmax(np.asarray(q_matrices), axis=-1).T
+    strategy = np.asarray(strategy, dtype=np.int64)
+    n_agents = strategy.shape[1]
+
+    tables = get_game_tables(params)
+    weights = tables.prices.shape[0] ** np.arange(n_agents)
+    if nash_price is None or coop_price is None:
+        grid_nash, grid_coop = _grid_benchmarks(tables.profits, tables.prices, weights)
+        nash_price = grid_nash if nash_price is None else nash_price
+        coop_price = grid_coop if coop_price is None else coop_price
+
+    if initial_state is None:
+        graph = get_strategy_graph(strategy, tables.next_state, weights)
+        initial_state = int(graph.cycle_from(0)[0])
+    shock_index = np.argmin(np.abs(np.asarray(shock_price, dtype=float)[..., None] - tables.prices), axis=-1)
+    shock_index, shock_agent, shock_duration, initial_state = (
+        a.ravel() for a in np.broadcast_arrays(shock_index, shock_agent, shock_duration, initial_state)
+    )
+
+    batch = simulate_impulse_batch(
+        strategy, tables.profits, tables.next_state, weights,
+        0, initial_state, shock_agent, shock_index, shock_duration, steps,
+        price_grid=np.repeat(tables.prices[:, None], n_agents, axis=1)
+    )
+
+    n_shocks = len(batch)
+    time = np.tile(np.arange(steps), n_shocks)
+    duration = np.repeat(batch.dev_length, steps)
+    prices = batch.prices.reshape(n_shocks * steps, n_agents)
+    profits = batch.profits.reshape(n_shocks * steps, n_agents)
+    avg_price = prices.mean(axis=1)
+
+    columns = {
+        'shock': np.repeat(np.arange(n_shocks), steps),
+        'time': time,
+        'shock_active': (duration == PERMANENT_DEVIATION) | (time < duration),
+        'shock_agent': np.repeat(batch.dev_agent, steps),
+        'state': batch.states.ravel(),
+    }
+    for agent in range(n_agents):
+        columns[f'agent_{agent}_price'] = prices[:, agent]
+    for agent in range(n_agents):
+        columns[f'agent_{agent}_profit'] = profits[:, agent]
+    columns['nash_gap'] = np.abs(avg_price - nash_price)
+    columns['coop_gap'] = np.abs(avg_price - coop_price)
+    return pd.DataFrame(columns)
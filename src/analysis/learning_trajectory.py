@@ -59,6 +59,12 @@ except ImportError:
         def analyze_qgap_convergence(Q_hist, threshold=1e-3):
             return {'convergence_time': 500, 'convergence_rate': 0.01}
 
+# Handle imports for both package and standalone usage
+try:
+    from ..run_logs import iter_chunks
+except ImportError:
+    from run_logs import iter_chunks
+
 
 @dataclass
 class TrajectoryResults:
@@ -78,7 +84,8 @@ def compute_incentive_compatibility(prices: np.ndarray, nash_prices: np.ndarray)
     Compute incentive compatibility indicator IA_t = |π_t - π_nash|.
     
     Args:
-        prices: Price history array of shape (T, n_agents)
+        prices: Price history array of shape (T, n_agents); may be an
+            ``np.memmap``, which is read in fixed-size chunks
         nash_prices: Nash equilibrium prices array of shape (n_agents,)
         
     Returns:
@@ -95,13 +102,15 @@ def compute_incentive_compatibility(prices: np.ndarray, nash_prices: np.ndarray)
     if len(nash_prices) != n_agents:
         raise ValueError(f"nash_prices length {len(nash_prices)} doesn't match n_agents {n_agents}")
     
-    # Compute absolute deviation from Nash for each agent and time
-    deviations = np.abs(prices - nash_prices[np.newaxis, :])
-    
-    # Take average deviation across agents (or max, depending on interpretation)
-    incentive_compatibility = np.mean(deviations, axis=1)
+    incentive_compatibility = zeros(T)
+    for lo, block in iter_chunks(prices):
+        # Compute absolute deviation from Nash for each agent and time
+        deviations = np.abs(block - nash_prices[np.newaxis, :])
+        
+        # Take average deviation across agents (or max, depending on interpretation)
+        incentive_compatibility[lo:lo + len(block)] = np.mean(deviations, axis=1)
     
-    return array(incentive_compatibility)
+    return incentive_compatibility
 
 
 def run_monte_carlo_trajectories(
@@ -14,6 +14,7 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from collections import defaultdict, Counter
 import pandas as pd
+from scipy import sparse
 # Handle imports for both package and standalone usage
 try:
     from ..dtype_policy import DTYPE, array, zeros
@@ -44,6 +45,58 @@ except ImportError:
                 self.a_param = 1.0
                 self.demand_model = "logit"
 
+# Handle imports for both package and standalone usage
+try:
+    from ..run_logs import iter_chunks
+except ImportError:
+    from run_logs import iter_chunks
+
+
+def price_grid_indices(prices: np.ndarray, price_grid: np.ndarray) -> np.ndarray:
+    """
+    Map prices to the index of the closest grid point, elementwise.
+    
+    Uses ``searchsorted`` on the sorted grid and compares the two neighbouring
+    grid points; ties go to the lower grid point, like ``np.argmin`` over
+    ``|price_grid - price|`` on an ascending grid.
+    
+    Args:
+        prices: Prices of any shape, e.g. a (time_steps, n_agents) history
+        price_grid: Discrete price grid
+        
+    Returns:
+        Integer grid indices with the shape of ``prices``
+    """
+    price_grid = np.asarray(price_grid, dtype=DTYPE)
+    prices = np.asarray(prices, dtype=DTYPE)
+    order = np.argsort(price_grid, kind='stable')
+    sorted_grid = price_grid[order]
+    
+    if len(sorted_grid) == 1:
+        return np.zeros(prices.shape, dtype=np.int64)
+    
+    right = np.clip(np.searchsorted(sorted_grid, prices), 1, len(sorted_grid) - 1)
+    left = right - 1
+    closer_left = np.abs(prices - sorted_grid[left]) <= np.abs(sorted_grid[right] - prices)
+    return order[np.where(closer_left, left, right)]
+
+
+def encode_states(price_hist: np.ndarray, price_grid: np.ndarray) -> np.ndarray:
+    """
+    State index of every period of a price history.
+    
+    Args:
+        price_hist: Price history array of shape (time_steps, n_agents) or (time_steps,)
+        price_grid: Discrete price grid
+        
+    Returns:
+        Integer state indices of shape (time_steps,), encoded as
+        sum_i (price_index_i * n_prices^i)
+    """
+    indices = price_grid_indices(price_hist, price_grid)
+    if indices.ndim == 1:
+        return indices
+    return indices @ (len(price_grid) ** np.arange(indices.shape[1], dtype=np.int64))
 
 
 def count_state_freq(price_hist: np.ndarray, price_grid: np.ndarray, 
@@ -52,7 +105,8 @@ def count_state_freq(price_hist: np.ndarray, price_grid: np.ndarray,
     Count frequency of price states in simulation history.
     
     Args:
-        price_hist: Price history array of shape (time_steps, n_agents)
+        price_hist: Price history array of shape (time_steps, n_agents);
+            may be an ``np.memmap``, which is read in fixed-size chunks
         price_grid: Discrete price grid used in simulation
         normalize: Whether to normalize frequencies to probabilities
         
@@ -69,24 +123,10 @@ def count_state_freq(price_hist: np.ndarray, price_grid: np.ndarray,
     n_prices = len(price_grid)
     n_states = n_prices ** n_agents
     
-    # Initialize frequency counter
-    state_freq = zeros(n_states, dtype=int)
-    
-    # Convert prices to state indices
-    for t in range(len(price_hist)):
-        if n_agents == 1:
-            prices = [price_hist[t]]
-        else:
-            prices = price_hist[t, :]
-        
-        # Find closest price grid points
-        state_index = 0
-        for agent, price in enumerate(prices):
-            # Find closest grid point
-            price_index = np.argmin(np.abs(price_grid - price))
-            state_index += price_index * (n_prices ** agent)
-        
-        state_freq[state_index] += 1
+    # Encode and count one chunk of the history at a time
+    state_freq = zeros(n_states, dtype=np.int64)
+    for _, block in iter_chunks(price_hist):
+        state_freq += np.bincount(encode_states(block, price_grid), minlength=n_states)
     
     # Normalize if requested
     if normalize and np.sum(state_freq) > 0:
@@ -95,53 +135,51 @@ def count_state_freq(price_hist: np.ndarray, price_grid: np.ndarray,
     return state_freq
 
 
-def compute_state_transition_matrix(price_hist: np.ndarray, price_grid: np.ndarray) -> np.ndarray:
+def compute_state_transition_counts(price_hist: np.ndarray, price_grid: np.ndarray) -> sparse.csr_matrix:
     """
-    Compute empirical state transition matrix from price history.
+    Count state transitions of a price history into a sparse matrix.
     
     Args:
-        price_hist: Price history array
+        price_hist: Price history array (may be an ``np.memmap``)
         price_grid: Discrete price grid
         
     Returns:
-        Transition matrix of shape (n_states, n_states)
+        Sparse (n_states, n_states) matrix of transition counts
     """
-    if len(price_hist) < 2:
-        n_agents = price_hist.shape[1] if len(price_hist.shape) > 1 else 1
-        n_states = len(price_grid) ** n_agents
-        return zeros((n_states, n_states))
-    
     n_agents = price_hist.shape[1] if len(price_hist.shape) > 1 else 1
-    n_prices = len(price_grid)
-    n_states = n_prices ** n_agents
-    
-    # Initialize transition count matrix
-    transition_counts = zeros((n_states, n_states), dtype=int)
-    
-    # Count transitions
-    for t in range(len(price_hist) - 1):
-        # Current state
-        if n_agents == 1:
-            current_prices = [price_hist[t]]
-            next_prices = [price_hist[t + 1]]
-        else:
-            current_prices = price_hist[t, :]
-            next_prices = price_hist[t + 1, :]
-        
-        # Convert to state indices
-        current_state = prices_to_state_index(current_prices, price_grid)
-        next_state = prices_to_state_index(next_prices, price_grid)
-        
-        transition_counts[current_state, next_state] += 1
+    n_states = len(price_grid) ** n_agents
+    
+    # Each chunk carries one extra row for its last transition
+    counts = sparse.csr_matrix((n_states, n_states), dtype=np.int64)
+    for _, block in iter_chunks(price_hist, overlap=1):
+        states = encode_states(block, price_grid)
+        counts = counts + sparse.csr_matrix(
+            (np.ones(len(states) - 1, dtype=np.int64), (states[:-1], states[1:])),
+            shape=(n_states, n_states)
+        )
+    return counts
+
+
+def compute_state_transition_matrix(price_hist: np.ndarray, price_grid: np.ndarray) -> sparse.csr_matrix:
+    """
+    Compute empirical state transition matrix from price history.
     
-    # Normalize to probabilities
-    transition_matrix = zeros((n_states, n_states))
-    for state in range(n_states):
-        total_transitions = np.sum(transition_counts[state, :])
-        if total_transitions > 0:
-            transition_matrix[state, :] = transition_counts[state, :].astype(DTYPE) / total_transitions
+    The matrix is sparse: a history visits only a small part of the
+    n_prices^n_agents states, and a dense matrix does not fit in memory
+    for three or more agents.
     
-    return transition_matrix
+    Args:
+        price_hist: Price history array (may be an ``np.memmap``)
+        price_grid: Discrete price grid
+        
+    Returns:
+        Sparse row-stochastic transition matrix of shape (n_states, n_states);
+        rows of states that are never left are zero
+    """
+    counts = compute_state_transition_counts(price_hist, price_grid).astype(DTYPE)
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    scale = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+    return sparse.csr_matrix(sparse.diags(scale) @ counts)
 
 
 def prices_to_state_index(prices: List[float], price_grid: np.ndarray) -> int:
@@ -155,14 +193,8 @@ def prices_to_state_index(prices: List[float], price_grid: np.ndarray) -> int:
     Returns:
         State index
     """
-    state_index = 0
-    n_prices = len(price_grid)
-    
-    for agent, price in enumerate(prices):
-        price_index = np.argmin(np.abs(price_grid - price))
-        state_index += price_index * (n_prices ** agent)
-    
-    return state_index
+    price_index = price_grid_indices(np.ravel(prices), price_grid)
+    return int(price_index @ (len(price_grid) ** np.arange(len(price_index), dtype=np.int64)))
 
 
 def state_index_to_prices(state_index: int, price_grid: np.ndarray, n_agents: int) -> List[float]:
@@ -189,15 +221,106 @@ def state_index_to_prices(state_index: int, price_grid: np.ndarray, n_agents: in
     return prices
 
 
-def detect_cycles(price_hist: np.ndarray, max_period: int = 5, min_occurrences: int = 2, tol: float = 1e-4) -> Dict[int, int]:
+def _lag_equal(earlier: np.ndarray, later: np.ndarray, tol: Optional[float]) -> np.ndarray:
+    """
+    Whether each period equals the period ``lag`` steps later.
+    
+    Exact comparison for integer state codes; for prices the elementwise
+    ``np.allclose`` test (with ``atol=tol``) over all agents of a period.
+    """
+    if tol is None:
+        equal = earlier == later
+    else:
+        equal = np.abs(earlier - later) <= tol + 1e-5 * np.abs(later)
+    return equal.reshape(len(equal), -1).all(axis=1)
+
+
+class CycleDetector:
     """
-    Detect periodic patterns in price history using array comparison.
+    Streaming counter of immediately repeating patterns.
+    
+    A pattern of period p starts at s if periods s..s+p-1 equal periods
+    s+p..s+2p-1, i.e. if the lag-p equality vector ``x[t] == x[t+p]`` is
+    true for p consecutive t. A prefix sum of that vector checks every start
+    at once, so a batch of new periods costs O(batch x max_period) array
+    work. Only the last ``2 * max_period - 1`` periods are kept between
+    updates, so counts can be maintained while a history is produced or
+    read from disk chunk by chunk.
+    """
+    
+    def __init__(self, max_period: int = 5, tol: Optional[float] = None):
+        """
+        Args:
+            max_period: Maximum cycle period to search for
+            tol: Tolerance for comparing price rows (None: exact comparison,
+                for integer state codes)
+        """
+        if max_period < 1:
+            raise ValueError(f"max_period must be at least 1, got {max_period}")
+        self.max_period = max_period
+        self.tol = tol
+        self.n_periods = 0
+        self.occurrences = np.zeros(max_period + 1, dtype=np.int64)
+        self._tail: Optional[np.ndarray] = None
+    
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of consecutive periods.
+        
+        Args:
+            values: State codes of shape (n,) or price rows of shape (n, n_agents)
+        """
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        if self.tol is not None:
+            values = values.astype(DTYPE)
+        buffer = values if self._tail is None else np.concatenate([self._tail, values])
+        n_old = len(buffer) - len(values)
+        
+        for period in range(1, self.max_period + 1):
+            # Starts whose window of 2 * period ends in the new periods
+            first = max(n_old - 2 * period + 1, 0)
+            n_starts = len(buffer) - 2 * period + 1 - first
+            if n_starts <= 0:
+                continue
+            lagged = _lag_equal(buffer[first:len(buffer) - period], buffer[first + period:], self.tol)
+            run = np.concatenate([[0], np.cumsum(lagged)])
+            self.occurrences[period] += np.count_nonzero(run[period:] - run[:-period] == period)
+        
+        self._tail = buffer[-(2 * self.max_period - 1):]
+        self.n_periods += len(values)
+    
+    def counts(self, min_occurrences: int = 2) -> Dict[int, int]:
+        """
+        Occurrences of each period seen so far.
+        
+        Args:
+            min_occurrences: Minimum number of cycle occurrences to count
+            
+        Returns:
+            Dictionary mapping cycle periods to occurrence counts
+        """
+        return {period: int(self.occurrences[period]) for period in range(1, self.max_period + 1)
+                if self.occurrences[period] >= min_occurrences}
+
+
+def detect_cycles(price_hist: np.ndarray, max_period: int = 5, min_occurrences: int = 2,
+                  tol: Optional[float] = 1e-4) -> Dict[int, int]:
+    """
+    Detect periodic patterns in price history using lag-equality vectors.
+    
+    Counts, for every period p, the starts s at which the window
+    ``price_hist[s:s + p]`` is repeated immediately by
+    ``price_hist[s + p:s + 2 * p]`` (compared with ``np.allclose``).
     
     Args:
-        price_hist: Price history array of shape (time_steps, n_agents)
+        price_hist: Price history array of shape (time_steps, n_agents) or
+            integer state codes of shape (time_steps,); may be an ``np.memmap``,
+            which is read in fixed-size chunks
         max_period: Maximum cycle period to search for
         min_occurrences: Minimum number of cycle occurrences to count
-        tol: Tolerance for numerical comparison
+        tol: Tolerance for numerical comparison (ignored for integer state codes)
         
     Returns:
         Dictionary mapping cycle periods to occurrence counts
@@ -205,27 +328,12 @@ def detect_cycles(price_hist: np.ndarray, max_period: int = 5, min_occurrences:
     if len(price_hist) < 2 * max_period:
         return {}
     
-    cycle_counts = {}
-    
-    # Search for cycles of different periods
-    for period in range(1, max_period + 1):
-        occurrences = 0
-        
-        # Check sliding windows for repeating patterns
-        for start in range(len(price_hist) - 2 * period + 1):
-            # Extract potential cycle pattern
-            pattern1 = price_hist[start:start + period]
-            pattern2 = price_hist[start + period:start + 2 * period]
-            
-            # Check if patterns match within tolerance
-            if np.allclose(pattern1, pattern2, atol=tol):
-                occurrences += 1
-        
-        # Only count if minimum occurrences met
-        if occurrences >= min_occurrences:
-            cycle_counts[period] = occurrences
+    exact = np.issubdtype(np.asarray(price_hist[:0]).dtype, np.integer)
+    detector = CycleDetector(max_period, tol=None if exact else tol)
+    for _, block in iter_chunks(price_hist):
+        detector.update(block)
     
-    return cycle_counts
+    return detector.counts(min_occurrences)
 
 
 def find_cycles_of_period(sequence: List, period: int) -> Dict[Tuple, int]:
@@ -263,7 +371,7 @@ def analyze_price_volatility(price_hist: np.ndarray, window_size: int = 100) ->
     Analyze price volatility over time windows.
     
     Args:
-        price_hist: Price history array
+        price_hist: Price history array (may be an ``np.memmap``)
         window_size: Size of rolling window for volatility calculation
         
     Returns:
@@ -275,21 +383,16 @@ def analyze_price_volatility(price_hist: np.ndarray, window_size: int = 100) ->
     n_agents = price_hist.shape[1] if len(price_hist.shape) > 1 else 1
     n_windows = len(price_hist) - window_size + 1
     
-    # Calculate rolling volatility (standard deviation)
+    # Calculate rolling volatility (standard deviation), window by window within each chunk
     volatilities = []
     
-    for t in range(n_windows):
-        window_data = price_hist[t:t + window_size]
-        
-        if n_agents == 1:
-            volatility = np.std(window_data)
-        else:
-            # Average volatility across agents
-            agent_volatilities = [np.std(window_data[:, agent]) for agent in range(n_agents)]
-            volatility = np.mean(agent_volatilities)
-        
-        volatilities.append(volatility)
+    for _, block in iter_chunks(price_hist, overlap=window_size - 1):
+        windows = np.lib.stride_tricks.sliding_window_view(block, window_size, axis=0)
+        # Average volatility across agents
+        agent_volatilities = np.std(windows, axis=-1).reshape(len(windows), -1)
+        volatilities.append(np.mean(agent_volatilities, axis=1))
     
+    volatilities = np.concatenate(volatilities)
     volatilities = array(volatilities)
     
     return {
@@ -423,7 +526,7 @@ def analyze_state_persistence(price_hist: np.ndarray, price_grid: np.ndarray) ->
     Analyze how long the system stays in each state.
     
     Args:
-        price_hist: Price history array
+        price_hist: Price history array (may be an ``np.memmap``)
         price_grid: Price grid used
         
     Returns:
@@ -432,31 +535,27 @@ def analyze_state_persistence(price_hist: np.ndarray, price_grid: np.ndarray) ->
     if len(price_hist) < 2:
         return {'error': 'Insufficient data for persistence analysis'}
     
-    n_agents = price_hist.shape[1] if len(price_hist.shape) > 1 else 1
-    
-    # Convert price history to state sequence
-    state_sequence = []
-    for t in range(len(price_hist)):
-        if n_agents == 1:
-            prices = [price_hist[t]]
-        else:
-            prices = price_hist[t, :]
-        
-        state_idx = prices_to_state_index(prices, price_grid)
-        state_sequence.append(state_idx)
-    
-    # Analyze persistence (consecutive occurrences of same state)
+    # Analyze persistence (consecutive occurrences of same state), one chunk at a time
     state_durations = defaultdict(list)
-    current_state = state_sequence[0]
-    current_duration = 1
-    
-    for t in range(1, len(state_sequence)):
-        if state_sequence[t] == current_state:
-            current_duration += 1
-        else:
-            state_durations[current_state].append(current_duration)
-            current_state = state_sequence[t]
-            current_duration = 1
+    current_state = None
+    current_duration = 0
+    
+    for _, block in iter_chunks(price_hist):
+        states = encode_states(block, price_grid)
+        # Runs of equal states within the chunk
+        starts = np.flatnonzero(np.r_[True, states[1:] != states[:-1]])
+        lengths = np.diff(np.r_[starts, len(states)])
+        run_states = states[starts]
+        
+        # The first run continues the last run of the previous chunk
+        if run_states[0] == current_state:
+            current_duration += int(lengths[0])
+            run_states, lengths = run_states[1:], lengths[1:]
+        for state, length in zip(run_states.tolist(), lengths.tolist()):
+            if current_state is not None:
+                state_durations[current_state].append(current_duration)
+            current_state = state
+            current_duration = length
     
     # Add final duration
     state_durations[current_state].append(current_duration)
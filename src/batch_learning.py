@@ -0,0 +1,181 @@
+"""
+Batched multi-session Q-learning engine.
+
+Advances many independent sessions of the same experiment in lockstep. The
+Q matrices of all sessions are held in one ``(sessions, agents, states, actions)``
+array and action selection, reward lookup and the Q update are NumPy operations
+over the whole batch. Every session owns its own L'Ecuyer stream, and the draws
+are consumed in exactly the order used by ``learning_simulation.compute_experiment``,
+so each session reproduces the scalar path bit for bit.
+"""
+
+import numpy as np
+from typing import List, Tuple, Optional, Sequence
+
+from .params import SimParams
+from .QL_routines import init_state
+from .learning_simulation import (
+    init_session_q,
+    get_states_at_convergence,
+    get_prices_at_convergence
+)
+from .game_tables import get_game_tables
+from .dtype_policy import DTYPE, q_dtype
+from .rng.Lecuyer import get_lecuyer_substream, LecuyerStreams
+
+
+def break_ties(rows: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ``max_loc_break_ties`` over the last axis.
+
+    Args:
+        rows: Q values, shape (..., n_actions)
+        u: Uniform deviates used to pick among tied maxima, shape (...)
+
+    Returns:
+        Index of the selected maximum for every row
+    """
+    is_max = rows == np.max(rows, axis=-1, keepdims=True)
+    n_ties = np.sum(is_max, axis=-1)
+    pick = (u * n_ties).astype(np.int64)
+    return np.argmax(np.cumsum(is_max, axis=-1) > pick[..., None], axis=-1)
+
+
+def boltzmann_choice(rows: np.ndarray, temperature: float, u: np.ndarray) -> np.ndarray:
+    """
+    Vectorized Boltzmann draw matching ``compute_p_prime``.
+
+    Args:
+        rows: Q values, shape (batch, n_actions)
+        temperature: Exploration parameter
+        u: Uniform deviates, shape (batch,)
+
+    Returns:
+        Selected action for every row
+    """
+    exp_values = np.exp(np.asarray(rows, dtype=DTYPE) / temperature)
+    probabilities = exp_values / np.sum(exp_values, axis=1, keepdims=True)
+    hit = u[:, None] <= np.cumsum(probabilities, axis=1)
+    return np.where(hit.any(axis=1), np.argmax(hit, axis=1), rows.shape[1] - 1)
+
+
+def compute_experiment_batch(
+    params: SimParams,
+    alpha: float,
+    exploration_parameters: np.ndarray,
+    delta: float,
+    sessions: Optional[Sequence[int]] = None,
+    experiment: int = 0,
+    precision: Optional[str] = None
+) -> Tuple[List[Tuple[List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]], np.ndarray]:
+    """
+    Run several sessions of one Q-learning experiment in lockstep.
+
+    Args:
+        params: Simulation parameters
+        alpha: Learning rate
+        exploration_parameters: Array of exploration parameters (one per agent)
+        delta: Discount factor
+        sessions: Session indices to run (default: ``range(n_sessions)``); each
+            session draws from its ``(experiment, session)`` substream
+        experiment: Experiment index
+        precision: Precision policy of the stored Q values (default:
+            ``params.precision``, falling back to 'double')
+
+    Returns:
+        Tuple containing:
+        - Per-session results in the ``compute_experiment`` format
+        - Number of iterations run by each session
+    """
+    if sessions is None:
+        sessions = range(getattr(params, 'n_sessions', 1))
+    n_sessions = len(sessions)
+    n_agents = params.n_agents
+    n_actions = params.n_actions
+    n_states = params.n_states
+    npm = params.n_perfect_measurement
+    window = params.convergence_window // npm
+    tol = params.convergence_tolerance
+    greedy = params.exploration_type == 1
+    if precision is None:
+        precision = getattr(params, 'precision', None)
+
+    # Per-session initialization, consuming each stream as compute_experiment does
+    generators = [get_lecuyer_substream(params.rng_seed, experiment, session) for session in sessions]
+    q = np.empty((n_sessions, n_agents, n_states, n_actions), dtype=q_dtype(precision))
+    state = np.empty(n_sessions, dtype=np.int64)
+    for s, rng in enumerate(generators):
+        q[s] = np.stack(init_session_q(params, rng, storage='dense', precision=precision))
+        state[s] = init_state(params, rng)
+    streams = LecuyerStreams(generators)
+
+    tables = get_game_tables(params)
+    powers = n_actions ** np.arange(n_agents)
+    strategies = np.zeros((n_sessions, n_agents, n_states), dtype=np.int32)
+    price_history = np.zeros((n_sessions, 0, n_agents))
+    n_iterations = np.full(n_sessions, params.max_iterations, dtype=np.int64)
+
+    active = np.arange(n_sessions)
+    for iteration in range(params.max_iterations):
+        if len(active) == 0:
+            break
+
+        # Action selection for every active session
+        cur = state[active]
+        actions = np.empty((len(active), n_agents), dtype=np.int64)
+        for agent in range(n_agents):
+            rows = q[active, agent, cur, :]
+            if greedy:
+                u_explore = streams.ran2(active)
+                u_action = streams.ran2(active)
+                explore = u_explore < exploration_parameters[agent]
+                actions[:, agent] = np.where(
+                    explore,
+                    (u_action * n_actions).astype(np.int64),
+                    break_ties(rows, u_action)
+                )
+            else:
+                actions[:, agent] = boltzmann_choice(
+                    rows, exploration_parameters[agent], streams.ran2(active)
+                )
+
+        # Reward lookup and Q update
+        action_number = actions @ powers
+        next_state = tables.next_state[action_number]
+        rewards = tables.profits[action_number]
+        for agent in range(n_agents):
+            old_q = q[active, agent, cur, actions[:, agent]].astype(DTYPE)
+            max_next_q = np.max(q[active, agent, next_state, :], axis=1).astype(DTYPE)
+            q[active, agent, cur, actions[:, agent]] = (
+                (1 - alpha) * old_q + alpha * (rewards[:, agent] + delta * max_next_q)
+            )
+        state[active] = next_state
+
+        if iteration % npm == 0:
+            # Greedy strategies, one tie-break draw per (agent, state) in scalar order
+            for agent in range(n_agents):
+                strategies[active, agent, :] = break_ties(q[active, agent], streams.ran2_block(n_states, active))
+
+            # Record prices; sessions leave the batch as they converge
+            prices = np.zeros((n_sessions, 1, n_agents))
+            prices[active, 0] = actions / (n_actions - 1)
+            price_history = np.concatenate([price_history, prices], axis=1)[:, -window:]
+            if price_history.shape[1] >= window:
+                recent = price_history[active, -window:]
+                ranges = np.max(recent, axis=1) - np.min(recent, axis=1)
+                converged = np.all(ranges <= tol, axis=1)
+                n_iterations[active[converged]] = iteration + 1
+                active = active[~converged]
+
+    results = []
+    for s in range(n_sessions):
+        strategies_s = [strategies[s, agent].copy() for agent in range(n_agents)]
+        states = get_states_at_convergence(strategies_s, params)
+        results.append((
+            [q[s, agent].copy() for agent in range(n_agents)],
+            strategies_s,
+            states,
+            get_prices_at_convergence(states, params)
+        ))
+
+    return results, n_iterations
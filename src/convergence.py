@@ -4,13 +4,16 @@ Implements the exact convergence criteria from the paper.
 """
 
 import numpy as np
+from collections import deque
 from typing import Dict, Any, List, Tuple, Optional
 
 # Handle imports for both package and standalone usage
 try:
     from .params import SimParams
+    from .strategy_graph import get_strategy_graph
 except ImportError:
     from params import SimParams
+    from strategy_graph import get_strategy_graph
 
 def has_converged(price_hist: np.ndarray, window: int = 1000, tol: float = 1e-4) -> bool:
     """
@@ -60,6 +63,92 @@ def has_strategy_converged(strategy_hist: List[np.ndarray], window: int = 1000)
     return True
 
 
+class ConvergenceDetector:
+    """
+    Streaming form of ``has_converged`` and ``has_strategy_converged``.
+    
+    Keeps, per agent, monotonic deques of the window minimum and maximum, so
+    each measurement costs O(1) amortized and memory is bounded by the window
+    instead of the whole run.
+    """
+    
+    def __init__(self, n_agents: int, window: int = 1000, tol: float = 1e-4):
+        """
+        Args:
+            n_agents: Number of agents
+            window: Number of measurements in the convergence window
+            tol: Tolerance for price changes
+        """
+        if window < 1:
+            raise ValueError(f"window must be at least 1, got {window}")
+        self.n_agents = n_agents
+        self.window = window
+        self.tol = tol
+        self.n_updates = 0
+        self.strategy_streak = 0
+        self.convergence_iteration: Optional[int] = None
+        # (measurement index, price) pairs with increasing / decreasing prices
+        self._min_deques = [deque() for _ in range(n_agents)]
+        self._max_deques = [deque() for _ in range(n_agents)]
+    
+    def update(self, prices: np.ndarray, iteration: Optional[int] = None,
+               strategy_changed: Optional[bool] = None) -> bool:
+        """
+        Add one measurement.
+        
+        Args:
+            prices: Prices of all agents, shape (n_agents,)
+            iteration: Learning iteration of the measurement (recorded as
+                ``convergence_iteration`` the first time the criterion holds)
+            strategy_changed: Whether the greedy strategies differ from the
+                previous measurement (omit if strategies are not tracked)
+            
+        Returns:
+            True if the price criterion of ``has_converged`` holds
+        """
+        index = self.n_updates
+        self.n_updates += 1
+        oldest = index - self.window
+        for agent in range(self.n_agents):
+            price = prices[agent]
+            min_deque = self._min_deques[agent]
+            while min_deque and min_deque[-1][1] >= price:
+                min_deque.pop()
+            min_deque.append((index, price))
+            while min_deque[0][0] <= oldest:
+                min_deque.popleft()
+            
+            max_deque = self._max_deques[agent]
+            while max_deque and max_deque[-1][1] <= price:
+                max_deque.pop()
+            max_deque.append((index, price))
+            while max_deque[0][0] <= oldest:
+                max_deque.popleft()
+        
+        if strategy_changed is not None:
+            self.strategy_streak = 1 if strategy_changed or index == 0 else self.strategy_streak + 1
+        
+        converged = self.prices_converged
+        if converged and self.convergence_iteration is None:
+            self.convergence_iteration = iteration if iteration is not None else index
+        return converged
+    
+    @property
+    def prices_converged(self) -> bool:
+        """Same result as ``has_converged`` on every measurement so far."""
+        if self.n_updates < self.window:
+            return False
+        return all(
+            self._max_deques[agent][0][1] - self._min_deques[agent][0][1] <= self.tol
+            for agent in range(self.n_agents)
+        )
+    
+    @property
+    def strategy_converged(self) -> bool:
+        """Same result as ``has_strategy_converged`` on the strategies seen so far."""
+        return self.strategy_streak >= self.window
+
+
 def compute_nash_distance(prices: np.ndarray, params: SimParams) -> float:
     """
     Compute distance from Nash equilibrium.
@@ -225,6 +314,9 @@ def find_convergence_time(
 def compute_cycle_length(strategy: np.ndarray, start_state: int, params: SimParams) -> Tuple[int, List[int]]:
     """
     Compute cycle length starting from a given state.
+
+    The cycle comes from the memoized StrategyGraph of the strategy, so
+    repeated calls for other start states reuse the same decomposition.
     
     Args:
         strategy: Strategy matrix of shape (n_states, n_agents)
@@ -234,35 +326,14 @@ def compute_cycle_length(strategy: np.ndarray, start_state: int, params: SimPara
     Returns:
         Tuple of (cycle_length, cycle_states)
     """
-    visited_states = []
-    current_state = start_state
-    
-    while current_state not in visited_states:
-        visited_states.append(current_state)
-        
-        # Get actions for current state
-        actions = strategy[current_state, :]
-        
-        # Compute next state
-        next_state = 0
-        for i, action in enumerate(actions):
-            next_state += action * (params.n_actions ** i)
-        
-        current_state = next_state
-        
-        # Safety check to prevent infinite loops
-        if len(visited_states) > params.n_states:
-            break
-    
-    if current_state in visited_states:
-        cycle_start = visited_states.index(current_state)
-        cycle_states = visited_states[cycle_start:]
-        cycle_length = len(cycle_states)
-    else:
-        cycle_states = visited_states
-        cycle_length = len(visited_states)
-    
-    return cycle_length, cycle_states
+    n_profiles = params.n_actions ** params.n_agents
+    graph = get_strategy_graph(
+        strategy,
+        np.arange(n_profiles),
+        params.n_actions ** np.arange(params.n_agents)
+    )
+    cycle_states = graph.cycle_from(start_state).tolist()
+    return len(cycle_states), cycle_states
 
 
 def save_convergence_stats(file_path: str, result_dict: Dict[str, Any]) -> None:
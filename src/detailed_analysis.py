@@ -1,9 +1,9 @@
 import numpy as np
 from typing import List, Tuple, Dict
 from globals import GlobalVars
-from QL_routines import compute_q_cell, compute_dynamic_best_response
 from generic_routines import are_equal_reals, convert_number_base, compute_state_number
-from impulse_response import compute_static_best_response, compute_individual_ir
+from impulse_response import compute_static_best_response, compute_dynamic_best_response, compute_individual_ir
+from policy_evaluation import evaluate_strategy_globals
 from equilibrium_check import compute_eq_check_session
 from q_gap_to_maximum import compute_q_gap_to_max_session
 
@@ -81,6 +81,10 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                     (globals.num_states, globals.num_agents)
                 )
                 
+                # True Q of the strategy in all states, shared by all analyses below
+                evaluation = evaluate_strategy_globals(optimal_strategy, globals)
+                q_true = evaluation.q_true
+                
                 # Pre-shock period analysis
                 periods_length_pre = globals.cycle_length[i_session]
                 visited_states_pre = np.zeros(globals.num_periods, dtype=np.int32)
@@ -113,7 +117,8 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                     optimal_strategy,
                     periods_length_pre,
                     visited_states_pre[:periods_length_pre],
-                    globals
+                    globals,
+                    evaluation
                 )
                 
                 # Compute Q gap
@@ -125,7 +130,8 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                     optimal_strategy,
                     periods_length_pre,
                     globals.cycle_states[:periods_length_pre, i_session],
-                    globals
+                    globals,
+                    evaluation
                 )
                 
                 # IR analysis with deviation to i_price
@@ -139,7 +145,6 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                             dynamic_br_prices = np.zeros((globals.num_shock_periods_print, globals.num_agents), dtype=np.int32)
                             opt_strat_q = np.zeros((globals.num_shock_periods_print, globals.num_agents))
                             dynamic_br_q = np.zeros((globals.num_shock_periods_print, globals.num_agents))
-                            deviation_q = np.zeros(globals.num_agents)
                             avg_post_prices = np.zeros(globals.num_agents)
                             avg_post_profits = np.zeros(globals.num_agents)
                             visited_states = np.zeros(globals.num_periods, dtype=np.int32)
@@ -147,15 +152,7 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                             # Find prices and Qs in deviation period n. 1
                             p_prime = optimal_strategy[visited_states_pre[i_state_pre], :].copy()
                             p_prime[i_agent] = i_price
-                            for j_agent in range(globals.num_agents):
-                                deviation_q[j_agent], _, _, _ = compute_q_cell(
-                                    optimal_strategy,
-                                    visited_states_pre[i_state_pre],
-                                    p_prime[j_agent],
-                                    j_agent,
-                                    globals.delta,
-                                    globals
-                                )
+                            deviation_q = q_true[visited_states_pre[i_state_pre], p_prime, np.arange(globals.num_agents)]
                             
                             # Computing individual IRs
                             (
@@ -197,19 +194,15 @@ def compute_detailed_analysis(i_experiment: int, globals: GlobalVars) -> None:
                                             i_period_state,
                                             j_agent,
                                             globals.delta,
-                                            globals
+                                            globals,
+                                            evaluation
                                         )
                                     )
                                     
                                     # Find prices and Qs according to the strategy at convergence
-                                    opt_strat_q[i_period, j_agent], _, _, _ = compute_q_cell(
-                                        optimal_strategy,
-                                        i_period_state,
-                                        optimal_strategy[i_period_state, j_agent],
-                                        j_agent,
-                                        globals.delta,
-                                        globals
-                                    )
+                                    opt_strat_q[i_period, j_agent] = q_true[
+                                        i_period_state, optimal_strategy[i_period_state, j_agent], j_agent
+                                    ]
                                     
                                     # Find StaticBR prices and PIs
                                     static_br_prices[i_period, j_agent], _ = compute_static_best_response(
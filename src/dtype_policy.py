@@ -9,6 +9,16 @@ import numpy as np
 # Matches Fortran REAL(KIND=8) / double precision
 DTYPE = np.float64
 
+# Storage dtype of the Q matrices for each precision policy (``precision`` in
+# the config). Q updates, Boltzmann weights and the profit and transition
+# tables are always computed in DTYPE; under 'mixed' only the stored Q
+# values are rounded to single precision.
+PRECISION_POLICIES = {
+    'double': np.float64,
+    'mixed': np.float32,
+}
+DEFAULT_PRECISION = 'double'
+
 # Integer types
 INT_DTYPE = np.int64
 INT32_DTYPE = np.int32
@@ -17,6 +27,23 @@ INT32_DTYPE = np.int32
 EPS = np.finfo(DTYPE).eps
 SMALL_NUMBER = 1e-14
 
+def q_dtype(precision: str = None) -> np.dtype:
+    """
+    Storage dtype of the Q matrices under a precision policy.
+    
+    Args:
+        precision: Policy name, 'double' or 'mixed' (default: DEFAULT_PRECISION)
+        
+    Returns:
+        NumPy dtype of the stored Q values
+    """
+    if precision is None:
+        precision = DEFAULT_PRECISION
+    if precision not in PRECISION_POLICIES:
+        raise ValueError(f"Unknown precision '{precision}'. Must be one of {tuple(PRECISION_POLICIES)}")
+    return np.dtype(PRECISION_POLICIES[precision])
+
+
 def ensure_dtype(array: np.ndarray, dtype=None) -> np.ndarray:
     """
     Ensure array has the correct dtype.
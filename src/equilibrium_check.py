@@ -1,7 +1,7 @@
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from globals import GlobalVars
-from QL_routines import compute_q_cell
+from policy_evaluation import PolicyEvaluation, evaluate_strategy_globals
 
 def compute_eq_check(i_experiment: int, globals: GlobalVars) -> None:
     """
@@ -242,7 +242,8 @@ def compute_eq_check_session(
     optimal_strategy: np.ndarray,
     cycle_length_session: int,
     cycle_states_session: np.ndarray,
-    globals: GlobalVars
+    globals: GlobalVars,
+    evaluation: Optional[PolicyEvaluation] = None
 ) -> Tuple[
     np.ndarray, np.ndarray, np.ndarray,
     float, float, float,
@@ -256,6 +257,7 @@ def compute_eq_check_session(
     - optimal_strategy: strategy for all agents
     - cycle_length_session: length of the replication's path (i.e., state cycle)
     - cycle_states_session: replication's path (i.e., state cycle)
+    - evaluation: policy evaluation of optimal_strategy, computed if not given
     
     Returns:
     - freq_br_all: % of all states in which at least one agent is best responding
@@ -272,26 +274,14 @@ def compute_eq_check_session(
     - flag_eq_off_path: = 1: in all off path states both agents are best responding
     """
     # 1. For each agent A and each state S, check whether A is best responding in state S
-    is_best_reply = np.zeros((globals.num_states, globals.num_agents), dtype=np.int32)
-    
-    for i_state in range(globals.num_states):
-        # Compute state value function for OptimalStrategy in i_state, for all prices and agents
-        for i_agent in range(globals.num_agents):
-            state_value_function = np.zeros(globals.num_prices)
-            
-            for i_price in range(globals.num_prices):
-                state_value_function[i_price], _, _ = compute_q_cell(
-                    optimal_strategy, i_state, i_price, i_agent, globals.delta, globals
-                )
-            
-            max_state_value_function = np.max(state_value_function)
-            strategy_price = optimal_strategy[i_state, i_agent]
-            improved_prices = np.where(
-                np.abs(state_value_function - max_state_value_function) <= 0.0
-            )[0]
-            
-            if strategy_price in improved_prices:
-                is_best_reply[i_state, i_agent] = 1
+    if evaluation is None:
+        evaluation = evaluate_strategy_globals(optimal_strategy, globals)
+    state_value_function = evaluation.q_true
+    max_state_value_function = np.max(state_value_function, axis=1)
+    strategy_value = np.take_along_axis(
+        state_value_function, optimal_strategy[:, None, :], axis=1
+    )[:, 0, :]
+    is_best_reply = (strategy_value == max_state_value_function).astype(np.int32)
     
     # 2. For each agent A, compute statistics
     num_states_br_all = np.zeros(globals.num_agents, dtype=np.int32)
@@ -314,18 +304,11 @@ def compute_eq_check_session(
             flag_br_off_path[i_agent] = 1
     
     # 3. Simultaneously for all agents, compute statistics
-    num_states_eq_all = 0
-    num_states_eq_on_path = 0
-    num_states_eq_off_path = 0
-    
-    for i_state in range(globals.num_states):
-        if np.all(is_best_reply[i_state, :] == 1):
-            num_states_eq_all += 1
-            
-            if np.any(cycle_states_session == i_state):
-                num_states_eq_on_path += 1
-            else:
-                num_states_eq_off_path += 1
+    is_eq = np.all(is_best_reply == 1, axis=1)
+    on_path = np.isin(np.arange(globals.num_states), cycle_states_session)
+    num_states_eq_all = int(np.sum(is_eq))
+    num_states_eq_on_path = int(np.sum(is_eq & on_path))
+    num_states_eq_off_path = num_states_eq_all - num_states_eq_on_path
     
     flag_eq_all = 0
     flag_eq_on_path = 0
@@ -0,0 +1,334 @@
+"""
+Adaptive grid refinement for parameter sweeps.
+
+Over most of the (alpha, exploration, delta) grid the outcome barely
+changes, and the structure worth resolving sits on narrow ridges of profit
+gain or convergence rate. ``run_adaptive_sweep`` starts from the coarse grid
+of a grid file and spends a fixed budget of grid points where the chosen
+metric changes fastest:
+
+- Neighbouring points along each numeric axis are joined by edges, scored
+  by the absolute difference of the metric at their two ends.
+- Each round bisects the highest-scoring edges and runs their midpoints on
+  the sweep executor.
+- Refinement stops when the budget is spent, or when no edge scores above
+  ``tolerance`` while still being splittable above ``min_spacing`` (a
+  fraction of the axis's coarse range).
+
+Axes with a single value or non-numeric values (e.g. ``q_init_strategy``)
+are never refined. Every point's record carries its ``refinement_round``
+(0 for the coarse grid) and its metrics, so the sample history is kept in
+the sweep journal and summary, from which ``aggregate_sweep`` builds its
+tables. Refinement is deterministic given the metrics, so a resumed
+adaptive sweep proposes the journaled points again and skips them.
+"""
+
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .sweep import (SWEEP_EXECUTORS, SWEEP_METRICS, SweepWorkerPool, create_base_config,
+                        load_parameter_grid, open_sweep_dir, run_sweep_points, write_sweep_summary)
+except ImportError:
+    from sweep import (SWEEP_EXECUTORS, SWEEP_METRICS, SweepWorkerPool, create_base_config,
+                       load_parameter_grid, open_sweep_dir, run_sweep_points, write_sweep_summary)
+
+# Shortest edge that is still bisected, as a fraction of the axis's coarse range
+DEFAULT_MIN_SPACING = 1 / 64
+
+Point = Tuple[Any, ...]
+Edge = Tuple[Point, Point, int]
+
+
+def _native(value: Any) -> Any:
+    """Plain Python value of a NumPy scalar (CSV grids)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class AdaptiveGrid:
+    """
+    Sample points of an adaptive sweep and the edges between neighbours.
+
+    Points are tuples of parameter values in the order of ``names``. An
+    edge ``(a, b, axis)`` joins two points that differ only in coordinate
+    ``axis``, with no sampled point between them.
+    """
+
+    def __init__(self, combinations: List[Dict[str, Any]], min_spacing: float = DEFAULT_MIN_SPACING,
+                 tolerance: float = 0.0):
+        if not combinations:
+            raise ValueError("Parameter grid is empty")
+        self.names = list(combinations[0])
+        self.min_spacing = min_spacing
+        self.tolerance = tolerance
+        self.points: List[Point] = list(dict.fromkeys(
+            tuple(_native(combo[name]) for name in self.names) for combo in combinations
+        ))
+        self._order = {point: i for i, point in enumerate(self.points)}
+        self.metric: Dict[Point, Optional[float]] = {}
+
+        # Numeric axes with more than one value are refined; integer axes stay integer
+        self.axes: Dict[int, Tuple[float, float, bool]] = {}
+        for i in range(len(self.names)):
+            values = {point[i] for point in self.points}
+            if len(values) > 1 and all(_is_number(v) for v in values):
+                self.axes[i] = (min(values), max(values), all(isinstance(v, int) for v in values))
+
+        self.edges: Set[Edge] = set()
+        for i in self.axes:
+            lines = defaultdict(list)
+            for point in self.points:
+                lines[point[:i] + point[i + 1:]].append(point)
+            for line in lines.values():
+                line.sort(key=lambda point: point[i])
+                self.edges.update((a, b, i) for a, b in zip(line, line[1:]))
+
+    @property
+    def refined_axes(self) -> List[str]:
+        """Names of the axes that are refined."""
+        return [self.names[i] for i in sorted(self.axes)]
+
+    def params(self, point: Point) -> Dict[str, Any]:
+        """Parameter overrides of a point."""
+        return dict(zip(self.names, point))
+
+    def record(self, point: Point, value: Optional[float]) -> None:
+        """Set the metric of a point (None if its run failed or the metric is undefined)."""
+        self.metric[point] = None if value is None or not np.isfinite(value) else float(value)
+
+    def score(self, edge: Edge) -> Optional[float]:
+        """Absolute change of the metric along an edge (None until both ends are known)."""
+        a, b, _ = edge
+        value_a, value_b = self.metric.get(a), self.metric.get(b)
+        if value_a is None or value_b is None:
+            return None
+        return abs(value_b - value_a)
+
+    def length(self, edge: Edge) -> float:
+        """Length of an edge as a fraction of its axis's coarse range."""
+        a, b, i = edge
+        low, high, _ = self.axes[i]
+        return (b[i] - a[i]) / (high - low)
+
+    def midpoint(self, edge: Edge) -> Optional[Point]:
+        """Point halfway along an edge, or None if the edge cannot be split."""
+        a, b, i = edge
+        if self.length(edge) / 2 < self.min_spacing:
+            return None
+        if self.axes[i][2]:
+            value = (a[i] + b[i]) // 2
+            if value in (a[i], b[i]):
+                return None
+        else:
+            value = (a[i] + b[i]) / 2
+        return a[:i] + (value,) + a[i + 1:]
+
+    def max_score(self) -> Optional[float]:
+        """Highest edge score, or None if no edge can be scored."""
+        scores = [s for s in map(self.score, self.edges) if s is not None]
+        return max(scores) if scores else None
+
+    def propose(self, n_points: int) -> List[Point]:
+        """
+        Bisect the highest-scoring edges.
+
+        Edges are ranked by score, then by length, then by the order their
+        points were sampled in.
+
+        Args:
+            n_points: Maximum number of new points
+
+        Returns:
+            New points to sample (empty when refinement has converged)
+        """
+        candidates = []
+        for edge in self.edges:
+            score = self.score(edge)
+            if score is None or score <= self.tolerance:
+                continue
+            mid = self.midpoint(edge)
+            if mid is not None:
+                candidates.append((-score, -self.length(edge), self._order[edge[0]], edge[2], edge, mid))
+        candidates.sort(key=lambda c: c[:4])
+
+        new_points = []
+        for *_, edge, mid in candidates:
+            if len(new_points) >= n_points:
+                break
+            a, b, i = edge
+            self.edges.remove(edge)
+            self.edges.update([(a, mid, i), (mid, b, i)])
+            if mid in self._order:
+                # Already sampled on another line
+                continue
+            self._order[mid] = len(self.points)
+            self.points.append(mid)
+            new_points.append(mid)
+        return new_points
+
+
+def run_adaptive_sweep(grid_path: str, base_config_path: str, output_dir: str,
+                       metric: str = 'profit_gain', budget: int = 64,
+                       batch_size: Optional[int] = None,
+                       min_spacing: float = DEFAULT_MIN_SPACING, tolerance: float = 0.0,
+                       n_jobs: int = 1, timeout: int = 300, executor: str = 'pool',
+                       pool: Optional[SweepWorkerPool] = None,
+                       resume: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run a parameter sweep that refines its grid where the metric changes fastest.
+
+    Args:
+        grid_path: Path to the coarse parameter grid file
+        base_config_path: Path to base configuration
+        output_dir: Output directory for all runs
+        metric: Metric to refine on, one of ``SWEEP_METRICS``
+        budget: Total number of grid points to run, coarse grid included
+        batch_size: Points added per refinement round (default: ``n_jobs``)
+        min_spacing: Shortest edge that is still bisected, as a fraction of
+            the axis's coarse range
+        tolerance: Metric change below which an edge is not refined
+        n_jobs: Number of parallel jobs
+        timeout: Timeout per simulation in seconds
+        executor: 'pool' or 'subprocess'
+        pool: Running SweepWorkerPool to reuse with the 'pool' executor
+        resume: Sweep directory to resume, or 'latest'
+
+    Returns:
+        Dictionary with sweep results and metadata; ``adaptive`` holds the
+        refinement rounds and why refinement stopped
+    """
+    if executor not in SWEEP_EXECUTORS:
+        raise ValueError(f"Unknown sweep executor '{executor}'. Must be one of {SWEEP_EXECUTORS}")
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown sweep metric '{metric}'. Must be one of {SWEEP_METRICS}")
+
+    print(f"Loading coarse parameter grid from: {grid_path}")
+    grid = AdaptiveGrid(load_parameter_grid(grid_path), min_spacing, tolerance)
+    if len(grid.points) > budget:
+        raise ValueError(f"Budget of {budget} points is smaller than the coarse grid ({len(grid.points)} points)")
+    if not grid.axes:
+        raise ValueError("Grid has no numeric axis with more than one value to refine")
+    batch_size = batch_size or max(1, n_jobs)
+
+    print(f"Refining {grid.refined_axes} on '{metric}' with a budget of {budget} points "
+          f"({len(grid.points)} coarse, {batch_size} per round)")
+
+    sweep_dir, timestamp = open_sweep_dir(output_dir, resume)
+
+    grid_metadata = {
+        'timestamp': timestamp,
+        'grid_path': str(grid_path),
+        'base_config_path': str(base_config_path),
+        'n_combinations': len(grid.points),
+        'n_jobs': n_jobs,
+        'timeout': timeout,
+        'executor': executor,
+        'adaptive': True,
+        'metric': metric,
+        'budget': budget,
+        'batch_size': batch_size,
+        'min_spacing': min_spacing,
+        'tolerance': tolerance
+    }
+
+    with open(sweep_dir / "grid_metadata.json", 'w') as f:
+        json.dump(grid_metadata, f, indent=2)
+
+    start_time = time.time()
+    results: List[Dict[str, Any]] = []
+    rounds = []
+    n_resumed = 0
+    owns_pool = executor == 'pool' and pool is None
+    if owns_pool:
+        pool = SweepWorkerPool(n_jobs, timeout)
+    try:
+        new_points = list(grid.points)
+        while True:
+            round_index = len(rounds)
+            points = []
+            for point in new_points:
+                run_id = f"{len(results) + len(points):04d}"
+                points.append((create_base_config(base_config_path, grid.params(point)), run_id))
+            annotate = {run_id: {'refinement_round': round_index} for _, run_id in points}
+            round_results, round_resumed = run_sweep_points(points, sweep_dir, n_jobs, timeout,
+                                                            executor, pool, annotate)
+            n_resumed += round_resumed
+            results.extend(round_results)
+
+            by_run_id = {r['run_id']: r for r in round_results}
+            for point, (_, run_id) in zip(new_points, points):
+                result = by_run_id[run_id]
+                grid.record(point, result.get('metrics', {}).get(metric) if result['status'] == 'success' else None)
+
+            max_score = grid.max_score()
+            rounds.append({'round': round_index, 'n_points': len(new_points), 'max_score': max_score})
+            print(f"Round {round_index}: {len(new_points)} points, largest '{metric}' change "
+                  f"{'n/a' if max_score is None else f'{max_score:.4g}'}")
+
+            remaining = budget - len(results)
+            if remaining <= 0:
+                stop_reason = 'budget'
+                break
+            new_points = grid.propose(min(batch_size, remaining))
+            if not new_points:
+                stop_reason = 'converged'
+                break
+    finally:
+        if owns_pool:
+            pool.close()
+
+    print(f"Refinement stopped ({stop_reason}) after {len(rounds)} rounds")
+    return write_sweep_summary(
+        sweep_dir, grid_metadata, results, n_resumed, time.time() - start_time,
+        adaptive={
+            'metric': metric,
+            'axes': grid.refined_axes,
+            'rounds': rounds,
+            'stop_reason': stop_reason
+        }
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run an adaptive parameter sweep")
+    parser.add_argument("--grid", required=True, help="Path to the coarse parameter grid file")
+    parser.add_argument("--config", required=True, help="Path to base configuration file")
+    parser.add_argument("--output", default="runs", help="Output directory")
+    parser.add_argument("--metric", choices=SWEEP_METRICS, default="profit_gain",
+                       help="Metric whose changes drive the refinement")
+    parser.add_argument("--budget", type=int, default=64, help="Total number of grid points to run")
+    parser.add_argument("--batch-size", type=int, help="Points added per refinement round")
+    parser.add_argument("--njobs", type=int, default=1, help="Number of parallel jobs")
+    parser.add_argument("--timeout", type=int, default=300, help="Timeout per simulation (seconds)")
+    parser.add_argument("--executor", choices=SWEEP_EXECUTORS, default="pool",
+                       help="Run grid points on warm worker processes or as subprocesses")
+    parser.add_argument("--resume", nargs="?", const="latest",
+                       help="Resume a sweep directory (default: the latest in --output)")
+
+    args = parser.parse_args()
+
+    result = run_adaptive_sweep(
+        grid_path=args.grid,
+        base_config_path=args.config,
+        output_dir=args.output,
+        metric=args.metric,
+        budget=args.budget,
+        batch_size=args.batch_size,
+        n_jobs=args.njobs,
+        timeout=args.timeout,
+        executor=args.executor,
+        resume=args.resume
+    )
+
+    exit(0 if result['failed_runs'] == 0 else 1)
@@ -6,6 +6,7 @@ Processes parameter sweep outputs:
 - Generates Table 2 compatible grid_summary.csv/.tex
 - Creates visualization of parameter effects
 - Provides statistical analysis of parameter sensitivity
+- Tabulates the sample history of adaptive sweeps (refinement_history.csv/.tex)
 """
 
 import pandas as pd
@@ -16,11 +17,21 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any, Union
 import warnings
 
+# Handle imports for both package and standalone usage
+try:
+    from .sweep import SWEEP_METRICS, load_sweep_journal
+except ImportError:
+    from sweep import SWEEP_METRICS, load_sweep_journal
+
 
 def load_sweep_results(sweep_dir: str) -> Dict[str, Any]:
     """
     Load parameter sweep results from directory.
     
+    A sweep that is still running or was interrupted has no
+    ``sweep_summary.json`` yet; its results are then read from the sweep
+    journal and the summary is marked ``partial``.
+    
     Args:
         sweep_dir: Directory containing sweep results
         
@@ -31,11 +42,21 @@ def load_sweep_results(sweep_dir: str) -> Dict[str, Any]:
     
     # Load sweep summary
     summary_path = sweep_path / "sweep_summary.json"
-    if not summary_path.exists():
-        raise FileNotFoundError(f"Sweep summary not found: {summary_path}")
-    
-    with open(summary_path, 'r') as f:
-        sweep_summary = json.load(f)
+    if summary_path.exists():
+        with open(summary_path, 'r') as f:
+            sweep_summary = json.load(f)
+    else:
+        journal = load_sweep_journal(sweep_path)
+        if not journal:
+            raise FileNotFoundError(f"Sweep summary not found: {summary_path}")
+        results = sorted(journal.values(), key=lambda r: r['run_id'])
+        sweep_summary = {
+            'partial': True,
+            'total_runs': len(results),
+            'successful_runs': sum(r['status'] == 'success' for r in results),
+            'failed_runs': sum(r['status'] != 'success' for r in results),
+            'results': results
+        }
     
     return {
         'sweep_summary': sweep_summary,
@@ -70,8 +91,11 @@ def extract_simulation_results(sweep_data: Dict[str, Any]) -> pd.DataFrame:
                 'status': result['status'],
                 'elapsed_time': result['elapsed_time'],
                 **params,  # Parameter values
-                **sim_results  # Simulation results
+                **sim_results,  # Simulation results
+                **result.get('metrics', {})  # Outcome metrics from the run log
             }
+            if 'refinement_round' in result:
+                row['refinement_round'] = result['refinement_round']
             
             rows.append(row)
     
@@ -99,7 +123,7 @@ def aggregate_by_parameters(df: pd.DataFrame, param_columns: List[str]) -> pd.Da
     # Define metrics to aggregate
     metric_columns = [
         'convergence_rate', 'avg_convergence_time', 'nash_price', 
-        'mean_profit', 'cooperative_gap'
+        'mean_profit', 'profit_gain', 'nash_gap', 'cooperative_gap'
     ]
     
     # Filter to available metrics
@@ -183,6 +207,41 @@ def generate_grid_summary_table(df: pd.DataFrame, param_columns: List[str], outp
     return str(csv_path), str(tex_path)
 
 
+def generate_refinement_table(df: pd.DataFrame, param_columns: List[str], output_dir: str) -> Tuple[str, str]:
+    """
+    Tabulate the sample history of an adaptive sweep.
+    
+    One row per sampled point, in the order the refinement rounds added
+    them, with the varying parameters and the outcome metrics.
+    
+    Args:
+        df: DataFrame with individual run results (with ``refinement_round``)
+        param_columns: List of parameter column names
+        output_dir: Output directory
+        
+    Returns:
+        Tuple of (CSV path, LaTeX path)
+    """
+    # Only the parameters that were swept
+    axes = [col for col in df.columns if col in param_columns and df[col].nunique(dropna=False) > 1]
+    metrics = [col for col in SWEEP_METRICS if col in df.columns]
+    history = df[['run_id', 'refinement_round'] + axes + metrics].sort_values(['refinement_round', 'run_id'])
+    
+    os.makedirs(Path(output_dir) / "tables", exist_ok=True)
+    csv_path = Path(output_dir) / "tables" / "refinement_history.csv"
+    history.to_csv(csv_path, index=False)
+    
+    tex_path = Path(output_dir) / "tables" / "refinement_history.tex"
+    with open(tex_path, 'w') as f:
+        f.write(generate_grid_latex_table(history.round(4)))
+    
+    print(f"✓ Refinement history table generated:")
+    print(f"  CSV: {csv_path}")
+    print(f"  LaTeX: {tex_path}")
+    
+    return str(csv_path), str(tex_path)
+
+
 def generate_grid_latex_table(df: pd.DataFrame) -> str:
     """
     Generate LaTeX table for grid summary.
@@ -255,15 +314,22 @@ def aggregate_parameter_sweep(sweep_dir: str, output_dir: str) -> Dict[str, Any]
     
     print(f"Found {len(results_df)} results with parameters: {param_columns}")
     
+    outputs = {}
+    
+    # Sample history of an adaptive sweep
+    if 'refinement_round' in results_df.columns:
+        csv_path, tex_path = generate_refinement_table(results_df, param_columns, output_dir)
+        outputs['refinement_history_csv'] = csv_path
+        outputs['refinement_history_tex'] = tex_path
+    
     # Aggregate by parameters
     agg_df = aggregate_by_parameters(results_df, param_columns)
     
     if agg_df.empty:
         warnings.warn("No successful runs to aggregate")
-        return {'error': 'No successful runs found'}
+        return {'error': 'No successful runs found', **outputs}
     
     # Generate outputs
-    outputs = {}
     
     # Grid summary table
     csv_path, tex_path = generate_grid_summary_table(agg_df, param_columns, output_dir)
@@ -3,20 +3,38 @@ Parameter Sweep and Batch Experiments for Calvano Q-learning.
 
 Implements parallel parameter grid search:
 - Reads JSON/CSV grid configurations
-- Uses joblib for parallel execution
-- Calls 'calvano run --mode simulate' for each parameter set
+- Runs every parameter set on a persistent pool of warm worker processes
+  ('pool' executor) or as its own 'calvano run --mode simulate' subprocess
+  ('subprocess' executor, uses joblib for parallel execution)
 - Organizes results in runs/grid_<timestamp>/ structure
 - Supports multi-dimensional parameter sweeps
+- Journals every finished grid point so interrupted sweeps can be resumed
+- Restores grid points whose simulation is in the result cache instead of
+  running them
+- Stores outcome metrics (convergence rate, profit gain, ...) computed from
+  the run log with every successful grid point
+
+Pool workers import the simulation stack once and then run one grid point
+after another, returning result records through a pipe instead of through
+``summary.json`` on disk. A worker that exceeds the timeout or dies is
+terminated and replaced, so one bad grid point cannot stall the sweep.
 """
 
 import pandas as pd
 import numpy as np
+import contextlib
+import hashlib
+import io
 import json
+import multiprocessing as mp
 import os
 import sys
 import subprocess
+import traceback
+from collections import deque
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Any, Union
 import warnings
 import time
 from datetime import datetime
@@ -30,6 +48,21 @@ except ImportError:
     JOBLIB_AVAILABLE = False
     warnings.warn("joblib not available, running in sequential mode")
 
+SWEEP_EXECUTORS = ('pool', 'subprocess')
+
+SRC_DIR = str(Path(__file__).resolve().parent.parent)
+
+# Append-only record of finished grid points, one JSON object per line
+SWEEP_JOURNAL_FILE = "sweep_journal.jsonl"
+
+# Outcome metrics stored with every successful grid point
+SWEEP_METRICS = ('convergence_rate', 'avg_convergence_time', 'mean_profit',
+                 'profit_gain', 'nash_gap', 'cooperative_gap')
+
+# Run-log columns the metrics are computed from
+METRIC_RUN_COLUMNS = ('overall_converged', 'final_prices', 'final_profits', 'nash_distance',
+                      'coop_distance', 'convergence_time', 'final_volatility')
+
 
 def load_parameter_grid(grid_path: str) -> List[Dict[str, Any]]:
     """
@@ -127,27 +160,130 @@ def create_base_config(base_config_path: str, param_overrides: Dict[str, Any]) -
     return config
 
 
-def run_single_simulation(config: Dict[str, Any], output_dir: str, run_id: str) -> Dict[str, Any]:
+def _json_default(obj):
+    """JSON encoder fallback for NumPy scalars (e.g. from CSV grids)."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
     """
-    Run a single simulation with given configuration.
+    Content hash of a merged configuration.
+    
+    Key order does not matter; values are compared through their JSON form.
     
     Args:
         config: Configuration dictionary
-        output_dir: Base output directory
-        run_id: Unique identifier for this run
         
     Returns:
-        Result dictionary with metadata and paths
+        Hex SHA-256 digest
+    """
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def append_sweep_journal(sweep_dir: Union[str, Path], record: Dict[str, Any]) -> None:
     """
-    # Create run-specific directory
+    Append the record of a finished grid point to the sweep journal.
+    
+    The line is flushed to disk before returning, so a crash loses at most
+    the grid point that was being written.
+    
+    Args:
+        sweep_dir: Sweep directory
+        record: Result record (keyed by the hash of its config)
+    """
+    entry = dict(record, config_hash=config_hash(record['config']))
+    line = json.dumps(entry, default=_json_default) + "\n"
+    journal_path = Path(sweep_dir) / SWEEP_JOURNAL_FILE
+    if journal_path.exists() and journal_path.stat().st_size > 0:
+        # Start a new line after a record truncated by a crash
+        with open(journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+    with open(journal_path, 'a') as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_sweep_journal(sweep_dir: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Latest journaled record of every grid point of a sweep.
+    
+    A truncated last line (the process died while writing it) is ignored.
+    
+    Args:
+        sweep_dir: Sweep directory
+        
+    Returns:
+        Records keyed by config hash (empty if there is no journal)
+    """
+    journal_path = Path(sweep_dir) / SWEEP_JOURNAL_FILE
+    records: Dict[str, Dict[str, Any]] = {}
+    if not journal_path.exists():
+        return records
+    with open(journal_path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[entry['config_hash']] = entry
+    return records
+
+
+def find_latest_sweep(output_dir: Union[str, Path]) -> Optional[Path]:
+    """Most recent ``grid_<timestamp>`` directory under ``output_dir``."""
+    sweep_dirs = sorted(Path(output_dir).glob("grid_*"))
+    sweep_dirs = [d for d in sweep_dirs if d.is_dir()]
+    return sweep_dirs[-1] if sweep_dirs else None
+
+
+def _prepare_run_dir(config: Dict[str, Any], output_dir: str, run_id: str) -> Path:
+    """Create the directory of one run and save its configuration."""
     run_dir = Path(output_dir) / f"run_{run_id}"
     run_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save configuration
-    config_path = run_dir / "config.json"
-    with open(config_path, 'w') as f:
+    with open(run_dir / "config.json", 'w') as f:
         json.dump(config, f, indent=2)
     
+    return run_dir
+
+
+def _run_record(config: Dict[str, Any], run_dir: Path, run_id: str, status: str,
+                elapsed_time: float, error_msg: Optional[str]) -> Dict[str, Any]:
+    """Result record of one run, as collected in ``sweep_summary.json``."""
+    return {
+        'run_id': run_id,
+        'config': config,
+        'status': status,
+        'elapsed_time': elapsed_time,
+        'output_dir': str(run_dir),
+        'error_msg': error_msg
+    }
+
+
+def run_single_simulation(config: Dict[str, Any], output_dir: str, run_id: str,
+                          timeout: Optional[float] = 300) -> Dict[str, Any]:
+    """
+    Run a single simulation with given configuration in its own subprocess.
+    
+    Args:
+        config: Configuration dictionary
+        output_dir: Base output directory
+        run_id: Unique identifier for this run
+        timeout: Timeout in seconds (None: no limit)
+        
+    Returns:
+        Result dictionary with metadata and paths
+    """
+    # Create run-specific directory and save configuration
+    run_dir = _prepare_run_dir(config, output_dir, run_id)
+    config_path = run_dir / "config.json"
+    
     # Prepare calvano command
     calvano_script = Path(__file__).parent.parent.parent / "bin" / "calvano.py"
     
@@ -166,7 +302,7 @@ def run_single_simulation(config: Dict[str, Any], output_dir: str, run_id: str)
             cmd, 
             capture_output=True, 
             text=True,
-            timeout=300  # 5 minute timeout
+            timeout=timeout
         )
         
         elapsed_time = time.time() - start_time
@@ -189,14 +325,7 @@ def run_single_simulation(config: Dict[str, Any], output_dir: str, run_id: str)
         error_msg = str(e)
     
     # Collect results
-    result_dict = {
-        'run_id': run_id,
-        'config': config,
-        'status': status,
-        'elapsed_time': elapsed_time,
-        'output_dir': str(run_dir),
-        'error_msg': error_msg
-    }
+    result_dict = _run_record(config, run_dir, run_id, status, elapsed_time, error_msg)
     
     # Try to load simulation results if successful
     if status == "success":
@@ -212,89 +341,411 @@ def run_single_simulation(config: Dict[str, Any], output_dir: str, run_id: str)
     return result_dict
 
 
-def run_parameter_sweep(grid_path: str, base_config_path: str, output_dir: str, 
-                       n_jobs: int = 1, timeout: int = 300) -> Dict[str, Any]:
+def _import_main():
+    """Import the simulation entry point (``src/main.py``) into this process."""
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    import main
+    return main
+
+
+def run_single_simulation_in_process(config: Dict[str, Any], output_dir: str, run_id: str) -> Dict[str, Any]:
     """
-    Run parameter sweep with parallel execution.
+    Run a single simulation with given configuration in the current process.
+    
+    Does the work of ``calvano run --mode simulate`` without starting an
+    interpreter; the summary comes back in the record rather than being
+    read from ``summary.json``.
     
     Args:
-        grid_path: Path to parameter grid file
-        base_config_path: Path to base configuration
-        output_dir: Output directory for all runs
-        n_jobs: Number of parallel jobs
-        timeout: Timeout per simulation in seconds
+        config: Configuration dictionary
+        output_dir: Base output directory
+        run_id: Unique identifier for this run
         
     Returns:
-        Dictionary with sweep results and metadata
+        Result dictionary with metadata and paths
     """
-    print(f"Loading parameter grid from: {grid_path}")
-    param_combinations = load_parameter_grid(grid_path)
+    run_dir = _prepare_run_dir(config, output_dir, run_id)
+    start_time = time.time()
     
-    print(f"Found {len(param_combinations)} parameter combinations")
-    print(f"Running with {n_jobs} parallel jobs")
+    try:
+        main = _import_main()
+        # Progress output would interleave across workers; the subprocess mode captures it too
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_results = main.run_simulation_mode(dict(config), str(run_dir))
+        result_dict = _run_record(config, run_dir, run_id, "success", time.time() - start_time, None)
+        result_dict['simulation_results'] = main.run_log_summary(len(run_results))
+    except Exception:
+        result_dict = _run_record(config, run_dir, run_id, "failed", time.time() - start_time,
+                                  traceback.format_exc())
+    
+    return result_dict
+
+
+def restore_cached_simulation(config: Dict[str, Any], output_dir: str, run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Result record of a grid point whose simulation is in the result cache.
+    
+    The cached run log is copied into the run directory, so the point looks
+    exactly as if it had been run.
+    
+    Args:
+        config: Configuration dictionary
+        output_dir: Base output directory
+        run_id: Unique identifier for this run
+        
+    Returns:
+        Result dictionary, or None on a cache miss
+    """
+    start_time = time.time()
+    run_dir = _prepare_run_dir(config, output_dir, run_id)
+    try:
+        summary = _import_main().restore_cached_simulation(config, str(run_dir))
+    except Exception as e:
+        warnings.warn(f"Result cache lookup failed for {run_id}: {e}")
+        return None
+    if summary is None:
+        return None
+    result_dict = _run_record(config, run_dir, run_id, "success", time.time() - start_time, None)
+    result_dict['simulation_results'] = summary
+    result_dict['cached'] = True
+    return result_dict
+
+
+def _pool_worker(conn) -> None:
+    """Worker loop: import the simulation stack once, then run grid points until told to stop."""
+    _import_main()
+    conn.send('ready')
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        conn.send(run_single_simulation_in_process(*task))
+
+
+class SweepWorkerPool:
+    """
+    Persistent pool of warm processes that run grid points in-process.
+    
+    Each worker serves one grid point at a time over its own pipe, so a
+    grid point that runs past ``timeout`` or crashes its worker can be
+    attributed, the worker terminated and a fresh one started in its place.
+    The pool can be reused across sweeps.
+    """
+    
+    def __init__(self, n_workers: int = 1, timeout: Optional[float] = 300):
+        self.n_workers = max(1, int(n_workers))
+        self.timeout = timeout
+        self._context = mp.get_context()
+        self._workers: List[Tuple[Any, Any]] = []
+    
+    def _spawn(self) -> Tuple[Any, Any]:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_pool_worker, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+    
+    @staticmethod
+    def _await_ready(worker: Tuple[Any, Any]) -> None:
+        """Wait until a worker has finished its imports, so timeouts only count run time."""
+        try:
+            worker[1].recv()
+        except EOFError:
+            raise RuntimeError(f"Sweep worker failed to start (exit code {worker[0].exitcode})")
+    
+    def _replace(self, worker: Tuple[Any, Any]) -> Tuple[Any, Any]:
+        """Terminate a worker and start a new one in its place."""
+        process, conn = worker
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        conn.close()
+        self._workers.remove(worker)
+        new_worker = self._spawn()
+        self._workers.append(new_worker)
+        self._await_ready(new_worker)
+        return new_worker
+    
+    def start(self) -> 'SweepWorkerPool':
+        """Start the missing workers and wait for them to be warm."""
+        new_workers = [self._spawn() for _ in range(self.n_workers - len(self._workers))]
+        self._workers.extend(new_workers)
+        for worker in new_workers:
+            self._await_ready(worker)
+        return self
+    
+    def close(self) -> None:
+        """Stop all workers."""
+        for process, conn in self._workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            conn.close()
+        self._workers = []
+    
+    def __enter__(self) -> 'SweepWorkerPool':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
+    def imap_unordered(self, tasks: Iterable[Tuple[Dict[str, Any], str, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Run grid points and yield their result records as they finish.
+        
+        Args:
+            tasks: Tuples (config, output_dir, run_id)
+            
+        Yields:
+            Result records in completion order
+        """
+        self.start()
+        pending = deque(tasks)
+        idle = list(self._workers)
+        busy: Dict[Any, Tuple[Tuple[Any, Any], Tuple, float]] = {}
+        
+        while pending or busy:
+            while pending and idle:
+                worker = idle.pop()
+                task = pending.popleft()
+                worker[1].send(task)
+                busy[worker[1]] = (worker, task, time.time())
+            
+            wait_time = None
+            if self.timeout is not None:
+                oldest = min(started for _, _, started in busy.values())
+                wait_time = max(0.0, oldest + self.timeout - time.time())
+            
+            for conn in wait(list(busy), timeout=wait_time):
+                worker, task, started = busy.pop(conn)
+                try:
+                    record = conn.recv()
+                except (EOFError, OSError):
+                    # The worker died mid-run (e.g. killed or out of memory)
+                    config, output_dir, run_id = task
+                    exitcode = worker[0].exitcode
+                    worker = self._replace(worker)
+                    record = _run_record(config, Path(output_dir) / f"run_{run_id}", run_id, "error",
+                                         time.time() - started, f"Worker exited with code {exitcode}")
+                idle.append(worker)
+                yield record
+            
+            if self.timeout is not None:
+                now = time.time()
+                for conn, (worker, task, started) in list(busy.items()):
+                    if now - started >= self.timeout:
+                        del busy[conn]
+                        config, output_dir, run_id = task
+                        idle.append(self._replace(worker))
+                        yield _run_record(config, Path(output_dir) / f"run_{run_id}", run_id, "timeout",
+                                          now - started, "Simulation exceeded timeout")
+
+
+def open_sweep_dir(output_dir: str, resume: Optional[str] = None) -> Tuple[Path, str]:
+    """
+    Directory of a new sweep, or of the sweep being resumed.
+    
+    Args:
+        output_dir: Base output directory
+        resume: Sweep directory to resume, or 'latest' for the most recent
+            one in ``output_dir`` (default: start a new sweep)
+        
+    Returns:
+        Tuple (sweep directory, timestamp)
+    """
+    if resume is not None:
+        sweep_dir = find_latest_sweep(output_dir) if resume == 'latest' else Path(resume)
+        if sweep_dir is None or not sweep_dir.is_dir():
+            raise FileNotFoundError(f"No sweep to resume: {resume if resume != 'latest' else output_dir}")
+        print(f"Resuming sweep in: {sweep_dir}")
+        return sweep_dir, sweep_dir.name[len("grid_"):]
     
     # Create timestamped output directory
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     sweep_dir = Path(output_dir) / f"grid_{timestamp}"
     sweep_dir.mkdir(parents=True, exist_ok=True)
+    return sweep_dir, timestamp
+
+
+def _finite_or_none(value: Any) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return float(value)
+
+
+def sweep_point_metrics(config: Dict[str, Any], run_dir: Union[str, Path]) -> Dict[str, Optional[float]]:
+    """
+    Outcome metrics of a finished grid point, computed from its run log.
     
-    # Save grid configuration for reference
-    grid_metadata = {
-        'timestamp': timestamp,
-        'grid_path': str(grid_path),
-        'base_config_path': str(base_config_path),
-        'n_combinations': len(param_combinations),
-        'n_jobs': n_jobs,
-        'timeout': timeout
+    Args:
+        config: Configuration of the grid point
+        run_dir: Run directory containing ``logs/runs.npz``
+        
+    Returns:
+        Dictionary with one value per name in ``SWEEP_METRICS`` (None when
+        the runs do not define it)
+    """
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    from analysis.convergence_results import aggregate_runs
+    from analysis.profit_gain import gain_vs_nash
+    from params import SimParams
+    from run_logs import RUN_LOG_FILE, RunLog
+    
+    with RunLog(Path(run_dir) / "logs" / RUN_LOG_FILE) as log:
+        runs = log.runs([name for name in METRIC_RUN_COLUMNS if name in log.columns])
+    stats = aggregate_runs(runs)
+    
+    has_profits = len(stats.mean_profit) > 0
+    return {
+        'convergence_rate': float(stats.conv_rate),
+        'avg_convergence_time': _finite_or_none(stats.conv_time),
+        'mean_profit': float(np.mean(stats.mean_profit)) if has_profits else None,
+        'profit_gain': (_finite_or_none(np.mean(gain_vs_nash(stats.mean_profit, SimParams(config))))
+                        if has_profits else None),
+        'nash_gap': _finite_or_none(stats.nash_gap),
+        'cooperative_gap': _finite_or_none(stats.coop_gap)
     }
+
+
+def _with_metrics(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the outcome metrics to a successful result record."""
+    if result['status'] == 'success' and 'metrics' not in result:
+        try:
+            result['metrics'] = sweep_point_metrics(result['config'], result['output_dir'])
+        except Exception as e:
+            warnings.warn(f"Could not compute metrics for {result['run_id']}: {e}")
+    return result
+
+
+def run_sweep_points(points: List[Tuple[Dict[str, Any], str]], sweep_dir: Path,
+                     n_jobs: int = 1, timeout: Optional[float] = 300, executor: str = 'pool',
+                     pool: Optional[SweepWorkerPool] = None,
+                     annotate: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Run grid points of a sweep and journal their result records.
     
-    with open(sweep_dir / "grid_metadata.json", 'w') as f:
-        json.dump(grid_metadata, f, indent=2)
+    Points whose config already has a successful record in the sweep
+    journal are not run again, and points whose simulation is in the result
+    cache are restored instead of run.
     
-    # Prepare simulation configurations
+    Args:
+        points: Tuples (config, run_id)
+        sweep_dir: Sweep directory
+        n_jobs: Number of parallel jobs
+        timeout: Timeout per simulation in seconds
+        executor: 'pool' or 'subprocess'
+        pool: Running SweepWorkerPool to reuse with the 'pool' executor
+        annotate: Extra fields to store in the record of a run_id
+        
+    Returns:
+        Tuple (records sorted by run_id, number of points taken from the journal)
+    """
+    annotate = annotate or {}
+    
+    def record(result: Dict[str, Any]) -> Dict[str, Any]:
+        result = _with_metrics(dict(result, **annotate.get(result['run_id'], {})))
+        append_sweep_journal(sweep_dir, result)
+        print(f"  Completed {result['run_id']}: {result['status']}")
+        return result
+    
+    # Skip points completed before a resume and restore points whose
+    # simulation is in the result cache
+    journal = load_sweep_journal(sweep_dir)
+    completed = []
+    results = []
     simulation_configs = []
-    for i, params in enumerate(param_combinations):
-        config = create_base_config(base_config_path, params)
-        run_id = f"{i:04d}"
-        simulation_configs.append((config, str(sweep_dir), run_id))
+    for config, run_id in points:
+        done = journal.get(config_hash(config))
+        if done is not None and done['status'] == 'success':
+            completed.append(_with_metrics(dict(done, run_id=run_id, **annotate.get(run_id, {}))))
+            continue
+        cached = restore_cached_simulation(config, str(sweep_dir), run_id)
+        if cached is not None:
+            results.append(record(cached))
+        else:
+            simulation_configs.append((config, str(sweep_dir), run_id))
+    if completed:
+        print(f"Skipping {len(completed)} completed points")
+    if results:
+        print(f"Restored {len(results)} points from the result cache")
     
     # Run simulations
-    start_time = time.time()
-    
-    if JOBLIB_AVAILABLE and n_jobs != 1:
+    results.extend(completed)
+    if executor == 'pool' and simulation_configs:
+        print("Running simulations on warm worker pool...")
+        owns_pool = pool is None
+        if owns_pool:
+            pool = SweepWorkerPool(n_jobs, timeout)
+        try:
+            for result in pool.imap_unordered(simulation_configs):
+                results.append(record(result))
+        finally:
+            if owns_pool:
+                pool.close()
+    elif executor == 'subprocess' and JOBLIB_AVAILABLE and n_jobs != 1:
         print("Running simulations in parallel...")
-        results = Parallel(n_jobs=n_jobs)(
-            delayed(run_single_simulation)(config, output_dir, run_id)
+        for result in Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(run_single_simulation)(config, output_dir, run_id, timeout)
             for config, output_dir, run_id in simulation_configs
-        )
-    else:
+        ):
+            results.append(record(result))
+    elif executor == 'subprocess':
         print("Running simulations sequentially...")
-        results = []
         for config, output_dir, run_id in simulation_configs:
-            result = run_single_simulation(config, output_dir, run_id)
-            results.append(result)
-            print(f"  Completed {run_id}: {result['status']}")
+            results.append(record(run_single_simulation(config, output_dir, run_id, timeout)))
+    results.sort(key=lambda r: r['run_id'])
     
-    total_time = time.time() - start_time
+    return results, len(completed)
+
+
+def write_sweep_summary(sweep_dir: Path, metadata: Dict[str, Any], results: List[Dict[str, Any]],
+                        n_resumed: int, total_time: float, **extra: Any) -> Dict[str, Any]:
+    """
+    Save ``sweep_summary.json`` and print the outcome of a sweep.
     
+    Args:
+        sweep_dir: Sweep directory
+        metadata: Grid metadata
+        results: Result records of all grid points
+        n_resumed: Number of points taken from the journal of a resumed sweep
+        total_time: Wall-clock time of the sweep in seconds
+        **extra: Additional summary fields
+        
+    Returns:
+        Sweep summary dictionary
+    """
     # Analyze results
     successful_runs = [r for r in results if r['status'] == 'success']
     failed_runs = [r for r in results if r['status'] != 'success']
     
     sweep_summary = {
-        'metadata': grid_metadata,
+        'metadata': metadata,
         'total_runs': len(results),
         'successful_runs': len(successful_runs),
         'failed_runs': len(failed_runs),
+        'resumed_runs': n_resumed,
+        'cached_runs': sum(1 for r in results if r.get('cached')),
         'total_time': total_time,
         'avg_time_per_run': total_time / len(results) if results else 0,
         'output_directory': str(sweep_dir),
+        **extra,
         'results': results
     }
     
     # Save sweep summary
     with open(sweep_dir / "sweep_summary.json", 'w') as f:
-        json.dump(sweep_summary, f, indent=2)
+        json.dump(sweep_summary, f, indent=2, default=_json_default)
     
     print(f"\n✅ Parameter sweep completed:")
     print(f"  Total runs: {len(results)}")
@@ -306,6 +757,64 @@ def run_parameter_sweep(grid_path: str, base_config_path: str, output_dir: str,
     return sweep_summary
 
 
+def run_parameter_sweep(grid_path: str, base_config_path: str, output_dir: str, 
+                       n_jobs: int = 1, timeout: int = 300, executor: str = 'pool',
+                       pool: Optional[SweepWorkerPool] = None,
+                       resume: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run parameter sweep with parallel execution.
+    
+    Args:
+        grid_path: Path to parameter grid file
+        base_config_path: Path to base configuration
+        output_dir: Output directory for all runs
+        n_jobs: Number of parallel jobs
+        timeout: Timeout per simulation in seconds
+        executor: 'pool' (warm in-process workers) or 'subprocess' (one
+            interpreter per grid point, for isolation)
+        pool: Running SweepWorkerPool to reuse with the 'pool' executor
+            (default: a pool of ``n_jobs`` workers for this sweep)
+        resume: Sweep directory to resume, or 'latest' for the most recent
+            one in ``output_dir``; grid points whose config already has a
+            successful journal record are not run again
+        
+    Returns:
+        Dictionary with sweep results and metadata
+    """
+    if executor not in SWEEP_EXECUTORS:
+        raise ValueError(f"Unknown sweep executor '{executor}'. Must be one of {SWEEP_EXECUTORS}")
+    
+    print(f"Loading parameter grid from: {grid_path}")
+    param_combinations = load_parameter_grid(grid_path)
+    
+    print(f"Found {len(param_combinations)} parameter combinations")
+    print(f"Running with {n_jobs} parallel jobs ({executor} executor)")
+    
+    sweep_dir, timestamp = open_sweep_dir(output_dir, resume)
+    
+    # Save grid configuration for reference
+    grid_metadata = {
+        'timestamp': timestamp,
+        'grid_path': str(grid_path),
+        'base_config_path': str(base_config_path),
+        'n_combinations': len(param_combinations),
+        'n_jobs': n_jobs,
+        'timeout': timeout,
+        'executor': executor
+    }
+    
+    with open(sweep_dir / "grid_metadata.json", 'w') as f:
+        json.dump(grid_metadata, f, indent=2)
+    
+    # Prepare simulation configurations and run them
+    start_time = time.time()
+    points = [(create_base_config(base_config_path, params), f"{i:04d}")
+              for i, params in enumerate(param_combinations)]
+    results, n_resumed = run_sweep_points(points, sweep_dir, n_jobs, timeout, executor, pool)
+    
+    return write_sweep_summary(sweep_dir, grid_metadata, results, n_resumed, time.time() - start_time)
+
+
 def create_example_grid_files(output_dir: str) -> None:
     """
     Create example grid configuration files.
@@ -359,6 +868,10 @@ if __name__ == "__main__":
     parser.add_argument("--output", default="runs", help="Output directory")
     parser.add_argument("--njobs", type=int, default=1, help="Number of parallel jobs")
     parser.add_argument("--timeout", type=int, default=300, help="Timeout per simulation (seconds)")
+    parser.add_argument("--executor", choices=SWEEP_EXECUTORS, default="pool",
+                       help="Run grid points on warm worker processes or as subprocesses")
+    parser.add_argument("--resume", nargs="?", const="latest",
+                       help="Resume a sweep directory (default: the latest in --output)")
     parser.add_argument("--create-examples", action="store_true", 
                        help="Create example grid files and exit")
     
@@ -374,7 +887,9 @@ if __name__ == "__main__":
         base_config_path=args.config,
         output_dir=args.output,
         n_jobs=args.njobs,
-        timeout=args.timeout
+        timeout=args.timeout,
+        executor=args.executor,
+        resume=args.resume
     )
     
     # Exit with appropriate code
@@ -0,0 +1,205 @@
+"""
+Precomputed stage-game tables for the learning loop.
+
+The action grid is discrete, so every quantity the learning loop needs from the
+demand model can be tabulated once per experiment:
+
+- ``profits``: (n_actions**n_agents, n_agents) one-period profit of each agent
+  for every action profile
+- ``next_state``: (n_actions**n_agents,) state index reached after each
+  action profile
+
+Action profiles are numbered like ``QL_routines.compute_action_number``
+(agent 0 is the least significant digit). Tables are memoized in-process and
+cached on disk under a hash of the demand parameters, so sweeps that reuse a
+demand model skip the rebuild.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .params import SimParams
+    from .PI_routines import linear_demands, logit_demands, logit_demands_mu0
+    from .dtype_policy import DTYPE
+except ImportError:
+    from params import SimParams
+    from PI_routines import linear_demands, logit_demands, logit_demands_mu0
+    from dtype_policy import DTYPE
+
+# Default on-disk location; override with the ``game_table_cache_dir`` parameter
+# (a falsy value disables the disk cache)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'calvano', 'game_tables')
+
+DEMAND_MODELS = ('logit', 'logit_mu0', 'singh_vives')
+
+# In-process memo: key -> GameTables
+_MEMORY_CACHE: Dict[str, 'GameTables'] = {}
+
+
+@dataclass
+class GameTables:
+    """Profit and transition tables of one stage game."""
+    key: str
+    prices: np.ndarray
+    profits: np.ndarray
+    next_state: np.ndarray
+
+
+def demand_spec(params: SimParams) -> Dict[str, Any]:
+    """
+    Collect everything the tables depend on.
+
+    Args:
+        params: Simulation parameters
+
+    Returns:
+        JSON-serializable dictionary describing the demand model and grid
+    """
+    model = 'singh_vives' if params.demand_model == 'linear' else params.demand_model
+    if model not in DEMAND_MODELS:
+        raise ValueError(f"Unknown demand model '{params.demand_model}'. Must be one of {DEMAND_MODELS}")
+
+    price_grid = getattr(params, 'price_grid', None)
+    if price_grid is None:
+        price_grid = [action / (params.n_actions - 1) for action in range(params.n_actions)]
+    if len(price_grid) != params.n_actions:
+        raise ValueError(f"price_grid has {len(price_grid)} prices, expected n_actions={params.n_actions}")
+
+    spec = {
+        'demand_model': model,
+        'n_agents': params.n_agents,
+        'n_actions': params.n_actions,
+        'price_grid': [float(p) for p in price_grid],
+    }
+    if model == 'singh_vives':
+        spec['gamma'] = float(getattr(params, 'gamma', 0.5))
+    else:
+        # Same defaults as QL_routines.compute_demands
+        spec['a0'] = float(getattr(params, 'a0', 2.0))
+        spec['a'] = np.broadcast_to(np.asarray(getattr(params, 'a', 1.0), dtype=float),
+                                    (params.n_agents,)).tolist()
+        spec['c'] = np.broadcast_to(np.asarray(getattr(params, 'c', 0.0), dtype=float),
+                                    (params.n_agents,)).tolist()
+        if model == 'logit':
+            spec['mu'] = float(getattr(params, 'mu', 0.25))
+    return spec
+
+
+def game_table_key(params: SimParams) -> str:
+    """Hash of the demand specification used as cache key."""
+    payload = json.dumps(demand_spec(params), sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def build_game_tables(params: SimParams) -> GameTables:
+    """
+    Build the profit and transition tables from the configured demand model.
+
+    Args:
+        params: Simulation parameters
+
+    Returns:
+        GameTables for the experiment
+    """
+    spec = demand_spec(params)
+    n_agents = spec['n_agents']
+    n_actions = spec['n_actions']
+    n_profiles = n_actions ** n_agents
+    grid = np.array(spec['price_grid'], dtype=DTYPE)
+
+    # Digits of every action profile, agent 0 least significant
+    profile_ids = np.arange(n_profiles)
+    digits = (profile_ids[:, None] // n_actions ** np.arange(n_agents)) % n_actions
+    profile_prices = grid[digits]
+
+    profits = np.zeros((n_profiles, n_agents), dtype=DTYPE)
+    for i_profile in range(n_profiles):
+        prices = profile_prices[i_profile]
+        if spec['demand_model'] == 'singh_vives':
+            profits[i_profile] = prices * linear_demands(spec['gamma'], prices)
+        else:
+            a = np.array(spec['a'])
+            c = np.array(spec['c'])
+            if spec['demand_model'] == 'logit':
+                d = logit_demands(spec['a0'], a, c, spec['mu'], prices)
+            else:
+                d = logit_demands_mu0(spec['a0'], a, c, prices)
+            profits[i_profile] = (prices - c) * d
+
+    # With one-period memory the state is the last action profile
+    next_state = profile_ids.astype(np.int64)
+
+    return GameTables(key=game_table_key(params), prices=grid, profits=profits, next_state=next_state)
+
+
+def get_game_tables(params: SimParams, cache_dir: Optional[str] = None) -> GameTables:
+    """
+    Return the game tables for ``params``, building them only on a cache miss.
+
+    Args:
+        params: Simulation parameters
+        cache_dir: Disk cache directory (default: ``params.game_table_cache_dir``,
+            falling back to DEFAULT_CACHE_DIR; a falsy parameter disables it)
+
+    Returns:
+        GameTables for the experiment
+    """
+    key = game_table_key(params)
+    if key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+
+    if cache_dir is None:
+        cache_dir = getattr(params, 'game_table_cache_dir', DEFAULT_CACHE_DIR)
+
+    tables = None
+    cache_file = os.path.join(cache_dir, f"{key}.npz") if cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with np.load(cache_file) as data:
+                tables = GameTables(key=key, prices=data['prices'],
+                                    profits=data['profits'], next_state=data['next_state'])
+        except (OSError, ValueError, KeyError):
+            tables = None  # Corrupt entry: rebuild below
+
+    if tables is None:
+        tables = build_game_tables(params)
+        if cache_file:
+            _write_cache_file(cache_file, tables)
+
+    _MEMORY_CACHE[key] = tables
+    return tables
+
+
+def register_game_tables(tables: GameTables) -> None:
+    """Serve ``tables`` from the in-process memo (e.g. views attached from shared memory)."""
+    _MEMORY_CACHE[tables.key] = tables
+
+
+def clear_game_table_cache() -> None:
+    """Drop the in-process memo (the disk cache is left untouched)."""
+    _MEMORY_CACHE.clear()
+
+
+def _write_cache_file(cache_file: str, tables: GameTables) -> None:
+    """Atomically write a cache entry so concurrent workers never see partial files."""
+    # open() (unlike mkstemp) gives the entry the umask's usual permissions
+    tmp_path = f"{cache_file}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_path, 'xb') as f:
+            np.savez(f, prices=tables.prices, profits=tables.profits, next_state=tables.next_state)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        # The cache is an optimization only; a read-only location or a full disk is not an error
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
@@ -1,7 +1,10 @@
 import numpy as np
 from typing import List, Tuple, Optional
 import random
-from .rng.Lecuyer import get_lecuyer_raw, LecuyerCombined
+try:
+    from .rng.Lecuyer import get_lecuyer_raw, LecuyerCombined
+except ImportError:
+    from rng.Lecuyer import get_lecuyer_raw, LecuyerCombined
 
 def compute_row_summary_statistics(x: np.ndarray) -> np.ndarray:
     """
@@ -0,0 +1,246 @@
+"""
+Batched impulse-response simulation over converged strategies.
+
+An impulse response starts in a state of the pre-shock cycle, lets one agent
+deviate to a given price for a number of periods while the others follow
+their strategies, and then follows the strategies until the path cycles.
+``simulate_impulse_batch`` advances every (session, initial state, deviating
+agent, deviation price, deviation length) trajectory at once: each period is
+a gather of the stacked strategies, one joint-action number per trajectory
+and a lookup in the profit and transition tables.
+
+Cycle detection needs no scan of the visited states. Every trajectory keeps
+the period in which it first saw each state (a ``(trajectories, n_states)``
+table, processed in chunks), and the pre-shock cycle of every state comes
+from the sessions' StrategyGraphs, so "back on the pre-shock cycle" and
+"revisited a state" are two table lookups per period. Trajectories leave the
+active set once their shock has ended, and the post-shock cycle is read off
+the strategy graph of the state where the shock ended.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .strategy_graph import get_strategy_graph, strategy_successor
+except ImportError:
+    from strategy_graph import get_strategy_graph, strategy_successor
+
+# Deviation length that never ends
+PERMANENT_DEVIATION = 1000
+
+# Entries of the first-seen table processed at once
+_CHUNK_ENTRIES = 2 ** 22
+
+
+@dataclass
+class ImpulseResponseBatch:
+    """Columnar impulse responses; row j describes trajectory j."""
+    session: np.ndarray            # (n,) session index
+    initial_state: np.ndarray      # (n,) pre-shock state in which the deviation starts
+    dev_agent: np.ndarray          # (n,) deviating agent
+    dev_price: np.ndarray          # (n,) deviation price index
+    dev_length: np.ndarray         # (n,) deviation length (PERMANENT_DEVIATION: permanent)
+    states: np.ndarray             # (n, n_periods) state reached in each period
+    price_index: np.ndarray        # (n, n_periods, n_agents) price indices played
+    prices: np.ndarray             # (n, n_periods, n_agents) prices played
+    profits: np.ndarray            # (n, n_periods, n_agents) per-period profits
+    shock_length: np.ndarray       # (n,) periods until the path returns or starts cycling
+    punishment_length: np.ndarray  # (n,) periods until back on the pre-shock cycle (0: new cycle)
+    shock_end_state: np.ndarray    # (n,) state in which the shock ended
+    post_length: np.ndarray        # (n,) length of the post-shock cycle
+    post_prices: np.ndarray        # (n, n_agents) average prices on the post-shock cycle
+    post_profits: np.ndarray       # (n, n_agents) average profits on the post-shock cycle
+
+    def __len__(self) -> int:
+        return len(self.session)
+
+
+def impulse_grid(
+    pre_cycles: Sequence[np.ndarray],
+    dev_agents: Sequence[int],
+    dev_prices: Sequence[int],
+    dev_lengths: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    All combinations of session, pre-shock cycle state, agent, price and length.
+
+    Args:
+        pre_cycles: Pre-shock cycle states of each session
+        dev_agents: Deviating agents
+        dev_prices: Deviation price indices
+        dev_lengths: Deviation lengths
+
+    Returns:
+        Flat arrays (session, initial_state, dev_agent, dev_price, dev_length)
+    """
+    session = np.concatenate([np.full(len(cycle), i) for i, cycle in enumerate(pre_cycles)])
+    initial_state = np.concatenate([np.asarray(cycle) for cycle in pre_cycles])
+    start, agent, price, length = np.meshgrid(
+        np.arange(len(session)), dev_agents, dev_prices, dev_lengths, indexing='ij'
+    )
+    start = start.ravel()
+    return (session[start].astype(np.int64), initial_state[start].astype(np.int64),
+            agent.ravel().astype(np.int64), price.ravel().astype(np.int64),
+            length.ravel().astype(np.int64))
+
+
+def _cycle_tables(strategies, profits, next_state, weights, price_grid):
+    """
+    Per-session attractor data of every state.
+
+    Returns:
+        Tuple (cycle label of each on-cycle state or -1, length of and
+        average prices and profits along the attractor cycle of each state)
+    """
+    n_sessions, n_states, n_agents = strategies.shape
+    agents = np.arange(n_agents)
+    cycle_label = np.full((n_sessions, n_states), -1, dtype=np.int64)
+    cycle_length = np.zeros((n_sessions, n_states), dtype=np.int64)
+    cycle_prices = np.zeros((n_sessions, n_states, n_agents))
+    cycle_profits = np.zeros((n_sessions, n_states, n_agents))
+    for session in range(n_sessions):
+        graph = get_strategy_graph(strategies[session], next_state, weights)
+        profile, _ = strategy_successor(strategies[session], next_state, weights)
+        members = np.flatnonzero(graph.on_cycle)
+        cycle_label[session, members] = graph.cycle_index[members]
+        cycle_length[session] = graph.cycle_length
+        counts = np.bincount(graph.cycle_index[members], minlength=len(graph.cycles))
+        for averages, values in ((cycle_prices, price_grid[strategies[session], agents]),
+                                 (cycle_profits, profits[profile])):
+            sums = np.zeros((len(graph.cycles), n_agents))
+            np.add.at(sums, graph.cycle_index[members], values[members])
+            averages[session] = (sums / counts[:, None])[graph.cycle_index]
+    return cycle_label, cycle_length, cycle_prices, cycle_profits
+
+
+def simulate_impulse_batch(
+    strategies: np.ndarray,
+    profits: np.ndarray,
+    next_state: np.ndarray,
+    action_weights: np.ndarray,
+    session: np.ndarray,
+    initial_state: np.ndarray,
+    dev_agent: np.ndarray,
+    dev_price: np.ndarray,
+    dev_length: np.ndarray,
+    n_periods: int,
+    price_grid: Optional[np.ndarray] = None,
+    chunk_size: Optional[int] = None
+) -> ImpulseResponseBatch:
+    """
+    Simulate many impulse responses at once.
+
+    Args:
+        strategies: Stacked strategies, shape (n_sessions, n_states, n_agents)
+        profits: Per-period profits of every joint action, shape (n_profiles, n_agents)
+        next_state: State reached after every joint action, shape (n_profiles,)
+        action_weights: Weight of each agent's price index in the joint action number
+        session: Session of each trajectory
+        initial_state: Pre-shock cycle state in which each deviation starts
+        dev_agent: Deviating agent of each trajectory
+        dev_price: Deviation price index of each trajectory
+        dev_length: Deviation length of each trajectory (PERMANENT_DEVIATION: permanent)
+        n_periods: Number of periods recorded per trajectory
+        price_grid: Price of each index for each agent, shape (n_prices, n_agents);
+            defaults to the price indices
+        chunk_size: Trajectories per chunk (default: bounded by table size)
+
+    Returns:
+        ImpulseResponseBatch with one row per trajectory
+    """
+    strategies = np.asarray(strategies, dtype=np.int64)
+    if strategies.ndim == 2:
+        strategies = strategies[None]
+    profits = np.asarray(profits, dtype=np.float64)
+    next_state = np.asarray(next_state, dtype=np.int64)
+    weights = np.asarray(action_weights, dtype=np.int64)
+    n_sessions, n_states, n_agents = strategies.shape
+    if price_grid is None:
+        n_prices = int(round(profits.shape[0] ** (1.0 / n_agents)))
+        price_grid = np.repeat(np.arange(n_prices, dtype=np.float64)[:, None], n_agents, axis=1)
+    price_grid = np.asarray(price_grid, dtype=np.float64)
+
+    session, initial_state, dev_agent, dev_price, dev_length = (
+        np.broadcast_arrays(*(np.asarray(a, dtype=np.int64) for a in
+                              (session, initial_state, dev_agent, dev_price, dev_length)))
+    )
+    session, initial_state, dev_agent, dev_price, dev_length = (
+        a.ravel().copy() for a in (session, initial_state, dev_agent, dev_price, dev_length)
+    )
+    n_trajectories = len(session)
+    if np.any((initial_state < 0) | (initial_state >= n_states)):
+        raise ValueError("Initial states out of range")
+
+    cycle_label, cycle_length, cycle_prices, cycle_profits = _cycle_tables(
+        strategies, profits, next_state, weights, price_grid
+    )
+    if np.any(cycle_label[session, initial_state] < 0):
+        raise ValueError("Impulse responses must start on the pre-shock cycle")
+    pre_label = cycle_label[session, initial_state]
+
+    agents = np.arange(n_agents)
+    states = np.zeros((n_trajectories, n_periods), dtype=np.int64)
+    price_index = np.zeros((n_trajectories, n_periods, n_agents), dtype=np.int64)
+    shock_length = np.zeros(n_trajectories, dtype=np.int64)
+    punishment_length = np.zeros(n_trajectories, dtype=np.int64)
+    shock_end_state = np.zeros(n_trajectories, dtype=np.int64)
+
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_ENTRIES // max(n_states, 1))
+    for lo in range(0, n_trajectories, chunk_size):
+        rows = np.arange(lo, min(lo + chunk_size, n_trajectories))
+        first_seen = np.full((len(rows), n_states), -1, dtype=np.int32)
+        state = initial_state[rows].copy()
+        active = np.ones(len(rows), dtype=bool)
+        period = 0
+        while period < n_periods or active.any():
+            # Trajectories still needed: recording or waiting for their shock to end
+            live = np.flatnonzero(active) if period >= n_periods else np.arange(len(rows))
+            traj = rows[live]
+            actions = strategies[session[traj], state[live]]
+            deviating = (dev_length[traj] == PERMANENT_DEVIATION) | (period < dev_length[traj])
+            actions[deviating, dev_agent[traj][deviating]] = dev_price[traj][deviating]
+            new_state = next_state[actions @ weights]
+            if period < n_periods:
+                states[traj, period] = new_state
+                price_index[traj, period] = actions
+
+            # Case 1: back on the pre-shock cycle; case 2: a state seen before
+            sub = live[active[live]]
+            s = new_state[active[live]]
+            returned = cycle_label[session[rows[sub]], s] == pre_label[rows[sub]]
+            seen = first_seen[sub, s]
+            repeated = ~returned & (seen >= 0)
+            done = returned | repeated
+            shock_length[rows[sub[returned]]] = period + 1
+            punishment_length[rows[sub[returned]]] = period + 1
+            shock_length[rows[sub[repeated]]] = seen[repeated] + 1
+            shock_end_state[rows[sub[done]]] = s[done]
+            first_seen[sub[seen < 0], s[seen < 0]] = period
+            active[sub[done]] = False
+
+            state[live] = new_state
+            period += 1
+
+    return ImpulseResponseBatch(
+        session=session,
+        initial_state=initial_state,
+        dev_agent=dev_agent,
+        dev_price=dev_price,
+        dev_length=dev_length,
+        states=states,
+        price_index=price_index,
+        prices=price_grid[price_index, agents],
+        profits=profits[price_index @ weights],
+        shock_length=shock_length,
+        punishment_length=punishment_length,
+        shock_end_state=shock_end_state,
+        post_length=cycle_length[session, shock_end_state],
+        # Post-shock cycle: the attractor of the state where the shock ended
+        post_prices=cycle_prices[session, shock_end_state],
+        post_profits=cycle_profits[session, shock_end_state]
+    )
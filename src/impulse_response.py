@@ -1,7 +1,9 @@
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from globals import GlobalVars
-from QL_routines import compute_state_number, compute_action_number, compute_q_cell
+from QL_routines import compute_state_number, compute_action_number
+from policy_evaluation import PolicyEvaluation, evaluate_strategy_globals
+from impulse_engine import impulse_grid, simulate_impulse_batch
 from generic_routines import convert_number_base
 
 def compute_ir_analysis(i_experiment: int, unit_number: int, ir_type: int, globals: GlobalVars) -> None:
@@ -17,6 +19,10 @@ def compute_ir_analysis(i_experiment: int, unit_number: int, ir_type: int, globa
         1 <= ir_type <= 999: ir_type-period deviation to Nash
         ir_type = 1000: permanent deviation to Nash
     """
+    # The batched engine takes the state after a joint action to be the joint action itself
+    if globals.num_states != globals.num_actions:
+        raise ValueError("Impulse responses of GlobalVars strategies require one-period memory")
+    
     print('Computing Impulse Responses')
     
     # Initialize variables
@@ -64,85 +70,71 @@ def compute_ir_analysis(i_experiment: int, unit_number: int, ir_type: int, globa
                     i_state::globals.num_states, r_session
                 ] = np.array([int(x) for x in f.readline().strip().split()])
     
-    # Loop over sessions
+    # Pre-shock cycles of all sessions
+    optimal_strategies = np.stack([
+        globals.index_strategies[:, i_session].reshape((globals.num_states, globals.num_agents))
+        for i_session in range(globals.num_sessions)
+    ])
+    pre_cycles = [
+        globals.cycle_states[:globals.cycle_length[i_session], i_session]
+        for i_session in range(globals.num_sessions)
+    ]
+    
     for i_session in range(globals.num_sessions):
-        optimal_strategy_vec = globals.index_strategies[:, i_session]
-        optimal_strategy = optimal_strategy_vec.reshape(
-            (globals.num_states, globals.num_agents)
-        )
-        
-        # Pre-shock period analysis
         periods_length_pre = globals.cycle_length[i_session]
         pos_thres = min(num_thres_periods_length, periods_length_pre)
         freq_pre_length[pos_thres - 1] += 1
         
-        visited_states_pre = np.zeros(globals.num_periods, dtype=np.int32)
-        pre_prices = np.zeros((globals.num_periods, globals.num_agents))
-        pre_profits = np.zeros((globals.num_periods, globals.num_agents))
-        
-        for i_period in range(periods_length_pre):
-            visited_states_pre[i_period] = globals.cycle_states[i_period, i_session]
-            for i_agent in range(globals.num_agents):
-                pre_prices[i_period, i_agent] = globals.prices_grids[
-                    globals.cycle_prices[i_agent, i_period, i_session], i_agent
-                ]
-                pre_profits[i_period, i_agent] = globals.cycle_profits[
-                    i_agent, i_period, i_session
-                ]
+        cycle_prices = globals.cycle_prices[:, :periods_length_pre, i_session].astype(int)
+        pre_prices = globals.prices_grids[cycle_prices, np.arange(globals.num_agents)[:, None]].T
+        pre_profits = globals.cycle_profits[:, :periods_length_pre, i_session].T
         
-        avg_pre_prices += np.mean(pre_prices[:periods_length_pre, :], axis=0)
-        avg_pre_prices_q += np.mean(pre_prices[:periods_length_pre, :], axis=0) ** 2
-        avg_pre_profits += np.mean(pre_profits[:periods_length_pre, :], axis=0)
-        avg_pre_profits_q += np.mean(pre_profits[:periods_length_pre, :], axis=0) ** 2
+        avg_pre_prices += np.mean(pre_prices, axis=0)
+        avg_pre_prices_q += np.mean(pre_prices, axis=0) ** 2
+        avg_pre_profits += np.mean(pre_profits, axis=0)
+        avg_pre_profits_q += np.mean(pre_profits, axis=0) ** 2
+    
+    # Shock period analysis: every (session, pre-shock state, agent) deviation at once
+    session, initial_state, dev_agent, _, _ = impulse_grid(pre_cycles, range(globals.num_agents), [0], [0])
+    if ir_type <= -1:
+        # One-period deviation to the ir_type-th price
+        dev_price = np.full(len(session), -ir_type)
+        dev_length = 1
+    elif ir_type == 0:
+        # One-period deviation to static BR
+        dev_price = np.array([
+            compute_static_best_response(optimal_strategies[s], x, a, globals)[0]
+            for s, x, a in zip(session, initial_state, dev_agent)
+        ])
+        dev_length = 1
+    else:
+        # dev_length-period deviation to Nash
+        nash_index = np.argmin(
+            (globals.prices_grids - globals.nash_prices[None, :]) ** 2, axis=0
+        )
+        dev_price = nash_index[dev_agent]
+        dev_length = ir_type
+    
+    batch = simulate_impulse_batch(
+        optimal_strategies, globals.pi, np.arange(globals.num_actions), np.asarray(globals.c_actions),
+        session, initial_state, dev_agent, dev_price, dev_length,
+        num_shock_periods_print, price_grid=globals.prices_grids
+    )
+    
+    for i_agent in range(globals.num_agents):
+        rows = batch.dev_agent == i_agent
+        np.add.at(freq_shock_length[i_agent], np.minimum(num_thres_periods_length, batch.shock_length[rows]) - 1, 1)
+        np.add.at(freq_punishment_strategy[i_agent], np.minimum(num_thres_periods_length, batch.punishment_length[rows]), 1)
+        np.add.at(freq_post_length[i_agent], np.minimum(num_thres_periods_length, batch.post_length[rows]) - 1, 1)
         
-        # Shock period analysis
-        for i_agent in range(globals.num_agents):
-            avg_shock_prices_tmp = np.zeros((num_shock_periods_print, globals.num_agents))
-            avg_shock_profits_tmp = np.zeros((num_shock_periods_print, globals.num_agents))
-            avg_post_prices_tmp = np.zeros(globals.num_agents)
-            avg_post_profits_tmp = np.zeros(globals.num_agents)
-            
-            for i_state_pre in range(periods_length_pre):
-                # Select deviation type
-                if ir_type <= -1:
-                    # One-period deviation to the ir_type-th price
-                    dev_price = -ir_type
-                    dev_length = 1
-                elif ir_type == 0:
-                    # One-period deviation to static BR
-                    dev_price, _ = compute_static_best_response(
-                        optimal_strategy, visited_states_pre[i_state_pre], i_agent, globals
-                    )
-                    dev_length = 1
-                else:
-                    # dev_length-period deviation to Nash
-                    dev_price = np.argmin(
-                        (globals.prices_grids[:, i_agent] - globals.nash_prices[i_agent]) ** 2
-                    )
-                    dev_length = ir_type
-                
-                # Compute individual IRs
-                shock_states, shock_ind_prices, shock_prices, shock_profits, \
-                post_prices, post_profits, shock_length, punishment_strategy, post_length = \
-                    compute_individual_ir(
-                        optimal_strategy, visited_states_pre[i_state_pre], i_agent,
-                        dev_price, dev_length, num_shock_periods_print,
-                        periods_length_pre, visited_states_pre[:periods_length_pre],
-                        globals
-                    )
-                
-                # Compute running averages
-                nn = float(i_state_pre + 1)
-                avg_shock_prices_tmp = (nn - 1.0) / nn * avg_shock_prices_tmp + shock_prices / nn
-                avg_shock_profits_tmp = (nn - 1.0) / nn * avg_shock_profits_tmp + shock_profits / nn
-                avg_post_prices_tmp = (nn - 1.0) / nn * avg_post_prices_tmp + post_prices / nn
-                avg_post_profits_tmp = (nn - 1.0) / nn * avg_post_profits_tmp + post_profits / nn
-                
-                freq_shock_length[i_agent, min(num_thres_periods_length, shock_length) - 1] += 1
-                freq_punishment_strategy[i_agent, min(num_thres_periods_length, punishment_strategy)] += 1
-                freq_post_length[i_agent, min(num_thres_periods_length, post_length) - 1] += 1
+        # Average over pre-shock cycle states, then accumulate over sessions
+        for i_session in range(globals.num_sessions):
+            sel = rows & (batch.session == i_session)
+            avg_shock_prices_tmp = np.mean(batch.prices[sel], axis=0)
+            avg_shock_profits_tmp = np.mean(batch.profits[sel], axis=0)
+            avg_post_prices_tmp = np.mean(batch.post_prices[sel], axis=0)
+            avg_post_profits_tmp = np.mean(batch.post_profits[sel], axis=0)
             
-            # Compute average prices and profits over pre-shock cycle states
             avg_shock_prices[:, i_agent, :] += avg_shock_prices_tmp
             avg_shock_prices_q[:, i_agent, :] += avg_shock_prices_tmp ** 2
             avg_shock_profits[:, i_agent, :] += avg_shock_profits_tmp
@@ -491,7 +483,8 @@ def compute_dynamic_best_response(
     i_state: int,
     i_agent: int,
     delta: float,
-    globals: GlobalVars
+    globals: GlobalVars,
+    evaluation: Optional[PolicyEvaluation] = None
 ) -> Tuple[int, float]:
     """
     Computes dynamic best response of one agent given all agents' strategies
@@ -503,17 +496,16 @@ def compute_dynamic_best_response(
     - i_state: current state
     - i_agent: agent index
     - delta: discount factor
+    - evaluation: policy evaluation of optimal_strategy with discount factor
+      delta; pass it when querying many states of the same strategy
     
     Returns:
     - index_dynamic_br: dynamic BR price index
     - q_dynamic_br: Q(i_state, index_dynamic_br, i_agent)
     """
-    sel_q = np.zeros(globals.num_prices)
-    
-    for i_price in range(globals.num_prices):
-        sel_q[i_price], _, _ = compute_q_cell(
-            optimal_strategy, i_state, i_price, i_agent, delta, globals
-        )
+    if evaluation is None:
+        evaluation = evaluate_strategy_globals(optimal_strategy, globals, delta)
+    sel_q = evaluation.q_true[i_state, :, i_agent]
     
     index_dynamic_br = np.argmax(sel_q)
     q_dynamic_br = np.max(sel_q)
@@ -615,7 +607,7 @@ def compute_individual_ir(
         p_prime = optimal_strategy[visited_states[i_period], :].copy()
         if dev_length == 1000:  # Permanent deviation
             p_prime[dev_agent] = dev_price
-        elif dev_length > i_period:  # Temporary deviation
+        elif dev_length > i_period + 1:  # Temporary deviation: periods 0 .. dev_length - 1
             p_prime[dev_agent] = dev_price
     
     # Post-shock period
@@ -21,6 +21,14 @@ except ImportError:
 # Strategy type definitions
 STRATEGY_TYPES = ['F', 'G', 'O', 'T', 'R', 'U']
 
+# Pre-trained Q matrices already in memory (e.g. attached from shared memory), by path
+_PRETRAINED_Q: Dict[str, np.ndarray] = {}
+
+
+def register_pretrained_q(q_init_path: str, Q: np.ndarray) -> None:
+    """Serve strategy 'T' loads of ``q_init_path`` from an in-memory array."""
+    _PRETRAINED_Q[q_init_path] = Q
+
 
 def init_Q(strategy: str, params: SimParams, rng: LecuyerCombined, 
            agent_idx: int = 0, **kwargs) -> np.ndarray:
@@ -100,11 +108,10 @@ def _init_Q_grim_trigger(params: SimParams, rng: LecuyerCombined,
     Q[:, coop_action] = coop_value
     Q[:, punish_action] = punish_value
     
-    # Add small random noise to break ties
+    # Add small random noise to break ties (one deviate per cell, state-major)
     noise_scale = 0.01
-    for state in range(params.n_states):
-        for action in range(params.n_actions):
-            Q[state, action] += noise_scale * (rng.ran2() - 0.5)
+    u = rng.ran2_block(params.n_states * params.n_actions).reshape(params.n_states, params.n_actions)
+    Q += noise_scale * (u - 0.5)
     
     return Q
 
@@ -120,19 +127,16 @@ def _init_Q_opponent_random(params: SimParams, rng: LecuyerCombined,
     # Initialize Q matrix
     Q = np.zeros((params.n_states, params.n_actions), dtype=np.float64)
     
-    # Randomize Q values (standard normal distribution)
-    for state in range(params.n_states):
-        for action in range(params.n_actions):
-            # Use Box-Muller transform for normal distribution
-            if state % 2 == 0:  # Generate pairs of normal variables
-                u1 = rng.ran2()
-                u2 = rng.ran2()
-                z1 = np.sqrt(-2 * np.log(u1)) * np.cos(2 * np.pi * u2)
-                z2 = np.sqrt(-2 * np.log(u1)) * np.sin(2 * np.pi * u2)
-                Q[state, action] = random_scale * z1
-                if state + 1 < params.n_states:
-                    Q[state + 1, action] = random_scale * z2
-            # Note: odd states are handled in the previous iteration
+    # One (u1, u2) pair per action of every even state, in drawing order
+    n_pairs = (params.n_states + 1) // 2
+    u = rng.ran2_block(2 * n_pairs * params.n_actions).reshape(n_pairs, params.n_actions, 2)
+    u1 = u[:, :, 0]
+    u2 = u[:, :, 1]
+    
+    # Box-Muller: each pair gives the normals of an even state and the next one
+    radius = np.sqrt(-2 * np.log(u1))
+    Q[0::2] = random_scale * (radius * np.cos(2 * np.pi * u2))
+    Q[1::2] = random_scale * (radius * np.sin(2 * np.pi * u2))[:params.n_states // 2]
     
     return Q
 
@@ -146,14 +150,17 @@ def _init_Q_pretrained(params: SimParams, agent_idx: int, **kwargs) -> np.ndarra
     if q_init_path is None:
         raise ValueError("q_init_path must be provided for 'T' strategy")
     
-    if not os.path.exists(q_init_path):
-        raise FileNotFoundError(f"Q initialization file not found: {q_init_path}")
-    
-    # Load Q matrix
-    try:
-        Q = np.load(q_init_path)
-    except Exception as e:
-        raise ValueError(f"Failed to load Q matrix from {q_init_path}: {e}")
+    if q_init_path in _PRETRAINED_Q:
+        Q = _PRETRAINED_Q[q_init_path]
+    else:
+        if not os.path.exists(q_init_path):
+            raise FileNotFoundError(f"Q initialization file not found: {q_init_path}")
+        
+        # Load Q matrix
+        try:
+            Q = np.load(q_init_path)
+        except Exception as e:
+            raise ValueError(f"Failed to load Q matrix from {q_init_path}: {e}")
     
     # Validate shape
     expected_shape = (params.n_states, params.n_actions)
@@ -176,15 +183,11 @@ def _init_Q_random(params: SimParams, rng: LecuyerCombined,
     min_val = kwargs.get('min_val', 0.0)
     max_val = kwargs.get('max_val', 1.0)
     
-    # Initialize Q matrix
-    Q = np.zeros((params.n_states, params.n_actions), dtype=np.float64)
-    
-    # Fill with random values
-    for state in range(params.n_states):
-        for action in range(params.n_actions):
-            Q[state, action] = min_val + (max_val - min_val) * rng.ran2()
+    # Fill with random values, one deviate per cell in state-major order
+    u = rng.ran2_block(params.n_states * params.n_actions)
+    Q = min_val + (max_val - min_val) * u.reshape(params.n_states, params.n_actions)
     
-    return Q
+    return Q.astype(np.float64)
 
 
 def _init_Q_uniform(params: SimParams, agent_idx: int, **kwargs) -> np.ndarray:
@@ -201,7 +204,7 @@ def _init_Q_uniform(params: SimParams, agent_idx: int, **kwargs) -> np.ndarray:
 
 
 def init_all_agents_Q(strategies: List[str], params: SimParams, rng: LecuyerCombined,
-                     **strategy_kwargs) -> List[np.ndarray]:
+                     stacked: bool = False, **strategy_kwargs):
     """
     Initialize Q-matrices for all agents.
     
@@ -209,25 +212,43 @@ def init_all_agents_Q(strategies: List[str], params: SimParams, rng: LecuyerComb
         strategies: List of strategy types for each agent
         params: Simulation parameters
         rng: Random number generator
+        stacked: Return one (n_agents, n_states, n_actions) array instead of a list
         **strategy_kwargs: Additional parameters for strategies
         
     Returns:
-        List of Q-matrices, one for each agent
+        List of Q-matrices, one for each agent, or the stacked array
     """
     if len(strategies) != params.n_agents:
         raise ValueError(f"Number of strategies ({len(strategies)}) must match n_agents ({params.n_agents})")
     
-    Q_matrices = []
-    for agent_idx, strategy in enumerate(strategies):
-        # Get agent-specific kwargs
-        agent_kwargs = {}
+    # Get agent-specific kwargs
+    agent_kwargs = []
+    for agent_idx in range(params.n_agents):
+        kwargs = {}
         for key, value in strategy_kwargs.items():
             if isinstance(value, (list, tuple)) and len(value) == params.n_agents:
-                agent_kwargs[key] = value[agent_idx]
+                kwargs[key] = value[agent_idx]
             else:
-                agent_kwargs[key] = value
+                kwargs[key] = value
+        agent_kwargs.append(kwargs)
+    
+    if stacked:
+        shape = (params.n_agents, params.n_states, params.n_actions)
+        if all(strategy == 'R' for strategy in strategies) and all(k == agent_kwargs[0] for k in agent_kwargs):
+            # Agents draw consecutive state-major blocks: one block covers them all
+            min_val = agent_kwargs[0].get('min_val', 0.0)
+            max_val = agent_kwargs[0].get('max_val', 1.0)
+            u = rng.ran2_block(int(np.prod(shape))).reshape(shape)
+            return (min_val + (max_val - min_val) * u).astype(np.float64)
         
-        Q = init_Q(strategy, params, rng, agent_idx, **agent_kwargs)
+        Q_stack = np.empty(shape, dtype=np.float64)
+        for agent_idx, strategy in enumerate(strategies):
+            Q_stack[agent_idx] = init_Q(strategy, params, rng, agent_idx, **agent_kwargs[agent_idx])
+        return Q_stack
+    
+    Q_matrices = []
+    for agent_idx, strategy in enumerate(strategies):
+        Q = init_Q(strategy, params, rng, agent_idx, **agent_kwargs[agent_idx])
         Q_matrices.append(Q)
     
     return Q_matrices
@@ -0,0 +1,328 @@
+"""
+Compiled kernel backend for the Q-learning session loop.
+
+``session_loop`` runs a whole session -- L'Ecuyer ``ran2`` draws, greedy or
+Boltzmann action choice, table lookups, the Q update, the periodic greedy
+strategy update and the convergence check -- in one function that numba
+compiles to machine code. Draws are consumed in the order used by
+``learning_simulation.compute_experiment`` and sums follow NumPy's pairwise
+summation, so the compiled loop reproduces the Python loop.
+
+numba is optional: without it the functions below stay plain Python and
+``resolve_backend`` falls back to the Python loop with a warning.
+"""
+
+import warnings
+
+import numpy as np
+
+from .rng.Lecuyer import IM1, IM2, IMM1, IA1, IA2, IQ1, IQ2, IR1, IR2, NTAB, NDIV, AM, RNMX
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+KERNEL_BACKENDS = ('python', 'numba')
+
+# Largest block NumPy's pairwise summation adds without splitting
+_PW_BLOCKSIZE = 128
+
+
+def _jit(func):
+    """Compile with numba when available, otherwise leave the function as is."""
+    if NUMBA_AVAILABLE:
+        return numba.njit(cache=True)(func)
+    return func
+
+
+def resolve_backend(backend: str) -> str:
+    """
+    Validate a kernel backend name, falling back to Python if numba is missing.
+
+    Args:
+        backend: Requested backend ('python' or 'numba')
+
+    Returns:
+        Backend that will actually run
+    """
+    if backend not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{backend}'. Must be one of {KERNEL_BACKENDS}")
+    if backend == 'numba' and not NUMBA_AVAILABLE:
+        warnings.warn("numba is not installed; falling back to the Python kernel backend")
+        return 'python'
+    return backend
+
+
+@_jit
+def ran2(rng_state, iv):
+    """
+    L'Ecuyer ran2 on an explicit state.
+
+    Args:
+        rng_state: int64 array (idum, idum2, iy), updated in place
+        iv: int64 shuffle table of length NTAB, updated in place
+
+    Returns:
+        Uniform deviate in (0, 1)
+    """
+    idum = rng_state[0]
+    k = idum // IQ1
+    idum = IA1 * (idum - k * IQ1) - k * IR1
+    if idum < 0:
+        idum += IM1
+
+    idum2 = rng_state[1]
+    k = idum2 // IQ2
+    idum2 = IA2 * (idum2 - k * IQ2) - k * IR2
+    if idum2 < 0:
+        idum2 += IM2
+
+    j = min(1 + rng_state[2] // NDIV, NTAB) - 1
+    iy = iv[j] - idum2
+    iv[j] = idum
+    if iy < 1:
+        iy += IMM1
+
+    rng_state[0] = idum
+    rng_state[1] = idum2
+    rng_state[2] = iy
+    return min(AM * iy, RNMX)
+
+
+@_jit
+def _pairwise_block(values, start, n):
+    """NumPy's unrolled summation of a block of at most _PW_BLOCKSIZE values."""
+    if n < 8:
+        total = 0.0
+        for i in range(start, start + n):
+            total += values[i]
+        return total
+    r = np.empty(8)
+    for j in range(8):
+        r[j] = values[start + j]
+    i = 8
+    while i < n - n % 8:
+        for j in range(8):
+            r[j] += values[start + i + j]
+        i += 8
+    total = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+    while i < n:
+        total += values[start + i]
+        i += 1
+    return total
+
+
+@_jit
+def pairwise_sum(values, start, n):
+    """
+    Sum ``values[start:start + n]`` in the same order as ``np.sum``.
+
+    NumPy halves blocks larger than _PW_BLOCKSIZE recursively; the halving is
+    replayed with an explicit stack because numba cannot cache recursive functions.
+    """
+    if n <= _PW_BLOCKSIZE:
+        return _pairwise_block(values, start, n)
+    # Pending tasks (start, n, combine flag) and partial sums
+    task_start = np.empty(128, dtype=np.int64)
+    task_n = np.empty(128, dtype=np.int64)
+    task_combine = np.empty(128, dtype=np.bool_)
+    partial = np.empty(128)
+    n_tasks = 1
+    n_partial = 0
+    task_start[0] = start
+    task_n[0] = n
+    task_combine[0] = False
+    while n_tasks > 0:
+        n_tasks -= 1
+        lo = task_start[n_tasks]
+        size = task_n[n_tasks]
+        if task_combine[n_tasks]:
+            n_partial -= 1
+            partial[n_partial - 1] = partial[n_partial - 1] + partial[n_partial]
+        elif size <= _PW_BLOCKSIZE:
+            partial[n_partial] = _pairwise_block(values, lo, size)
+            n_partial += 1
+        else:
+            n2 = size // 2
+            n2 -= n2 % 8
+            # Combine after both halves; the left half is evaluated first
+            task_combine[n_tasks] = True
+            task_start[n_tasks + 1] = lo + n2
+            task_n[n_tasks + 1] = size - n2
+            task_combine[n_tasks + 1] = False
+            task_start[n_tasks + 2] = lo
+            task_n[n_tasks + 2] = n2
+            task_combine[n_tasks + 2] = False
+            n_tasks += 3
+    return partial[0]
+
+
+@_jit
+def max_loc_break_ties(row, u):
+    """Index of the maximum of ``row``, ties broken with the deviate ``u``."""
+    max_val = row[0]
+    for i in range(1, row.shape[0]):
+        if row[i] > max_val:
+            max_val = row[i]
+    n_ties = 0
+    for i in range(row.shape[0]):
+        if row[i] == max_val:
+            n_ties += 1
+    pick = int(u * n_ties)
+    for i in range(row.shape[0]):
+        if row[i] == max_val:
+            if pick == 0:
+                return i
+            pick -= 1
+    return row.shape[0] - 1
+
+
+@_jit
+def session_loop(q, strategies, rng_state, iv, state, profits, next_state_table, powers,
+                 alpha, delta, exploration_parameters, greedy, max_iterations,
+                 n_perfect_measurement, window, tol):
+    """
+    Run one learning session in place.
+
+    Args:
+        q: Q matrices, shape (n_agents, n_states, n_actions), float64 or
+            float32, updated in place
+        strategies: Greedy strategies, shape (n_agents, n_states), updated in place
+        rng_state: int64 array (idum, idum2, iy), updated in place
+        iv: int64 shuffle table, updated in place
+        state: Initial state index
+        profits: Profit table, shape (n_profiles, n_agents)
+        next_state_table: Transition table, shape (n_profiles,)
+        powers: Action-number weights ``n_actions ** agent``
+        alpha: Learning rate
+        delta: Discount factor
+        exploration_parameters: Exploration parameter of each agent
+        greedy: True for epsilon-greedy, False for Boltzmann exploration
+        max_iterations: Iteration limit
+        n_perfect_measurement: Strategy/price measurement interval
+        window: Number of measurements in the convergence window
+        tol: Price range tolerance
+
+    Returns:
+        Tuple (iterations run, converged flag)
+    """
+    n_agents, n_states, n_actions = q.shape
+    actions = np.empty(n_agents, dtype=np.int64)
+    exp_values = np.empty(n_actions)
+    history = np.zeros((max(window, 1), n_agents))
+    n_recorded = 0
+
+    for iteration in range(max_iterations):
+        # Action choice
+        for agent in range(n_agents):
+            row = q[agent, state]
+            if greedy:
+                if ran2(rng_state, iv) < exploration_parameters[agent]:
+                    actions[agent] = int(ran2(rng_state, iv) * n_actions)
+                else:
+                    actions[agent] = max_loc_break_ties(row, ran2(rng_state, iv))
+            else:
+                for a in range(n_actions):
+                    exp_values[a] = np.exp(row[a] / exploration_parameters[agent])
+                total = pairwise_sum(exp_values, 0, n_actions)
+                u = ran2(rng_state, iv)
+                cumulative = 0.0
+                chosen = n_actions - 1
+                for a in range(n_actions):
+                    cumulative += exp_values[a] / total
+                    if u <= cumulative:
+                        chosen = a
+                        break
+                actions[agent] = chosen
+
+        # Table lookups and Q update
+        action_number = 0
+        for agent in range(n_agents):
+            action_number += actions[agent] * powers[agent]
+        next_state = next_state_table[action_number]
+        for agent in range(n_agents):
+            # Double-precision update whatever the storage dtype of q
+            old_q = np.float64(q[agent, state, actions[agent]])
+            max_next_q = np.float64(q[agent, next_state, 0])
+            for a in range(1, n_actions):
+                if q[agent, next_state, a] > max_next_q:
+                    max_next_q = np.float64(q[agent, next_state, a])
+            q[agent, state, actions[agent]] = (
+                (1 - alpha) * old_q + alpha * (profits[action_number, agent] + delta * max_next_q)
+            )
+        state = next_state
+
+        if iteration % n_perfect_measurement == 0:
+            for agent in range(n_agents):
+                for s in range(n_states):
+                    strategies[agent, s] = max_loc_break_ties(q[agent, s], ran2(rng_state, iv))
+
+            # Ring buffer of the last ``window`` measured prices
+            slot = n_recorded % history.shape[0]
+            for agent in range(n_agents):
+                history[slot, agent] = actions[agent] / (n_actions - 1)
+            n_recorded += 1
+
+            if n_recorded >= window:
+                converged = True
+                for agent in range(n_agents):
+                    lo = history[0, agent]
+                    hi = history[0, agent]
+                    for i in range(1, history.shape[0]):
+                        lo = min(lo, history[i, agent])
+                        hi = max(hi, history[i, agent])
+                    if hi - lo > tol:
+                        converged = False
+                        break
+                if converged:
+                    return iteration + 1, True
+
+    return max_iterations, False
+
+
+def run_session_kernel(q_matrices, rng, state, tables, params, alpha, exploration_parameters, delta):
+    """
+    Run ``session_loop`` on a session initialized by the Python path.
+
+    The generator state is copied into the kernel and written back afterwards,
+    so ``rng`` continues exactly where the compiled loop stopped.
+
+    Args:
+        q_matrices: Per-agent Q matrices (updated in place)
+        rng: LecuyerCombined generator of the session
+        state: Initial state index
+        tables: GameTables of the experiment
+        params: Simulation parameters
+        alpha: Learning rate
+        exploration_parameters: Exploration parameter of each agent
+        delta: Discount factor
+
+    Returns:
+        Tuple containing:
+        - Strategies for each agent
+        - Iterations run
+        - Converged flag
+    """
+    q = np.ascontiguousarray(np.stack(q_matrices))
+    strategies = np.zeros((params.n_agents, params.n_states), dtype=np.int32)
+    rng_state = np.array([rng.idum, rng.idum2, rng.iy], dtype=np.int64)
+    iv = np.array(rng.iv, dtype=np.int64)
+    powers = params.n_actions ** np.arange(params.n_agents, dtype=np.int64)
+
+    n_iterations, converged = session_loop(
+        q, strategies, rng_state, iv, int(state), tables.profits,
+        tables.next_state.astype(np.int64), powers, float(alpha), float(delta),
+        np.asarray(exploration_parameters, dtype=np.float64), params.exploration_type == 1,
+        int(params.max_iterations), int(params.n_perfect_measurement),
+        int(params.convergence_window // params.n_perfect_measurement),
+        float(params.convergence_tolerance)
+    )
+
+    rng.idum, rng.idum2, rng.iy = int(rng_state[0]), int(rng_state[1]), int(rng_state[2])
+    rng.iv = iv
+    for agent, q_matrix in enumerate(q_matrices):
+        q_matrix[...] = q[agent]
+    return [strategies[agent] for agent in range(params.n_agents)], int(n_iterations), bool(converged)
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from .params import SimParams, SimResults
 from .QL_routines import (
     init_state,
@@ -10,20 +10,37 @@ from .QL_routines import (
     max_loc_break_ties,
     convert_number_base
 )
-from .init.QInit import init_Q, validate_Q_matrix
+from .init.QInit import init_all_agents_Q, validate_Q_matrix
+from .q_storage import DEFAULT_PAGE_ROWS, Q_STORAGE_BACKENDS, init_lazy_Q
+from .game_tables import get_game_tables
+from .kernels import resolve_backend, run_session_kernel
+from .scheduler import SchedulerStats, iter_scheduled_simulations
+from .strategy_tracker import StrategyTracker
 from .rng.Lecuyer import get_global_raw_rng, get_global_rng
-from .worker import get_worker_rng, get_worker_params
-from .convergence import has_converged, analyze_convergence
-from .dtype_policy import DTYPE, zeros, array
-import multiprocessing as mp
+from .worker import get_worker_rng, get_worker_params, init_session_rng
+from .convergence import ConvergenceDetector
+from .dtype_policy import DTYPE, q_dtype, zeros, array
+import os
 from functools import partial
 
+# Engines of run_parallel_simulations: one session per task, or the sessions
+# of an experiment in lockstep batches (``batch_learning``)
+SESSION_ENGINES = ('session', 'batch')
+
+# Job keys shared by all sessions of one experiment
+EXPERIMENT_JOB_KEYS = ('i_experiment', 'cod_experiment', 'alpha', 'exploration_parameters', 'delta')
+
+def draws_per_choice(params: SimParams) -> int:
+    """Number of ran2() deviates one action choice consumes."""
+    return 2 if params.exploration_type == 1 else 1
+
 def compute_p_prime(
     current_state: int,
     agent_index: int,
     q_matrix: np.ndarray,
     exploration_parameter: float,
-    params: SimParams
+    params: SimParams,
+    uniforms: Optional[List[float]] = None
 ) -> int:
     """
     Compute the next price (action) for an agent using epsilon-greedy or Boltzmann exploration.
@@ -34,97 +51,179 @@ def compute_p_prime(
         q_matrix: Q-value matrix for the agent
         exploration_parameter: Exploration parameter
         params: Simulation parameters
+        uniforms: Pre-drawn deviates (two for greedy, one for Boltzmann
+            exploration); drawn from the worker RNG if omitted
         
     Returns:
         Next action (price index)
     """
-    rng = get_worker_rng()
+    if uniforms is None:
+        rng = get_worker_rng()
+        uniforms = [rng.ran2() for _ in range(draws_per_choice(params))]
     
     if params.exploration_type == 1:  # Greedy exploration
-        if rng.ran2() < exploration_parameter:
+        if uniforms[0] < exploration_parameter:
             # Explore: choose random action
-            return int(rng.ran2() * params.n_actions)
+            return int(uniforms[1] * params.n_actions)
         else:
             # Exploit: choose best action
-            max_val, max_loc = max_loc_break_ties(q_matrix[current_state, :], params)
+            max_val, max_loc = max_loc_break_ties(q_matrix[current_state, :], params, u=uniforms[1])
             return max_loc
     else:  # Boltzmann exploration
         # Compute Boltzmann probabilities
-        q_values = q_matrix[current_state, :]
+        q_values = np.asarray(q_matrix[current_state, :], dtype=DTYPE)
         exp_values = np.exp(q_values / exploration_parameter)
         probabilities = exp_values / np.sum(exp_values)
         
         # Sample action according to probabilities
         cumulative_prob = 0.0
-        random_value = rng.ran2()
+        random_value = uniforms[0]
         for action in range(params.n_actions):
             cumulative_prob += probabilities[action]
             if random_value <= cumulative_prob:
                 return action
         return params.n_actions - 1  # Fallback
 
-def compute_experiment(
-    i_experiment: int,
-    cod_experiment: int,
+# Strategy-specific keyword arguments forwarded from params to init_Q
+Q_INIT_KWARGS = (
+    'fixed_price', 'q_init_path', 'coop_price', 'punish_price', 'coop_value',
+    'punish_value', 'random_scale', 'min_val', 'max_val', 'constant_value'
+)
+
+def init_session_q(
+    params: SimParams,
+    rng: Any,
+    storage: Optional[str] = None,
+    precision: Optional[str] = None
+) -> List[Any]:
+    """
+    Initialize and validate the Q matrices of all agents for one session.
+    
+    Args:
+        params: Simulation parameters
+        rng: L'Ecuyer generator used by the random strategies
+        storage: Q storage backend, 'dense' or 'lazy' (default:
+            ``params.q_storage``, falling back to 'dense')
+        precision: Precision policy of the stored Q values, 'double' or
+            'mixed' (default: ``params.precision``, falling back to 'double')
+        
+    Returns:
+        List of Q matrices, one per agent (dense arrays or LazyQTables)
+    """
+    if storage is None:
+        storage = getattr(params, 'q_storage', 'dense')
+    if storage not in Q_STORAGE_BACKENDS:
+        raise ValueError(f"Unknown Q storage '{storage}'. Must be one of {Q_STORAGE_BACKENDS}")
+    if precision is None:
+        precision = getattr(params, 'precision', None)
+    dtype = q_dtype(precision)
+    
+    init_kwargs = {
+        name: getattr(params, name) for name in Q_INIT_KWARGS
+        if getattr(params, name, None) is not None
+    }
+    
+    if storage == 'lazy':
+        # Pages are filled from the initializer on first write; the generator advances as for dense
+        page_rows = getattr(params, 'q_page_rows', DEFAULT_PAGE_ROWS)
+        return [
+            init_lazy_Q(params.q_strategy, params, rng, agent, page_rows=page_rows, dtype=dtype,
+                        **init_kwargs)
+            for agent in range(params.n_agents)
+        ]
+    
+    q_stack = init_all_agents_Q(
+        [params.q_strategy] * params.n_agents,
+        params,
+        rng,
+        stacked=True,
+        **init_kwargs
+    )
+    for q_matrix in q_stack:
+        validate_Q_matrix(q_matrix, params)
+    
+    # Initial values are computed in double precision and rounded once for storage
+    return list(q_stack.astype(dtype, copy=False))
+
+def compute_session(
     alpha: float,
     exploration_parameters: np.ndarray,
-    delta: float
-) -> Tuple[List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]:
+    delta: float,
+    backend: Optional[str] = None
+) -> Tuple[List[np.ndarray], List[np.ndarray], int]:
     """
-    Compute a single Q-learning experiment.
+    Run the learning loop of one session on the worker's parameters and RNG.
     
     Args:
-        i_experiment: Experiment index
-        cod_experiment: Experiment code
         alpha: Learning rate
         exploration_parameters: Array of exploration parameters
         delta: Discount factor
+        backend: Kernel backend, 'python' or 'numba' (default: ``params.backend``,
+            falling back to 'python')
         
     Returns:
         Tuple containing:
         - Q matrices for each agent
         - Strategies for each agent
-        - States at convergence
-        - Prices at convergence
+        - Iterations run (the convergence time if the session converged)
     """
     # Get worker's parameters and RNG
     params = get_worker_params()
     rng = get_worker_rng()
+    if backend is None:
+        backend = getattr(params, 'backend', 'python')
+    backend = resolve_backend(backend)
     
     # Initialize Q matrices using new system
-    q_matrices = []
-    for agent in range(params.n_agents):
-        q_matrix = init_Q(
-            strategy=params.q_strategy,
-            params=params,
-            rng=rng,
-            agent_idx=agent,
-            fixed_price=params.fixed_price,
-            q_init_path=params.q_init_path,
-            coop_price=params.coop_price,
-            punish_price=params.punish_price,
-            coop_value=params.coop_value,
-            punish_value=params.punish_value,
-            random_scale=params.random_scale,
-            min_val=params.min_val,
-            max_val=params.max_val,
-            constant_value=params.constant_value
-        )
-        validate_Q_matrix(q_matrix, params)
-        q_matrices.append(q_matrix)
+    q_matrices = init_session_q(params, rng)
+    if backend == 'numba' and not isinstance(q_matrices[0], np.ndarray):
+        raise ValueError("The numba kernel backend requires dense Q storage")
     
-    # Initialize strategies
-    strategies = [zeros((params.n_states,), dtype=np.int32) for _ in range(params.n_agents)]
+    # Profit and transition tables (built once per demand model)
+    tables = get_game_tables(params)
     
     # Initialize state
-    current_state = init_state(params)
+    current_state = init_state(params, rng)
+    
+    if backend == 'numba':
+        strategies, n_iterations, _ = run_session_kernel(
+            q_matrices, rng, current_state, tables, params, alpha, exploration_parameters, delta
+        )
+        return q_matrices, strategies, n_iterations
     
-    # Track price history for convergence
-    price_history = []
-    strategy_history = []
+    # Updates are computed in double precision; under a mixed policy the
+    # tracker must see the rounded value that was actually stored
+    round_q = None if q_matrices[0].dtype == DTYPE else q_matrices[0].dtype.type
+    
+    # Row maxima and greedy strategies, maintained incrementally
+    tracker = StrategyTracker(q_matrices)
+    strategies = tracker.strategies
+    
+    # Streaming convergence check over the last measurements
+    detector = ConvergenceDetector(
+        params.n_agents,
+        params.convergence_window // params.n_perfect_measurement,
+        params.convergence_tolerance
+    )
+    n_iterations = params.max_iterations
+    
+    # Deviates are pre-drawn one measurement period at a time
+    npm = params.n_perfect_measurement
+    n_choice_draws = draws_per_choice(params)
+    uniforms: List[float] = []
+    pos = 0
     
     # Main learning loop
     for iteration in range(params.max_iterations):
+        if pos == len(uniforms):
+            # Everything up to and including the next measurement iteration
+            period_end = min(-(-iteration // npm) * npm, params.max_iterations - 1)
+            n_draws = (period_end - iteration + 1) * params.n_agents * n_choice_draws
+            if period_end % npm == 0:
+                n_draws += params.n_agents * params.n_states
+            uniforms = rng.ran2_block(n_draws).tolist()
+            pos = 0
+        
         # Generate actions for each agent
         actions = []
         for agent in range(params.n_agents):
@@ -133,44 +232,71 @@ def compute_experiment(
                 agent,
                 q_matrices[agent],
                 exploration_parameters[agent],
-                params
+                params,
+                uniforms=uniforms[pos:pos + n_choice_draws]
             )
+            pos += n_choice_draws
             actions.append(action)
         
-        # Compute next state
-        next_state = compute_state_number(actions, params)
-        
-        # Compute rewards
-        rewards = compute_rewards(actions, params)
+        # Look up next state and rewards in the precomputed game tables
+        action_number = compute_action_number(actions, params)
+        next_state = tables.next_state[action_number]
+        rewards = tables.profits[action_number]
         
         # Update Q values
         for agent in range(params.n_agents):
-            old_q = q_matrices[agent][current_state, actions[agent]]
-            max_next_q = np.max(q_matrices[agent][next_state, :])
+            old_q = float(q_matrices[agent][current_state, actions[agent]])
+            max_next_q = tracker.row_max[agent][next_state]
             new_q = (1 - alpha) * old_q + alpha * (rewards[agent] + delta * max_next_q)
             q_matrices[agent][current_state, actions[agent]] = new_q
+            if round_q is not None:
+                new_q = float(round_q(new_q))
+            tracker.update(agent, current_state, actions[agent], old_q, new_q)
         
         # Update state
         current_state = next_state
         
         # Update strategies and check convergence periodically
         if iteration % params.n_perfect_measurement == 0:
-            # Update strategies
-            for agent in range(params.n_agents):
-                for state in range(params.n_states):
-                    max_val, max_loc = max_loc_break_ties(q_matrices[agent][state, :], params)
-                    strategies[agent][state] = max_loc
-            
-            # Record prices and strategies for convergence check
-            current_prices = array([actions[agent] / (params.n_actions - 1) for agent in range(params.n_agents)])
-            price_history.append(current_prices)
-            strategy_history.append([s.copy() for s in strategies])
+            # Update strategies (one tie-break deviate per agent and state)
+            n_rows = params.n_agents * params.n_states
+            tracker.measure(uniforms[pos:pos + n_rows])
+            pos += n_rows
             
-            # Check convergence
-            if len(price_history) >= params.convergence_window // params.n_perfect_measurement:
-                price_hist_array = array(price_history)
-                if has_converged(price_hist_array, params.convergence_window // params.n_perfect_measurement, params.convergence_tolerance):
-                    break
+            # Check convergence on the measured prices
+            current_prices = [actions[agent] / (params.n_actions - 1) for agent in range(params.n_agents)]
+            if detector.update(current_prices, iteration, strategy_changed=tracker.unchanged_periods == 0):
+                n_iterations = iteration + 1
+                break
+    
+    return q_matrices, strategies, n_iterations
+
+def compute_experiment(
+    i_experiment: int,
+    cod_experiment: int,
+    alpha: float,
+    exploration_parameters: np.ndarray,
+    delta: float
+) -> Tuple[List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Compute a single Q-learning experiment.
+    
+    Args:
+        i_experiment: Experiment index
+        cod_experiment: Experiment code
+        alpha: Learning rate
+        exploration_parameters: Array of exploration parameters
+        delta: Discount factor
+        
+    Returns:
+        Tuple containing:
+        - Q matrices for each agent
+        - Strategies for each agent
+        - States at convergence
+        - Prices at convergence
+    """
+    params = get_worker_params()
+    q_matrices, strategies, _ = compute_session(alpha, exploration_parameters, delta)
     
     # Get final states and prices
     states = get_states_at_convergence(strategies, params)
@@ -200,6 +326,10 @@ def run_simulation(job_args: Dict[str, Any]) -> Tuple[List[np.ndarray], List[np.
     exploration_parameters = job_args['exploration_parameters']
     delta = job_args['delta']
     
+    # Each session draws from its own (experiment, session) substream
+    if 'i_session' in job_args:
+        init_session_rng(job_args['i_session'], i_experiment)
+    
     # Run experiment (params are available via get_worker_params())
     q_matrices, strategies, states, prices = compute_experiment(
         i_experiment,
@@ -211,47 +341,113 @@ def run_simulation(job_args: Dict[str, Any]) -> Tuple[List[np.ndarray], List[np.
     
     return q_matrices, strategies, states, prices
 
+def run_simulation_batch(job_args: Dict[str, Any]) -> List[Tuple[List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]]:
+    """
+    Run the sessions of a batch job in lockstep.
+    Worker function for multiprocessing.
+    
+    Args:
+        job_args: Experiment job arguments plus the ``sessions`` to run
+        
+    Returns:
+        Per-session results in the ``run_simulation`` format, in ``sessions`` order
+    """
+    from .batch_learning import compute_experiment_batch
+    
+    results, _ = compute_experiment_batch(
+        get_worker_params(),
+        job_args['alpha'],
+        job_args['exploration_parameters'],
+        job_args['delta'],
+        sessions=job_args['sessions'],
+        experiment=job_args['i_experiment']
+    )
+    return results
+
+def batch_jobs(job_list: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
+    """
+    Group the sessions of every experiment into batch jobs.
+    
+    Args:
+        job_list: Session jobs, each with an ``i_session``
+        batch_size: Most sessions per batch job
+        
+    Returns:
+        Batch jobs: the experiment's job arguments plus ``sessions`` and
+        ``positions`` (the sessions' indices into job_list)
+    """
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for position, job in enumerate(job_list):
+        key = (job['i_experiment'], job['cod_experiment'], job['alpha'],
+               tuple(np.atleast_1d(job['exploration_parameters']).tolist()), job['delta'])
+        group = groups.setdefault(key, {'job': job, 'sessions': [], 'positions': []})
+        group['sessions'].append(job['i_session'])
+        group['positions'].append(position)
+    
+    batches = []
+    for group in groups.values():
+        for start in range(0, len(group['sessions']), batch_size):
+            batch = {name: group['job'][name] for name in EXPERIMENT_JOB_KEYS}
+            batch['sessions'] = group['sessions'][start:start + batch_size]
+            batch['positions'] = group['positions'][start:start + batch_size]
+            batches.append(batch)
+    return batches
+
 def run_parallel_simulations(
     params: SimParams,
-    job_list: List[Dict[str, Any]]
+    job_list: List[Dict[str, Any]],
+    stats: Optional[SchedulerStats] = None,
+    verbose: bool = True
 ) -> List[Tuple[List[np.ndarray], List[np.ndarray], np.ndarray, np.ndarray]]:
     """
     Run multiple simulations in parallel.
     
+    Sessions are handed out one at a time, longest-expected-first, by
+    ``scheduler.iter_scheduled_simulations``; use that generator directly to
+    consume results as they finish. With ``params.engine == 'batch'`` the
+    sessions of each experiment are instead run in lockstep batches of
+    ``params.batch_size`` (default: spread over the workers) by
+    ``batch_learning.compute_experiment_batch``, with the same results.
+    
     Args:
         params: Simulation parameters
-        job_list: List of job arguments for each simulation
+        job_list: List of job arguments for each simulation (jobs without an
+            ``i_session`` key are numbered by their position in the list)
+        stats: Optional SchedulerStats that receives per-worker utilization
+        verbose: Print the utilization report when the run is done
         
     Returns:
-        List of results from each simulation
+        List of results from each simulation, in job_list order
     """
-    from .worker import init_worker
+    job_list = [dict(job, i_session=job.get('i_session', i)) for i, job in enumerate(job_list)]
+    engine = getattr(params, 'engine', 'session')
+    if engine not in SESSION_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Must be one of {SESSION_ENGINES}")
     
-    # Create process pool with worker initialization
-    with mp.Pool(
-        processes=params.n_cores,
-        initializer=init_worker,
-        initargs=(0, params.rng_seed, params)
-    ) as pool:
-        results = pool.map(run_simulation, job_list)
+    if stats is None:
+        stats = SchedulerStats()
+    results = [None] * len(job_list)
+    if engine == 'session':
+        for index, result in iter_scheduled_simulations(params, job_list, stats=stats):
+            results[index] = result
+    else:
+        if getattr(params, 'q_storage', 'dense') != 'dense':
+            raise ValueError("The batch engine requires dense Q storage")
+        n_workers = getattr(params, 'n_cores', None) or os.cpu_count() or 1
+        batch_size = getattr(params, 'batch_size', None) or -(-len(job_list) // n_workers)
+        batches = batch_jobs(job_list, batch_size)
+        for index, batch_results in iter_scheduled_simulations(params, batches, n_workers, stats=stats):
+            for position, result in zip(batches[index]['positions'], batch_results):
+                results[position] = result
     
+    if verbose:
+        print(stats.summary())
     return results
 
 def compute_rewards(actions: List[int], params: SimParams) -> List[float]:
-    """Compute rewards for each agent based on actions."""
-    # Convert actions to prices
-    prices = [action / (params.n_actions - 1) for action in actions]
-    
-    # Compute demands using logit model
-    utilities = [params.a0 - params.a * p + params.c for p in prices]
-    exp_utilities = np.exp(np.array(utilities) / params.mu)
-    total_exp = np.sum(exp_utilities)
-    demands = exp_utilities / total_exp
-    
-    # Compute profits
-    profits = [p * d for p, d in zip(prices, demands)]
-    
-    return profits
+    """Compute rewards for each agent based on actions (game-table lookup)."""
+    tables = get_game_tables(params)
+    return tables.profits[compute_action_number(actions, params)].tolist()
 
 def get_states_at_convergence(strategies: List[np.ndarray], params: SimParams) -> np.ndarray:
     """Get states at convergence from strategies."""
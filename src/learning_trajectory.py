@@ -1,9 +1,10 @@
 import numpy as np
 from typing import List, Tuple, Dict
 from globals import GlobalVars
-from QL_routines import compute_q_cell, init_q_matrices, compute_p_prime
+from QL_routines import init_q_matrices, compute_p_prime
 from generic_routines import are_equal_reals, convert_number_base, compute_state_number, compute_action_number
 from impulse_response import compute_static_best_response
+from policy_evaluation import evaluate_strategy_globals
 
 def compute_learning_trajectory(
     i_experiment: int,
@@ -133,20 +134,12 @@ def compute_learning_trajectory(
                 pg_sum = 0.0
                 
                 # Incentive Compatibility
+                q_true = evaluate_strategy_globals(strategy, globals, delta).q_true
                 for i_cycle in range(cycle_length_session):
                     ss1 = cycle_states_session[i_cycle]
                     for i_agent in range(globals.num_agents):
-                        q_row_values = np.zeros(globals.num_prices)
-                        for i_price in range(globals.num_prices):
-                            # Compute row of true Q matrix
-                            q_row_values[i_price], _, _, _ = compute_q_cell(
-                                strategy,
-                                ss1,
-                                i_price,
-                                i_agent,
-                                delta,
-                                globals
-                            )
+                        # Row of true Q matrix
+                        q_row_values = q_true[ss1, :, i_agent]
                         
                         if are_equal_reals(
                             np.max(q_row_values),
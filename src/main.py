@@ -8,6 +8,7 @@ Supports multiple execution modes:
 """
 
 import argparse
+import copy
 import json
 import os
 import sys
@@ -20,6 +21,9 @@ import numpy as np
 # Core simulation imports
 from params import SimParams
 from q_learning import run_simulation
+from run_logs import RUN_LOG_FILE, RunLog, find_json_logs, find_run_log, write_run_log
+from result_cache import ResultCache, cache_key
+from sequential_sampling import SequentialStopper, run_metrics
 
 # Simplified Phase 2 analysis imports (only essential ones)
 try:
@@ -77,54 +81,65 @@ def load_config(config_path: str) -> Dict:
     return config
 
 
-def save_run_logs(run_results: List[Dict], output_dir: str) -> None:
+def run_log_summary(n_runs: int, sequential: Optional[Dict] = None) -> Dict:
     """
-    Save simulation run logs to files.
+    Summary record of a set of runs, as written to ``logs/summary.json``.
+    
+    Args:
+        n_runs: Number of runs in the run log
+        sequential: Report of sequential early stopping, if the runs used it
+        
+    Returns:
+        Summary dictionary
+    """
+    summary = {
+        'n_runs': n_runs,
+        'config_used': 'config.json',
+        'run_log': RUN_LOG_FILE,
+        'timestamp': datetime.now().isoformat()
+    }
+    if sequential is not None:
+        summary['sequential'] = sequential
+    return summary
+
+
+def save_run_logs(run_results: List[Dict], output_dir: str, sequential: Optional[Dict] = None) -> None:
+    """
+    Save simulation run logs to a columnar run-log store.
     
     Args:
         run_results: List of run result dictionaries
         output_dir: Output directory path
+        sequential: Report of sequential early stopping, stored in the summary
     """
     logs_dir = Path(output_dir) / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
     
-    # Save individual run logs
-    for i, result in enumerate(run_results):
-        log_file = logs_dir / f"run_{i:04d}.json"
-        
-        # Convert numpy arrays to lists for JSON serialization
-        serializable_result = {}
-        for key, value in result.items():
-            if isinstance(value, np.ndarray):
-                serializable_result[key] = value.tolist()
-            elif isinstance(value, (np.bool_, np.integer, np.floating)):
-                serializable_result[key] = value.item()  # Convert numpy scalars to Python types
-            else:
-                serializable_result[key] = value
-        
-        with open(log_file, 'w') as f:
-            json.dump(serializable_result, f, indent=2)
+    # One file for all runs: scalar metrics as columns, histories as per-run chunks
+    write_run_log(run_results, logs_dir / RUN_LOG_FILE)
     
     # Save aggregated summary
     summary_file = logs_dir / "summary.json"
-    summary = {
-        'n_runs': len(run_results),
-        'config_used': 'config.json',
-        'timestamp': datetime.now().isoformat()
-    }
+    summary = run_log_summary(len(run_results), sequential)
     
     with open(summary_file, 'w') as f:
         json.dump(summary, f, indent=2)
     
-    print(f"✓ Saved {len(run_results)} run logs to {logs_dir}")
+    print(f"✓ Saved {len(run_results)} run logs to {logs_dir / RUN_LOG_FILE}")
 
 
-def load_run_logs(log_dir: str) -> List[Dict]:
+def load_run_logs(log_dir: str, columns: Optional[List[str]] = None, mmap: bool = False) -> List[Dict]:
     """
     Load simulation run logs from directory.
     
+    Reads the columnar run-log store if present and falls back to the
+    per-run JSON logs of older runs.
+    
     Args:
         log_dir: Directory containing log files
+        columns: Keys to load (default: all; only honoured by the columnar store)
+        mmap: Memory-map price/profit histories instead of reading them
+            (columnar store only)
         
     Returns:
         List of run result dictionaries
@@ -133,14 +148,14 @@ def load_run_logs(log_dir: str) -> List[Dict]:
     if not logs_path.exists():
         raise FileNotFoundError(f"Log directory not found: {log_dir}")
     
-    # Look for log files
-    run_files = sorted(logs_path.glob("run_*.json"))
-    if not run_files:
-        # Try loading from logs subdirectory
-        logs_subdir = logs_path / "logs"
-        if logs_subdir.exists():
-            run_files = sorted(logs_subdir.glob("run_*.json"))
+    run_log = find_run_log(log_dir)
+    if run_log is not None:
+        with RunLog(run_log) as log:
+            run_results = log.runs(columns, mmap=mmap)
+        print(f"✓ Loaded {len(run_results)} run logs from {run_log}")
+        return run_results
     
+    run_files = find_json_logs(log_dir)
     if not run_files:
         raise FileNotFoundError(f"No run log files found in {log_dir}")
     
@@ -160,10 +175,54 @@ def load_run_logs(log_dir: str) -> List[Dict]:
     return run_results
 
 
+def simulation_cache_key(params: SimParams, n_runs: int) -> str:
+    """Result-cache key of ``n_runs`` runs of a parameter set."""
+    return cache_key(params.to_dict(), params.rng_seed, n_runs)
+
+
+def restore_cached_simulation(config: Dict, output_dir: str,
+                              cache: Optional[ResultCache] = None) -> Optional[Dict]:
+    """
+    Restore the logs of a cached simulation into ``output_dir``.
+    
+    Args:
+        config: Configuration dictionary
+        output_dir: Output directory path
+        cache: Result cache (default: selected by the config)
+        
+    Returns:
+        Summary dictionary as written to ``logs/summary.json``, or None on a
+        cache miss or when the config disables the cache
+    """
+    if cache is None:
+        cache = ResultCache.from_config(config)
+    if cache is None:
+        return None
+    
+    key = simulation_cache_key(SimParams(config), config.get('n_runs', 10))
+    logs_dir = Path(output_dir) / "logs"
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    if not cache.restore(key, logs_dir / RUN_LOG_FILE):
+        return None
+    
+    with RunLog(logs_dir / RUN_LOG_FILE) as log:
+        summary = run_log_summary(log.n_runs)
+    with open(logs_dir / "summary.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
 def run_simulation_mode(config: Dict, output_dir: str, n_runs: int = None) -> List[Dict]:
     """
     Run simulation mode: execute Q-learning simulations and save logs.
     
+    Simulations already in the result cache are restored instead of run,
+    and complete new ones are added to it. With ``sequential_targets`` in
+    the config, runs are made in waves and stop early once the confidence
+    intervals are tight enough (see ``sequential_sampling``); ``n_runs`` is
+    then the maximum. Run ``i`` is seeded with ``rng_seed + i``, so the
+    replicates are independent draws.
+    
     Args:
         config: Configuration dictionary
         output_dir: Output directory path
@@ -174,37 +233,66 @@ def run_simulation_mode(config: Dict, output_dir: str, n_runs: int = None) -> Li
     """
     print("=== SIMULATION MODE ===")
     
-    # Create simulation parameters
-    params = SimParams(config)
-    
     # Override number of runs if specified
     if n_runs is not None:
         print(f"Overriding n_runs: {config.get('n_runs', 'default')} → {n_runs}")
         config['n_runs'] = n_runs
     
+    # Create simulation parameters
+    params = SimParams(config)
+    
     n_runs = config.get('n_runs', 10)
-    print(f"Running {n_runs} simulations...")
+    stopper = SequentialStopper.from_config(config, n_runs)
+    
+    cache = ResultCache.from_config(config)
+    if cache is not None and restore_cached_simulation(config, output_dir, cache) is not None:
+        run_log_path = Path(output_dir) / "logs" / RUN_LOG_FILE
+        with RunLog(run_log_path) as log:
+            print(f"✓ Restored {log.n_runs} runs from result cache ({cache.cache_dir})")
+            return log.runs()
+    
+    if stopper is not None:
+        print(f"Running up to {n_runs} simulations in waves of {stopper.wave_size} "
+              f"(target CI half-widths: {stopper.targets})...")
+    else:
+        print(f"Running {n_runs} simulations...")
     
     # Run simulations
     run_results = []
+    n_failed = 0
     for i in range(n_runs):
         print(f"Run {i+1}/{n_runs}", end="\r")
         
         try:
-            result = run_simulation(params)
+            # run_simulation seeds from params, so each replicate gets its own seed
+            run_params = copy.copy(params)
+            run_params.rng_seed = params.rng_seed + i
+            result = run_simulation(run_params)
             run_results.append(result)
+            if stopper is not None:
+                stopper.update(run_metrics(result, params))
         except Exception as e:
             print(f"\n❌ Run {i+1} failed: {e}")
-            continue
+            n_failed += 1
+        
+        # Sequential stopping is only considered at wave boundaries
+        if stopper is not None and ((i + 1) % stopper.wave_size == 0 or i + 1 == n_runs):
+            if stopper.end_wave():
+                print(f"\n✓ Confidence intervals reached their targets after {i+1} runs: "
+                      + ", ".join(f"{m} ±{w:.4g}" for m, w in stopper.half_widths().items()))
+                break
     
     print(f"\n✓ Completed {len(run_results)}/{n_runs} simulations")
     
     # Save logs
-    save_run_logs(run_results, output_dir)
+    save_run_logs(run_results, output_dir, stopper.report() if stopper is not None else None)
+    
+    # Only complete simulations are reused
+    if cache is not None and n_failed == 0:
+        cache.put(simulation_cache_key(params, n_runs), Path(output_dir) / "logs" / RUN_LOG_FILE)
     
     return run_results
 
-
 def run_analysis_mode(run_results: List[Dict], params: SimParams, output_dir: str) -> Dict:
     """
     Run analysis mode: perform simplified Phase 2 analysis on simulation results.
@@ -519,6 +607,11 @@ def main():
     parser.add_argument("--output", type=str, help="Output directory (default: auto-generated)")
     parser.add_argument("--n-runs", type=int, help="Number of simulation runs (overrides config)")
     parser.add_argument("--dry-run", action="store_true", help="Dry run mode (validate only)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor fill the result cache")
+    parser.add_argument("--ci-target", type=str, action="append", metavar="METRIC=HALF_WIDTH",
+                      help="Stop early once the confidence interval of METRIC (convergence_rate, "
+                           "mean_profit or profit_gain) is this tight; --n-runs is then the maximum")
+    parser.add_argument("--wave-size", type=int, help="Runs per wave of sequential early stopping")
     
     # Deep analysis mode arguments
     parser.add_argument("--analysis-mode", type=str, choices=["standard", "deep"], default="standard",
@@ -535,6 +628,14 @@ def main():
     # Load configuration
     try:
         config = load_config(args.config)
+        if args.no_cache:
+            config['result_cache_dir'] = None
+        if args.ci_target:
+            config['sequential_targets'] = {
+                metric: float(width) for metric, width in (target.split("=", 1) for target in args.ci_target)
+            }
+        if args.wave_size:
+            config['sequential_wave_size'] = args.wave_size
         params = SimParams(config)
         print(f"✓ Loaded config: {args.config}")
     except Exception as e:
@@ -42,6 +42,11 @@ except ImportError as e:
     def create_state_frequency(*args, **kwargs):
         return None
 
+try:
+    from ..run_logs import RunLog, find_json_logs, find_run_log
+except ImportError:
+    from run_logs import RunLog, find_json_logs, find_run_log
+
 
 # Publication settings
 FIGURE_WIDTH = 3.25  # inches
@@ -106,18 +111,23 @@ def load_simulation_data(logdir: str) -> Dict[str, Any]:
     else:
         summary = {}
     
-    # Load individual run files
-    logs_path = logdir_path / "logs"
-    run_files = list(logs_path.glob("run_*.json"))
-    
+    # Load individual runs: columnar store if present, per-run JSON logs otherwise
     runs_data = []
-    for run_file in sorted(run_files):
+    run_log = find_run_log(str(logdir_path))
+    if run_log is not None:
         try:
-            with open(run_file, 'r') as f:
-                run_data = json.load(f)
-                runs_data.append(run_data)
+            with RunLog(run_log) as log:
+                runs_data = log.runs()
         except Exception as e:
-            warnings.warn(f"Could not load {run_file}: {e}")
+            warnings.warn(f"Could not load {run_log}: {e}")
+    else:
+        for run_file in find_json_logs(str(logdir_path)):
+            try:
+                with open(run_file, 'r') as f:
+                    run_data = json.load(f)
+                    runs_data.append(run_data)
+            except Exception as e:
+                warnings.warn(f"Could not load {run_file}: {e}")
     
     return {
         'summary': summary,
@@ -148,7 +158,7 @@ def make_figure1_convergence(data: Dict[str, Any], output_dir: str) -> str:
         final_prices = []
         
         for run in data['runs']:
-            if 'convergence_time' in run:
+            if run.get('convergence_time') is not None:
                 conv_times.append(run['convergence_time'])
             if 'final_prices' in run:
                 final_prices.append(run['final_prices'])
@@ -162,7 +172,7 @@ def make_figure1_convergence(data: Dict[str, Any], output_dir: str) -> str:
         
         # Plot 2: Final prices
         if final_prices:
-            final_prices_flat = [p for prices in final_prices for p in (prices if isinstance(prices, list) else [prices])]
+            final_prices_flat = np.concatenate([np.ravel(prices) for prices in final_prices])
             axes[0, 1].hist(final_prices_flat, bins=20, alpha=0.7, edgecolor='black')
             axes[0, 1].set_xlabel('Final Price')
             axes[0, 1].set_ylabel('Frequency')
@@ -305,23 +315,22 @@ def make_figure3_learning(data: Dict[str, Any], output_dir: str) -> str:
         sample_run = data['runs'][0]
         
         if 'price_history' in sample_run:
-            price_hist = sample_run['price_history']
-            if isinstance(price_hist, list) and len(price_hist) > 0:
+            price_hist = np.asarray(sample_run['price_history'])
+            if len(price_hist) > 0:
                 # Plot first 500 periods for clarity
                 periods = min(500, len(price_hist))
                 time_axis = range(periods)
                 
-                if isinstance(price_hist[0], list):  # Multiple agents
-                    for agent_idx in range(min(2, len(price_hist[0]))):
-                        agent_prices = [price_hist[t][agent_idx] for t in range(periods)]
-                        axes[0].plot(time_axis, agent_prices, label=f'Agent {agent_idx+1}')
+                if price_hist.ndim > 1:  # Multiple agents
+                    for agent_idx in range(min(2, price_hist.shape[1])):
+                        axes[0].plot(time_axis, price_hist[:periods, agent_idx], label=f'Agent {agent_idx+1}')
                 else:  # Single agent
                     axes[0].plot(time_axis, price_hist[:periods])
                 
                 axes[0].set_xlabel('Period')
                 axes[0].set_ylabel('Price')
                 axes[0].set_title('Price Evolution')
-                if isinstance(price_hist[0], list):
+                if price_hist.ndim > 1:
                     axes[0].legend()
         
         # Plot 2: Q-values evolution (if available)
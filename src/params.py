@@ -49,7 +49,14 @@ class SimParams:
         
         # Store any extra parameters
         self.extra = kwargs
-    
+
+    def __getattr__(self, name: str) -> Any:
+        """Expose extra configuration keys (e.g. ``max_iterations``) as attributes."""
+        extra = self.__dict__.get('extra')
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert parameters to dictionary."""
         return {
@@ -36,32 +36,47 @@ except ImportError:
             for k, v in kwargs.items():
                 setattr(self, k, v)
 
+try:
+    from run_logs import iter_chunks
+except ImportError:
+    from ..run_logs import iter_chunks
+
 # Set plotting style
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
 
 def plot_convergence_trajectory(price_history: np.ndarray, save_path: Optional[str] = None,
-                               title: str = "Price Convergence Trajectory") -> None:
+                               title: str = "Price Convergence Trajectory",
+                               max_points: int = 10000) -> None:
     """
     Plot convergence trajectory (Figure 1 reproduction).
     
     Args:
-        price_history: Price history array of shape (time, agents)
+        price_history: Price history array of shape (time, agents); may be an
+            ``np.memmap``, which is read in fixed-size chunks
         save_path: Path to save figure (if None, display only)
         title: Figure title
+        max_points: Maximum number of points drawn per line; longer
+            histories are plotted at every k-th period
     """
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
     
-    time_steps = np.arange(len(price_history))
+    n_steps = len(price_history)
     n_agents = price_history.shape[1] if len(price_history.shape) > 1 else 1
+    stride = max(1, -(-n_steps // max_points))
+    
+    # Plotted periods, read chunk by chunk so long histories never sit in memory at once
+    time_steps = np.arange(0, n_steps, stride)
+    samples = [block[(-lo) % stride::stride] for lo, block in iter_chunks(price_history)]
+    sampled_prices = np.concatenate(samples) if samples else np.asarray(price_history)
     
     # Top panel: Price trajectories
     if n_agents == 1:
-        ax1.plot(time_steps, price_history, label='Agent 1', linewidth=2)
+        ax1.plot(time_steps, sampled_prices, label='Agent 1', linewidth=2)
     else:
         for agent in range(n_agents):
-            ax1.plot(time_steps, price_history[:, agent], 
+            ax1.plot(time_steps, sampled_prices[:, agent], 
                     label=f'Agent {agent + 1}', linewidth=2)
     
     ax1.set_xlabel('Time Steps')
@@ -72,7 +87,7 @@ def plot_convergence_trajectory(price_history: np.ndarray, save_path: Optional[s
     
     # Bottom panel: Price difference (convergence measure)
     if n_agents > 1:
-        price_diff = np.abs(price_history[:, 0] - price_history[:, 1])
+        price_diff = np.abs(sampled_prices[:, 0] - sampled_prices[:, 1])
         ax2.plot(time_steps, price_diff, color='red', linewidth=2)
         ax2.set_xlabel('Time Steps')
         ax2.set_ylabel('|Price₁ - Price₂|')
@@ -81,14 +96,18 @@ def plot_convergence_trajectory(price_history: np.ndarray, save_path: Optional[s
         ax2.set_yscale('log')
     else:
         # Single agent: plot volatility
-        window_size = min(50, len(price_history) // 10)
+        window_size = min(50, n_steps // 10)
         if window_size > 1:
+            window_starts = []
             volatility = []
-            for i in range(len(price_history) - window_size + 1):
-                vol = np.std(price_history[i:i + window_size])
-                volatility.append(vol)
+            for lo, block in iter_chunks(price_history, overlap=window_size - 1):
+                windows = np.lib.stride_tricks.sliding_window_view(block, window_size, axis=0)
+                vol = np.std(windows, axis=-1).reshape(len(windows), -1).mean(axis=1)
+                first = (-lo) % stride
+                window_starts.append(np.arange(lo + first, lo + len(vol), stride))
+                volatility.append(vol[first::stride])
             
-            ax2.plot(range(window_size - 1, len(price_history)), volatility, 
+            ax2.plot(np.concatenate(window_starts) + window_size - 1, np.concatenate(volatility), 
                     color='red', linewidth=2)
             ax2.set_xlabel('Time Steps')
             ax2.set_ylabel('Price Volatility')
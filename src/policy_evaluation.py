@@ -0,0 +1,155 @@
+"""
+Vectorized policy evaluation of converged strategies.
+
+A deterministic strategy profile maps every state to one joint action and
+hence to exactly one successor state. ``evaluate_strategy`` takes the
+cycle/basin decomposition of that successor map from ``strategy_graph`` and
+evaluates it with the same binary lifting, using tables of the discounted
+reward sums along the jumps ``f^(2^k)``:
+
+- cycle values follow in closed form, ``V(c) = sum_k delta^k r(f^k c) / (1 - delta^L)``,
+- the value of a transient state is the discounted reward along its tail
+  plus the discounted value of the cycle state it enters.
+
+The true Q of one-period deviations, ``Q[s, p, i] = pi(a') + delta V_i(f(a'))``
+with ``a'`` the strategy profile in ``s`` with agent ``i`` switched to price
+``p``, is then a single gather over all (state, price, agent) cells. This
+replaces calling a per-cell routine that re-simulates the path for every
+cell of the tensor.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .strategy_graph import StrategyGraph, get_strategy_graph, strategy_successor
+except ImportError:
+    from strategy_graph import StrategyGraph, get_strategy_graph, strategy_successor
+
+
+@dataclass
+class PolicyEvaluation:
+    """State values and true Q tensor of a strategy profile."""
+    graph: StrategyGraph  # successor map and cycle/basin decomposition
+    values: np.ndarray    # (n_states, n_agents) discounted value of following the strategy
+    q_true: np.ndarray    # (n_states, n_prices, n_agents) value of a one-period deviation
+
+
+def _reward_sums(graph: StrategyGraph, rewards: np.ndarray, delta: float) -> List[np.ndarray]:
+    """Discounted reward sums ``sum_{t < 2^k} delta^t r(f^t s)`` along the graph's jump tables."""
+    sums = [rewards]
+    discount = delta
+    for f_k in graph.jumps[:-1]:
+        sums.append(sums[-1] + discount * sums[-1][f_k])
+        discount *= discount
+    return sums
+
+
+def _walk(jumps: List[np.ndarray], sums: List[np.ndarray], delta: float,
+          start: np.ndarray, n_steps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Follow ``n_steps[j]`` successors from ``start[j]`` for all j at once.
+
+    Returns:
+        Tuple (discounted reward sum along the walk, end state, delta ** n_steps)
+    """
+    total = np.zeros((len(start),) + sums[0].shape[1:])
+    position = start.copy()
+    scale = np.ones(len(start))
+    discount = delta
+    for k in range(len(sums)):
+        take = np.flatnonzero((n_steps >> k) & 1)
+        if len(take):
+            total[take] += scale[take, None] * sums[k][position[take]]
+            scale[take] *= discount
+            position[take] = jumps[k][position[take]]
+        discount *= discount
+    return total, position, scale
+
+
+def evaluate_strategy(
+    strategy: np.ndarray,
+    profits: np.ndarray,
+    next_state: np.ndarray,
+    delta: float,
+    action_weights: np.ndarray
+) -> PolicyEvaluation:
+    """
+    Evaluate a deterministic strategy profile in all states at once.
+
+    Args:
+        strategy: Price index chosen by each agent in each state, shape (n_states, n_agents)
+        profits: Per-period profits of every joint action, shape (n_profiles, n_agents)
+        next_state: State reached after every joint action, shape (n_profiles,)
+        delta: Discount factor (must be below 1)
+        action_weights: Weight of each agent's price index in the joint action
+            number, e.g. ``n_prices ** agent``
+
+    Returns:
+        PolicyEvaluation of the strategy
+    """
+    if not 0 <= delta < 1:
+        raise ValueError(f"delta must be in [0, 1), got {delta}")
+    strategy = np.asarray(strategy, dtype=np.int64)
+    profits = np.asarray(profits, dtype=np.float64)
+    next_state = np.asarray(next_state, dtype=np.int64)
+    weights = np.asarray(action_weights, dtype=np.int64)
+    n_states, n_agents = strategy.shape
+
+    profile, _ = strategy_successor(strategy, next_state, weights)
+    graph = get_strategy_graph(strategy, next_state, weights)
+    jumps = graph.jumps
+    sums = _reward_sums(graph, profits[profile], delta)
+
+    # Closed-form cycle values, then transient states through their tails
+    values = np.zeros((n_states, n_agents))
+    cycle_states = np.flatnonzero(graph.on_cycle)
+    loop_sum, _, loop_discount = _walk(jumps, sums, delta, cycle_states, graph.cycle_length[cycle_states])
+    values[cycle_states] = loop_sum / (1.0 - loop_discount)[:, None]
+    tail_states = np.flatnonzero(~graph.on_cycle)
+    if len(tail_states):
+        tail_sum, entry, tail_discount = _walk(jumps, sums, delta, tail_states, graph.tail_length[tail_states])
+        values[tail_states] = tail_sum + tail_discount[:, None] * values[entry]
+
+    # One-period deviations of every agent to every price in every state
+    n_prices = int(round(profits.shape[0] ** (1.0 / n_agents)))
+    if n_prices ** n_agents != profits.shape[0]:
+        raise ValueError(f"{profits.shape[0]} joint actions do not match {n_agents} agents")
+    prices = np.arange(n_prices)
+    agents = np.arange(n_agents)
+    deviation = (profile[:, None, None]
+                 + (prices[None, :, None] - strategy[:, None, :]) * weights[None, None, :])
+    q_true = (profits[deviation, agents[None, None, :]]
+              + delta * values[next_state[deviation], agents[None, None, :]])
+
+    return PolicyEvaluation(graph=graph, values=values, q_true=q_true)
+
+
+def evaluate_strategy_globals(optimal_strategy: np.ndarray, globals, delta: float = None) -> PolicyEvaluation:
+    """
+    Evaluate a strategy stored in the layout of the ``GlobalVars`` analyses.
+
+    The analyses use one-period memory, so the state reached after a joint
+    action is the joint action itself, and joint actions are numbered with
+    the big-endian weights ``globals.c_actions``.
+
+    Args:
+        optimal_strategy: Price index of each agent in each state, shape (num_states, num_agents)
+        globals: GlobalVars with ``pi``, ``c_actions`` and ``delta``
+        delta: Discount factor (default: ``globals.delta``)
+
+    Returns:
+        PolicyEvaluation of the strategy
+    """
+    if globals.num_states != globals.num_actions:
+        raise ValueError("Policy evaluation of GlobalVars strategies requires one-period memory")
+    return evaluate_strategy(
+        optimal_strategy,
+        globals.pi,
+        np.arange(globals.num_actions),
+        globals.delta if delta is None else delta,
+        np.asarray(globals.c_actions)
+    )
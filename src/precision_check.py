@@ -0,0 +1,104 @@
+"""
+Validation of reduced-precision Q storage against the double-precision reference.
+
+``validate_precision`` runs the same sessions twice on identical random
+streams, once with float64 Q matrices and once under the precision policy
+being checked, and reports how often the learned strategies and the
+convergence times differ. Rounding Q values to float32 can flip a greedy
+choice whenever two actions are within single-precision resolution of each
+other, and from then on the two runs follow different paths.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .batch_learning import compute_experiment_batch
+    from .params import SimParams
+except ImportError:
+    from batch_learning import compute_experiment_batch
+    from params import SimParams
+
+
+@dataclass
+class PrecisionReport:
+    """Differences between a precision policy and the double-precision reference."""
+    precision: str
+    n_sessions: int
+    strategy_mismatches: int      # sessions whose strategies differ in at least one state
+    state_mismatch_rate: float    # fraction of (session, agent, state) strategy entries that differ
+    convergence_mismatches: int   # sessions whose convergence time differs
+    max_convergence_shift: int    # largest absolute difference in iterations run
+    max_q_error: float            # largest absolute difference of the finite final Q values
+
+    @property
+    def strategy_mismatch_rate(self) -> float:
+        return self.strategy_mismatches / self.n_sessions if self.n_sessions else 0.0
+
+    @property
+    def convergence_mismatch_rate(self) -> float:
+        return self.convergence_mismatches / self.n_sessions if self.n_sessions else 0.0
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        return "\n".join([
+            f"Precision '{self.precision}' vs 'double' over {self.n_sessions} sessions:",
+            f"  strategies differ:        {self.strategy_mismatches} sessions "
+            f"({self.strategy_mismatch_rate:.1%}), {self.state_mismatch_rate:.2%} of state entries",
+            f"  convergence time differs: {self.convergence_mismatches} sessions "
+            f"({self.convergence_mismatch_rate:.1%}), max shift {self.max_convergence_shift} iterations",
+            f"  max |Q - Q_ref|:           {self.max_q_error:.3g}",
+        ])
+
+
+def validate_precision(
+    params: SimParams,
+    alpha: float,
+    exploration_parameters: np.ndarray,
+    delta: float,
+    precision: str = 'mixed',
+    sessions: Optional[Sequence[int]] = None,
+    experiment: int = 0
+) -> PrecisionReport:
+    """
+    Compare sessions run under a precision policy with the float64 reference.
+
+    Args:
+        params: Simulation parameters
+        alpha: Learning rate
+        exploration_parameters: Array of exploration parameters (one per agent)
+        delta: Discount factor
+        precision: Precision policy to validate
+        sessions: Session indices to run (default: ``range(n_sessions)``)
+        experiment: Experiment index
+
+    Returns:
+        PrecisionReport of the differences
+    """
+    reference, reference_iterations = compute_experiment_batch(
+        params, alpha, exploration_parameters, delta, sessions, experiment, precision='double'
+    )
+    candidate, candidate_iterations = compute_experiment_batch(
+        params, alpha, exploration_parameters, delta, sessions, experiment, precision=precision
+    )
+
+    strategies_ref = np.array([result[1] for result in reference])
+    strategies = np.array([result[1] for result in candidate])
+    differs = strategies != strategies_ref
+    q_ref = np.array([result[0] for result in reference])
+    q = np.array([result[0] for result in candidate], dtype=np.float64)
+    finite = np.isfinite(q_ref) & np.isfinite(q)
+    shift = np.abs(candidate_iterations - reference_iterations)
+
+    return PrecisionReport(
+        precision=precision,
+        n_sessions=len(reference),
+        strategy_mismatches=int(np.sum(differs.any(axis=(1, 2)))),
+        state_mismatch_rate=float(differs.mean()) if differs.size else 0.0,
+        convergence_mismatches=int(np.sum(shift > 0)),
+        max_convergence_shift=int(shift.max()) if shift.size else 0,
+        max_q_error=float(np.max(np.abs(q[finite] - q_ref[finite]))) if finite.any() else 0.0
+    )
@@ -1,8 +1,8 @@
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from globals import GlobalVars
-from QL_routines import compute_q_cell
 from generic_routines import are_equal_reals
+from policy_evaluation import PolicyEvaluation, evaluate_strategy_globals
 
 def compute_q_gap_to_max(i_experiment: int, globals: GlobalVars) -> None:
     """
@@ -229,7 +229,8 @@ def compute_q_gap_to_max_session(
     optimal_strategy: np.ndarray,
     cycle_length: int,
     cycle_states: np.ndarray,
-    globals: GlobalVars
+    globals: GlobalVars,
+    evaluation: Optional[PolicyEvaluation] = None
 ) -> Tuple[
     np.ndarray, np.ndarray, np.ndarray,
     np.ndarray, np.ndarray, np.ndarray, np.ndarray
@@ -241,6 +242,7 @@ def compute_q_gap_to_max_session(
     - optimal_strategy: strategy for all agents
     - cycle_length: length of the replication's equilibrium path (i.e., state cycle)
     - cycle_states: replication's equilibrium path (i.e., state cycle)
+    - evaluation: policy evaluation of optimal_strategy, computed if not given
     
     Returns:
     - q_gap_tot: Average Q gap over all states
@@ -251,56 +253,27 @@ def compute_q_gap_to_max_session(
     - q_gap_not_eq_all_states: Average Q gap over non-equilibrium states
     - q_gap_not_eq_on_path: Average Q gap over non-equilibrium cycle states
     """
-    # 1. Compute true Q for the optimal strategy for all agents, in all states and actions
-    q_true = np.zeros((globals.num_states, globals.num_prices, globals.num_agents))
-    max_q_true = np.zeros((globals.num_states, globals.num_agents))
-    q_gap = np.zeros((globals.num_states, globals.num_agents))
+    # 1. True Q for the optimal strategy for all agents, in all states and actions
+    if evaluation is None:
+        evaluation = evaluate_strategy_globals(optimal_strategy, globals)
+    q_true = evaluation.q_true
+    max_q_true = np.max(q_true, axis=1)
+    q_strategy = np.take_along_axis(q_true, optimal_strategy[:, None, :], axis=1)[:, 0, :]
     
-    for i_state in range(globals.num_states):
-        for i_agent in range(globals.num_agents):
-            for i_price in range(globals.num_prices):
-                # Compute state value function of agent i_agent for the optimal strategy in (i_state,i_price)
-                q_true[i_state, i_price, i_agent], _, _ = compute_q_cell(
-                    optimal_strategy, i_state, i_price, i_agent, globals.delta, globals
-                )
-            
-            # Compute gap in Q function values w.r.t. maximum
-            max_q_true[i_state, i_agent] = np.max(q_true[i_state, :, i_agent])
-            q_gap[i_state, i_agent] = (
-                max_q_true[i_state, i_agent] - q_true[i_state, optimal_strategy[i_state, i_agent], i_agent]
-            ) / abs(max_q_true[i_state, i_agent])
+    # Gap in Q function values w.r.t. maximum
+    q_gap = (max_q_true - q_strategy) / np.abs(max_q_true)
     
     # 2. Compute mask matrices
-    is_on_path = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
-    is_not_on_path = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
-    is_not_br_all_states = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
-    is_not_br_on_path = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
-    is_not_eq_all_states = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
-    is_not_eq_on_path = np.zeros((globals.num_states, globals.num_agents), dtype=bool)
+    on_path = np.isin(np.arange(globals.num_states), cycle_states)
+    is_br = are_equal_reals(q_strategy, max_q_true)
+    is_eq = np.all(is_br, axis=1)
     
-    for i_state in range(globals.num_states):
-        if np.any(cycle_states == i_state):
-            is_on_path[i_state, :] = True
-        if np.all(cycle_states != i_state):
-            is_not_on_path[i_state, :] = True
-        
-        is_br = np.zeros(globals.num_agents, dtype=bool)
-        for i_agent in range(globals.num_agents):
-            if are_equal_reals(
-                q_true[i_state, optimal_strategy[i_state, i_agent], i_agent],
-                max_q_true[i_state, i_agent]
-            ):
-                is_br[i_agent] = True
-            else:
-                is_not_br_all_states[i_state, i_agent] = True
-                if np.any(cycle_states == i_state):
-                    is_not_br_on_path[i_state, i_agent] = True
-        
-        for i_agent in range(globals.num_agents):
-            if not np.all(is_br):
-                is_not_eq_all_states[i_state, i_agent] = True
-                if np.any(cycle_states == i_state):
-                    is_not_eq_on_path[i_state, i_agent] = True
+    is_on_path = np.repeat(on_path[:, None], globals.num_agents, axis=1)
+    is_not_on_path = ~is_on_path
+    is_not_br_all_states = ~is_br
+    is_not_br_on_path = ~is_br & is_on_path
+    is_not_eq_all_states = np.repeat(~is_eq[:, None], globals.num_agents, axis=1)
+    is_not_eq_on_path = is_not_eq_all_states & is_on_path
     
     # 3. Compute Q gap averages over subsets of states
     q_gap_tot = np.zeros(globals.num_agents + 1)
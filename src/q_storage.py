@@ -0,0 +1,328 @@
+"""
+Q-table storage backends.
+
+The dense backend stores every agent's Q matrix as an ``(n_states,
+n_actions)`` float64 array. With longer memory or more agents
+``n_states = n_prices ** (n_agents * depth)`` makes that too big for RAM,
+while learning only ever writes the rows of states it visits.
+
+The lazy backend (``q_storage: "lazy"`` in the config) stores a Q matrix as
+pages of ``q_page_rows`` rows that are allocated and filled from the
+initializer the first time one of their cells is written. Reads of
+untouched rows regenerate them from the initializer without storing them.
+Random initializers keep a checkpoint of the generator state at the start
+of every page, so a page regenerates exactly the deviates the dense
+initializer would have drawn for it; the session generator is advanced by
+the same number of draws. Learning therefore produces identical results
+with memory proportional to the number of visited pages.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .init.QInit import STRATEGY_TYPES, _PRETRAINED_Q
+    from .rng.Lecuyer import LecuyerCombined
+except ImportError:
+    from init.QInit import STRATEGY_TYPES, _PRETRAINED_Q
+    from rng.Lecuyer import LecuyerCombined
+
+Q_STORAGE_BACKENDS = ('dense', 'lazy')
+
+# Rows per page of a lazy Q table (kept even so Box-Muller pairs stay within a page)
+DEFAULT_PAGE_ROWS = 64
+
+
+class QRowSource(ABC):
+    """Initial values of a contiguous block of Q rows."""
+
+    @abstractmethod
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Initial Q values of rows ``start:stop``, shape (stop - start, n_actions)."""
+
+    def row_stats(self, start: int, stop: int, dtype=np.float64) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``row_statistics`` of rows ``start:stop`` stored as ``dtype``."""
+        return row_statistics(self.rows(start, stop).astype(dtype, copy=False))
+
+
+class ConstantRows(QRowSource):
+    """Every row starts as the same template row ('F', 'U')."""
+
+    def __init__(self, template: np.ndarray):
+        self.template = np.asarray(template, dtype=np.float64)
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return np.tile(self.template, (stop - start, 1))
+
+    def row_stats(self, start: int, stop: int, dtype=np.float64) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Every row has the template's statistics; no rows are built
+        row_max, row_argmax, n_ties = row_statistics(self.template.astype(dtype)[None])
+        n_rows = stop - start
+        return np.full(n_rows, row_max[0]), np.full(n_rows, row_argmax[0]), np.full(n_rows, n_ties[0])
+
+
+class ArrayRows(QRowSource):
+    """Rows read from an existing (possibly memory-mapped) Q matrix ('T')."""
+
+    def __init__(self, q: np.ndarray):
+        self.q = q
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        return np.array(self.q[start:stop], dtype=np.float64)
+
+
+class RandomRows(QRowSource):
+    """
+    Rows built from ran2 deviates drawn in state-major order ('R', 'G', 'O').
+
+    ``draw`` consumes the deviates of every page from the session generator
+    in order, remembering the generator state at the start of each page;
+    ``rows`` replays a page from its checkpoint on a scratch generator.
+    """
+
+    def __init__(self, strategy: str, n_states: int, n_actions: int, page_rows: int, **kwargs):
+        self.strategy = strategy
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.page_rows = page_rows
+        self.kwargs = kwargs
+        self.checkpoints: List[dict] = []
+        self._scratch: Optional[LecuyerCombined] = None
+
+    def _n_draws(self, n_rows: int) -> int:
+        if self.strategy == 'O':
+            # One (u1, u2) pair per action of every even state
+            return 2 * ((n_rows + 1) // 2) * self.n_actions
+        return n_rows * self.n_actions
+
+    def draw(self, rng: LecuyerCombined) -> None:
+        """Advance ``rng`` past this table's deviates, checkpointing every page."""
+        for start in range(0, self.n_states, self.page_rows):
+            self.checkpoints.append(rng.state)
+            rng.ran2_block(self._n_draws(min(start + self.page_rows, self.n_states) - start))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_scratch'] = None
+        return state
+
+    def _page(self, page: int) -> np.ndarray:
+        start = page * self.page_rows
+        n_rows = min(start + self.page_rows, self.n_states) - start
+        if self._scratch is None:
+            self._scratch = LecuyerCombined()
+        self._scratch.state = self.checkpoints[page]
+        u = self._scratch.ran2_block(self._n_draws(n_rows))
+
+        if self.strategy == 'R':
+            min_val = self.kwargs.get('min_val', 0.0)
+            max_val = self.kwargs.get('max_val', 1.0)
+            return min_val + (max_val - min_val) * u.reshape(n_rows, self.n_actions)
+        if self.strategy == 'G':
+            Q = np.tile(grim_trigger_template(self.n_actions, **self.kwargs), (n_rows, 1))
+            return Q + 0.01 * (u.reshape(n_rows, self.n_actions) - 0.5)
+
+        # 'O': Box-Muller, each pair gives the normals of an even state and the next one
+        random_scale = self.kwargs.get('random_scale', 1.0)
+        u = u.reshape(-1, self.n_actions, 2)
+        radius = np.sqrt(-2 * np.log(u[:, :, 0]))
+        Q = np.empty((n_rows, self.n_actions))
+        Q[0::2] = random_scale * (radius * np.cos(2 * np.pi * u[:, :, 1]))
+        Q[1::2] = random_scale * (radius * np.sin(2 * np.pi * u[:, :, 1]))[:n_rows // 2]
+        return Q
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        blocks = []
+        for page in range(start // self.page_rows, (stop - 1) // self.page_rows + 1):
+            page_start = page * self.page_rows
+            block = self._page(page)
+            blocks.append(block[max(start - page_start, 0):stop - page_start])
+        return np.concatenate(blocks)
+
+
+def _action_index(price: float, n_actions: int) -> int:
+    return int(np.clip(int(round(price * (n_actions - 1))), 0, n_actions - 1))
+
+
+def grim_trigger_template(n_actions: int, coop_price: float = 0.8, punish_price: float = 0.0,
+                          coop_value: float = 1.0, punish_value: float = -1.0, **kwargs) -> np.ndarray:
+    """Q row of strategy 'G' before its tie-breaking noise."""
+    row = np.zeros(n_actions)
+    row[_action_index(coop_price, n_actions)] = coop_value
+    row[_action_index(punish_price, n_actions)] = punish_value
+    return row
+
+
+class LazyQTable:
+    """
+    Q matrix whose rows are materialized in pages on first write.
+
+    Supports the indexing the learning loop uses: ``q[state]``,
+    ``q[state, :]`` and ``q[state, action]`` for reads and
+    ``q[state, action] = value`` for writes. ``np.asarray(q)`` gives the
+    dense matrix.
+    """
+
+    ndim = 2
+
+    def __init__(self, source: QRowSource, n_states: int, n_actions: int,
+                 page_rows: int = DEFAULT_PAGE_ROWS, dtype=np.float64):
+        self.source = source
+        self.shape = (n_states, n_actions)
+        self.dtype = np.dtype(dtype)
+        self.page_rows = page_rows
+        self.pages: Dict[int, np.ndarray] = {}
+        # Last untouched page regenerated for a read, reused by the write that usually follows
+        self._peeked: Tuple[int, Optional[np.ndarray]] = (-1, None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_peeked'] = (-1, None)
+        return state
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def n_materialized_rows(self) -> int:
+        """Rows held in memory."""
+        return sum(len(page) for page in self.pages.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(page.nbytes for page in self.pages.values())
+
+    def _page_bounds(self, page: int) -> Tuple[int, int]:
+        start = page * self.page_rows
+        return start, min(start + self.page_rows, self.shape[0])
+
+    @property
+    def n_pages(self) -> int:
+        return -(-self.shape[0] // self.page_rows)
+
+    def initial_rows(self, page: int) -> np.ndarray:
+        """Rows of a page as the initializer fills them, in the storage dtype."""
+        return self.source.rows(*self._page_bounds(page)).astype(self.dtype, copy=False)
+
+    def initial_row_stats(self, page: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``row_statistics`` of a page as the initializer fills it."""
+        return self.source.row_stats(*self._page_bounds(page), self.dtype)
+
+    def _peek(self, page: int) -> np.ndarray:
+        """Initial rows of an untouched page, without storing them."""
+        if self._peeked[0] != page:
+            self._peeked = (page, self.initial_rows(page))
+        return self._peeked[1]
+
+    def _materialize(self, page: int) -> np.ndarray:
+        if page not in self.pages:
+            self.pages[page] = self._peek(page)
+            self._peeked = (-1, None)
+        return self.pages[page]
+
+    def row(self, state: int) -> np.ndarray:
+        """Q row of a state; rows of untouched pages are regenerated, not stored."""
+        page, offset = divmod(int(state), self.page_rows)
+        if page in self.pages:
+            return self.pages[page][offset]
+        return self._peek(page)[offset]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            state, action = key
+            return self.row(state)[action]
+        return self.row(key)
+
+    def __setitem__(self, key, value) -> None:
+        state, action = key
+        page, offset = divmod(int(state), self.page_rows)
+        self._materialize(page)[offset, action] = value
+
+    def toarray(self) -> np.ndarray:
+        """Dense (n_states, n_actions) copy."""
+        q = np.empty(self.shape, dtype=self.dtype)
+        for page in range(self.n_pages):
+            start, stop = self._page_bounds(page)
+            q[start:stop] = self.pages[page] if page in self.pages else self.source.rows(start, stop)
+        return q
+
+    def __array__(self, dtype=None, copy=None):
+        q = self.toarray()
+        return q if dtype is None else q.astype(dtype)
+
+    def row_stats(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row maxima, first argmax and number of tied maxima, one page at a time."""
+        n_states = self.shape[0]
+        row_max = np.empty(n_states)
+        row_argmax = np.empty(n_states, dtype=np.int64)
+        n_ties = np.empty(n_states, dtype=np.int64)
+        for page in range(self.n_pages):
+            start, stop = self._page_bounds(page)
+            if page in self.pages:
+                stats = row_statistics(self.pages[page])
+            else:
+                stats = self.initial_row_stats(page)
+            row_max[start:stop], row_argmax[start:stop], n_ties[start:stop] = stats
+        return row_max, row_argmax, n_ties
+
+
+def row_statistics(q) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row maxima, first argmax and number of tied maxima of a Q matrix.
+
+    Works on dense arrays and on LazyQTable without materializing it.
+    """
+    if isinstance(q, LazyQTable):
+        return q.row_stats()
+    row_max = np.max(q, axis=1)
+    return row_max, np.argmax(q, axis=1), np.sum(q == row_max[:, None], axis=1)
+
+
+def init_lazy_Q(strategy: str, params, rng: LecuyerCombined, agent_idx: int = 0,
+                page_rows: int = DEFAULT_PAGE_ROWS, dtype=np.float64, **kwargs) -> LazyQTable:
+    """
+    Lazy counterpart of ``init_Q``: same values, same generator consumption.
+
+    Args:
+        strategy: Strategy type ('F', 'G', 'O', 'T', 'R', 'U')
+        params: Simulation parameters
+        rng: Random number generator, advanced exactly as ``init_Q`` would
+        agent_idx: Index of the agent
+        page_rows: Rows per page (must be even)
+        dtype: Storage dtype of the materialized pages
+        **kwargs: Strategy-specific parameters, as for ``init_Q``
+
+    Returns:
+        LazyQTable of shape (n_states, n_actions)
+    """
+    if strategy not in STRATEGY_TYPES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Must be one of {STRATEGY_TYPES}")
+    if page_rows < 2 or page_rows % 2:
+        raise ValueError(f"page_rows must be a positive even number, got {page_rows}")
+    n_states, n_actions = params.n_states, params.n_actions
+
+    if strategy == 'F':
+        template = np.full(n_actions, -np.inf)
+        template[_action_index(kwargs.get('fixed_price', 0.5), n_actions)] = 0.0
+        source = ConstantRows(template)
+    elif strategy == 'U':
+        source = ConstantRows(np.full(n_actions, kwargs.get('constant_value', 0.0)))
+    elif strategy == 'T':
+        q_init_path = kwargs.get('q_init_path')
+        if q_init_path is None:
+            raise ValueError("q_init_path must be provided for 'T' strategy")
+        Q = _PRETRAINED_Q.get(q_init_path)
+        if Q is None:
+            Q = np.load(q_init_path, mmap_mode='r')
+        if Q.shape != (n_states, n_actions):
+            raise ValueError(f"Q matrix shape {Q.shape} does not match expected {(n_states, n_actions)}")
+        if not np.isfinite(Q).all():
+            raise ValueError("Q matrix contains non-finite values")
+        source = ArrayRows(Q)
+    else:
+        source = RandomRows(strategy, n_states, n_actions, page_rows, **kwargs)
+        source.draw(rng)
+    return LazyQTable(source, n_states, n_actions, page_rows, dtype)
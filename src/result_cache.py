@@ -0,0 +1,242 @@
+"""
+Content-addressed cache of simulation results.
+
+The same ``(config, seed)`` pairs are simulated over and over (parity
+tests, ``calvano full``, ``calvano paper``, sweeps with overlapping grids).
+Every finished simulation is stored as its columnar run log
+(``run_logs``) under a key that hashes:
+
+- the canonical JSON of ``SimParams.to_dict()`` without the cache settings,
+- the seed and the number of runs,
+- the code version, a digest of every source file, so changing the code
+  invalidates old entries.
+
+Entries live in ``<cache_dir>/<key[:2]>/<key>.npz``. A hit refreshes the
+entry's modification time, and when the cache grows past its size cap the
+least recently used entries are evicted first.
+
+The cache lives next to the game-table cache in ``~/.cache/calvano/results``
+(or ``$CALVANO_CACHE_DIR``). Configs can move it with ``result_cache_dir``
+(a falsy value disables the cache) and set the cap with
+``result_cache_max_bytes``.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+CACHE_ENTRY_SUFFIX = ".npz"
+
+# Default size cap of the cache
+DEFAULT_CACHE_MAX_BYTES = 1 << 30
+
+# Config keys that only say where things are cached and do not affect results
+CACHE_CONFIG_KEYS = ('result_cache_dir', 'result_cache_max_bytes', 'game_table_cache_dir')
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+def default_cache_dir() -> Path:
+    """``$CALVANO_CACHE_DIR``, falling back to ``~/.cache/calvano/results``."""
+    if os.environ.get('CALVANO_CACHE_DIR'):
+        return Path(os.environ['CALVANO_CACHE_DIR'])
+    return Path(os.path.expanduser('~')) / '.cache' / 'calvano' / 'results'
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """Digest of the simulation source tree (every ``.py`` file under ``src``)."""
+    digest = hashlib.sha256()
+    for path in sorted(SRC_DIR.rglob("*.py")):
+        digest.update(str(path.relative_to(SRC_DIR)).encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def cache_key(params: Dict[str, Any], seed: Any, n_runs: int) -> str:
+    """
+    Cache key of a simulation.
+
+    Args:
+        params: ``SimParams.to_dict()`` of the simulation
+        seed: Random seed
+        n_runs: Number of runs
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    params = {k: v for k, v in params.items() if k not in CACHE_CONFIG_KEYS}
+    canonical = json.dumps(
+        {'params': params, 'seed': seed, 'n_runs': n_runs, 'code_version': code_version()},
+        sort_keys=True, separators=(',', ':'), default=_json_default
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Size and age of the cache contents."""
+    cache_dir: str
+    n_entries: int
+    total_bytes: int
+    max_bytes: int
+    oldest_access: Optional[float] = None
+    newest_access: Optional[float] = None
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        fill = self.total_bytes / self.max_bytes if self.max_bytes else 0.0
+        return (f"Result cache {self.cache_dir}: {self.n_entries} entries, "
+                f"{self.total_bytes / 2 ** 20:.1f} MiB of {self.max_bytes / 2 ** 20:.1f} MiB ({fill:.1%})")
+
+
+class ResultCache:
+    """Size-capped, least-recently-used store of run logs keyed by ``cache_key``."""
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('CALVANO_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES))
+        self.max_bytes = int(max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ResultCache']:
+        """Cache selected by a config, or None if the config disables it."""
+        cache_dir = config.get('result_cache_dir', default_cache_dir())
+        if not cache_dir:
+            return None
+        return cls(cache_dir, config.get('result_cache_max_bytes'))
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{CACHE_ENTRY_SUFFIX}"
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for path in self.cache_dir.glob(f"*/*{CACHE_ENTRY_SUFFIX}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+        return entries
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Path of a cached run log, marking it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Path to the entry, or None on a miss (including entries that
+            cannot be read)
+        """
+        path = self.path(key)
+        if not os.access(path, os.R_OK):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Someone else's entry in a shared cache: use it without the LRU touch
+            pass
+        return path
+
+    def restore(self, key: str, destination: Union[str, Path]) -> bool:
+        """
+        Copy a cached run log to ``destination``.
+
+        Returns:
+            True on a hit
+        """
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, destination)
+        except OSError:
+            return False
+        return True
+
+    def put(self, key: str, run_log_path: Union[str, Path]) -> Path:
+        """
+        Store a copy of a run log and evict old entries beyond the size cap.
+
+        Args:
+            key: Cache key
+            run_log_path: Run log written by ``write_run_log``
+
+        Returns:
+            Path of the cache entry
+        """
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Copy under a temporary name so readers never see a partial entry; the
+        # copy gets the umask's usual permissions, so a shared cache stays readable
+        tmp_path = path.parent / f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            shutil.copyfile(run_log_path, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.prune()
+        return path
+
+    def stats(self) -> CacheStats:
+        """Number, total size and access times of the entries."""
+        entries = self._entries()
+        access = [stat.st_mtime for _, stat in entries]
+        return CacheStats(
+            cache_dir=str(self.cache_dir),
+            n_entries=len(entries),
+            total_bytes=sum(stat.st_size for _, stat in entries),
+            max_bytes=self.max_bytes,
+            oldest_access=min(access) if access else None,
+            newest_access=max(access) if access else None
+        )
+
+    def prune(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Evict least recently used entries until the cache fits ``max_bytes``.
+
+        Args:
+            max_bytes: Size to shrink to (default: the cache's cap; 0 empties it)
+
+        Returns:
+            Tuple (entries removed, bytes freed)
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        n_removed = freed = 0
+        for path, stat in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            freed += stat.st_size
+            n_removed += 1
+        return n_removed, freed
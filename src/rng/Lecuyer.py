@@ -5,9 +5,114 @@ Based on the algorithm used in the original Fortran code.
 
 import numpy as np
 from numpy.random import Generator, BitGenerator
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import threading
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Constants of the L'Ecuyer combined generator (Numerical Recipes ran2)
+IM1 = 2147483563
+IM2 = 2147483399
+IMM1 = IM1 - 1
+IA1 = 40014
+IA2 = 40692
+IQ1 = 53668
+IQ2 = 52774
+IR1 = 12211
+IR2 = 3791
+NTAB = 32
+NDIV = 1 + IMM1 // NTAB
+AM = 1.0 / IM1
+EPS = 1.2e-7
+RNMX = 1.0 - EPS
+
+# Substream layout: every (experiment, session) pair owns SUBSTREAM_LENGTH
+# consecutive steps of the two LCG components
+SUBSTREAM_LENGTH = 2 ** 32
+SESSIONS_PER_EXPERIMENT = 2 ** 12
+
+# Powers a**k mod m (k = 1, 2, ...) of each LCG component, grown on demand
+_LCG_POWERS: Dict[Tuple[int, int], np.ndarray] = {}
+
+
+def _lcg_powers(a: int, m: int, n: int) -> np.ndarray:
+    """
+    Return ``a**k mod m`` for k = 1..n.
+
+    Products of two residues stay below 2**62, so int64 arithmetic is exact.
+    """
+    powers = _LCG_POWERS.get((a, m))
+    if powers is None:
+        powers = np.array([a], dtype=np.int64)
+    while len(powers) < n:
+        # a**(k + len) = a**k * a**len
+        powers = np.concatenate([powers, powers * powers[-1] % m])
+    _LCG_POWERS[(a, m)] = powers
+    return powers[:n]
+
+
+def _lcg_block(x: int, a: int, m: int, n: int) -> np.ndarray:
+    """Next n states of the multiplicative LCG ``x -> a*x mod m``."""
+    return _lcg_powers(a, m, n) * np.int64(x) % m
+
+
+def _shuffle_block(idum_seq, idum2_seq, iy, iv):
+    """
+    Bays-Durham shuffle over precomputed component sequences.
+
+    Args:
+        idum_seq: Successive states of the first component
+        idum2_seq: Successive states of the second component
+        iy: Current shuffle output
+        iv: Shuffle table, updated in place
+
+    Returns:
+        Successive shuffle outputs ``iy``
+    """
+    out = np.empty(len(idum_seq), dtype=np.int64)
+    for i in range(len(idum_seq)):
+        j = min(1 + iy // NDIV, NTAB) - 1
+        iy = iv[j] - idum2_seq[i]
+        iv[j] = idum_seq[i]
+        if iy < 1:
+            iy += IMM1
+        out[i] = iy
+    return out
+
+
+def _shuffle_streams(idum_seq, idum2_seq, iy, iv):
+    """
+    ``_shuffle_block`` for several streams at once, one draw at a time.
+
+    Args:
+        idum_seq: Successive states of the first component, shape (streams, n)
+        idum2_seq: Successive states of the second component, shape (streams, n)
+        iy: Current shuffle output of every stream
+        iv: Shuffle tables, shape (streams, NTAB), updated in place
+
+    Returns:
+        Successive shuffle outputs, shape (streams, n)
+    """
+    rows = np.arange(len(iy))
+    out = np.empty(idum_seq.shape, dtype=np.int64)
+    for i in range(idum_seq.shape[1]):
+        j = np.minimum(1 + iy // NDIV, NTAB) - 1
+        iy = iv[rows, j] - idum2_seq[:, i]
+        iv[rows, j] = idum_seq[:, i]
+        iy[iy < 1] += IMM1
+        out[:, i] = iy
+    return out
+
+
+if numba is not None:
+    # Not cached on disk: this module is imported both as ``rng.Lecuyer`` and
+    # ``src.rng.Lecuyer``, and a cache entry only loads under the name that wrote it
+    _shuffle_block = numba.njit(_shuffle_block)
+
+
 class LecuyerCombined(BitGenerator):
     """
     L'Ecuyer Combined Multiple Recursive Generator with Bays-Durham Shuffle
@@ -25,29 +130,31 @@ class LecuyerCombined(BitGenerator):
     def _initialize(self):
         """Initialize the generator state"""
         # Constants for L'Ecuyer algorithm
-        self.IM1 = 2147483563
-        self.IM2 = 2147483399
-        self.IMM1 = self.IM1 - 1
-        self.IA1 = 40014
-        self.IA2 = 40692
-        self.IQ1 = 53668
-        self.IQ2 = 52774
-        self.IR1 = 12211
-        self.IR2 = 3791
-        self.NDIV = 1 + self.IMM1 // 32
+        self.IM1 = IM1
+        self.IM2 = IM2
+        self.IMM1 = IMM1
+        self.IA1 = IA1
+        self.IA2 = IA2
+        self.IQ1 = IQ1
+        self.IQ2 = IQ2
+        self.IR1 = IR1
+        self.IR2 = IR2
+        self.NDIV = NDIV
         
         # Real constants
-        self.AM = 1.0 / self.IM1
-        self.EPS = 1.2e-7
-        self.RNMX = 1.0 - self.EPS
+        self.AM = AM
+        self.EPS = EPS
+        self.RNMX = RNMX
         
-        # Initialize state
-        self.idum = max(-abs(self._seed), 1)
+        # Initialize state (ran2 starts from idum = max(|seed|, 1))
+        self.idum = max(abs(self._seed), 1)
         self.idum2 = 123456789
+        self._fill_shuffle_table()
+    
+    def _fill_shuffle_table(self):
+        """Warm up the first component and load the Bays-Durham table from it."""
         self.iy = 0
         self.iv = np.zeros(32, dtype=np.int64)
-        
-        # Warm up the generator
         for j in range(32 + 8, 0, -1):
             k = self.idum // self.IQ1
             self.idum = self.IA1 * (self.idum - k * self.IQ1) - k * self.IR1
@@ -57,6 +164,26 @@ class LecuyerCombined(BitGenerator):
                 self.iv[j-1] = self.idum
         self.iy = self.iv[0]
     
+    def jump_ahead(self, n_steps: int):
+        """
+        Skip both LCG components n_steps ahead and restart the shuffle there.
+        
+        Each component is a multiplicative LCG, so n steps are one modular
+        exponentiation: x_n = a**n * x mod m. The shuffle table is refilled
+        from the new position, which makes the result a fresh ran2() stream
+        whose component states cannot overlap another jump target within
+        n_steps draws.
+        
+        Args:
+            n_steps: Number of component steps to skip
+        """
+        if n_steps < 0:
+            raise ValueError("n_steps must be non-negative")
+        with self._lock:
+            self.idum = pow(IA1, n_steps, IM1) * int(self.idum) % IM1
+            self.idum2 = pow(IA2, n_steps, IM2) * int(self.idum2) % IM2
+            self._fill_shuffle_table()
+    
     def random_raw(self) -> int:
         """Generate a random 64-bit integer"""
         with self._lock:
@@ -119,6 +246,34 @@ class LecuyerCombined(BitGenerator):
             
             return min(self.AM * self.iy, self.RNMX)
     
+    def ran2_block(self, n: int) -> np.ndarray:
+        """
+        Generate the next n deviates of the ran2() sequence at once.
+        
+        Both LCG components are advanced with precomputed powers of their
+        multipliers and only the Bays-Durham shuffle runs sequentially
+        (compiled with numba when available). No lock is taken: a generator
+        must not be shared between threads while drawing blocks.
+        
+        Args:
+            n: Number of deviates
+            
+        Returns:
+            Array of n deviates, identical to n successive ran2() calls
+        """
+        if n <= 0:
+            return np.empty(0, dtype=np.float64)
+        idum_seq = _lcg_block(self.idum, IA1, IM1, n)
+        idum2_seq = _lcg_block(self.idum2, IA2, IM2, n)
+        iv = np.ascontiguousarray(self.iv, dtype=np.int64)
+        iy_seq = _shuffle_block(idum_seq, idum2_seq, np.int64(self.iy), iv)
+        
+        self.idum = int(idum_seq[-1])
+        self.idum2 = int(idum2_seq[-1])
+        self.iy = iy_seq[-1]
+        self.iv = iv
+        return np.minimum(AM * iy_seq, RNMX)
+    
     @property
     def state(self):
         """Get generator state"""
@@ -145,6 +300,107 @@ class LecuyerCombined(BitGenerator):
         self.iv = state['iv'].copy()
 
 
+class LecuyerStreams:
+    """
+    Several independent ran2() streams advanced in lockstep with NumPy.
+    
+    Each stream reproduces the exact sequence of the LecuyerCombined generator
+    it was built from, so a batch of sessions can draw one deviate per session
+    with a single vectorized call instead of one Python call per session.
+    """
+    
+    def __init__(self, generators):
+        """
+        Snapshot the state of several generators.
+        
+        Args:
+            generators: Sequence of LecuyerCombined instances (one per stream)
+        """
+        self.idum = np.array([g.idum for g in generators], dtype=np.int64)
+        self.idum2 = np.array([g.idum2 for g in generators], dtype=np.int64)
+        self.iy = np.array([g.iy for g in generators], dtype=np.int64)
+        self.iv = np.array([g.iv for g in generators], dtype=np.int64).reshape(len(generators), NTAB)
+    
+    def __len__(self) -> int:
+        return len(self.idum)
+    
+    def ran2(self, index: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Draw the next deviate of each selected stream.
+        
+        Args:
+            index: Integer array of stream indices to advance (default: all)
+            
+        Returns:
+            Array of uniform deviates, one per selected stream
+        """
+        if index is None:
+            index = np.arange(len(self.idum))
+        
+        # First component
+        idum = self.idum[index]
+        k = idum // IQ1
+        idum = IA1 * (idum - k * IQ1) - k * IR1
+        idum[idum < 0] += IM1
+        
+        # Second component
+        idum2 = self.idum2[index]
+        k = idum2 // IQ2
+        idum2 = IA2 * (idum2 - k * IQ2) - k * IR2
+        idum2[idum2 < 0] += IM2
+        
+        # Bays-Durham shuffle
+        j = np.minimum(1 + self.iy[index] // NDIV, NTAB) - 1
+        iy = self.iv[index, j] - idum2
+        self.iv[index, j] = idum
+        iy[iy < 1] += IMM1
+        
+        self.idum[index] = idum
+        self.idum2[index] = idum2
+        self.iy[index] = iy
+        
+        return np.minimum(AM * iy, RNMX)
+    
+    def ran2_block(self, n: int, index: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Draw the next n deviates of each selected stream at once.
+        
+        As in ``LecuyerCombined.ran2_block``, both LCG components are
+        advanced with precomputed powers of their multipliers; the shuffle
+        runs per stream (compiled with numba when available) or, without
+        numba, draw by draw across the streams.
+        
+        Args:
+            n: Deviates per stream
+            index: Integer array of stream indices to advance (default: all)
+            
+        Returns:
+            Array of shape (len(index), n); row k equals n successive
+            ``ran2()`` draws of stream ``index[k]``
+        """
+        if index is None:
+            index = np.arange(len(self.idum))
+        if n <= 0:
+            return np.empty((len(index), 0), dtype=np.float64)
+        
+        idum_seq = _lcg_powers(IA1, IM1, n)[None, :] * self.idum[index, None] % IM1
+        idum2_seq = _lcg_powers(IA2, IM2, n)[None, :] * self.idum2[index, None] % IM2
+        iv = self.iv[index]
+        iy = self.iy[index]
+        if numba is not None:
+            iy_seq = np.empty((len(index), n), dtype=np.int64)
+            for k in range(len(index)):
+                iy_seq[k] = _shuffle_block(idum_seq[k], idum2_seq[k], iy[k], iv[k])
+        else:
+            iy_seq = _shuffle_streams(idum_seq, idum2_seq, iy, iv)
+        
+        self.idum[index] = idum_seq[:, -1]
+        self.idum2[index] = idum2_seq[:, -1]
+        self.iy[index] = iy_seq[:, -1]
+        self.iv[index] = iv
+        return np.minimum(AM * iy_seq, RNMX)
+
+
 def get_rng(seed: Optional[int] = None) -> Generator:
     """
     Get a numpy Generator using safe default RNG
@@ -174,6 +430,30 @@ def get_lecuyer_raw(seed: Optional[int] = None) -> LecuyerCombined:
     return LecuyerCombined(seed)
 
 
+def get_lecuyer_substream(seed: int, experiment: int = 0, session: int = 0) -> LecuyerCombined:
+    """
+    Get the L'Ecuyer generator of one (experiment, session) pair.
+    
+    The stream depends only on the seed and the pair, not on which process
+    or in which order the session runs, so any session can be rerun alone.
+    
+    Args:
+        seed: Base random seed
+        experiment: Experiment index
+        session: Session index within the experiment
+        
+    Returns:
+        LecuyerCombined positioned at the start of the substream
+    """
+    if not 0 <= session < SESSIONS_PER_EXPERIMENT:
+        raise ValueError(f"session must be in [0, {SESSIONS_PER_EXPERIMENT}), got {session}")
+    if experiment < 0:
+        raise ValueError(f"experiment must be non-negative, got {experiment}")
+    rng = LecuyerCombined(seed)
+    rng.jump_ahead((experiment * SESSIONS_PER_EXPERIMENT + session) * SUBSTREAM_LENGTH)
+    return rng
+
+
 # Global RNG instance for thread-local storage
 _thread_local = threading.local()
 
@@ -0,0 +1,373 @@
+"""
+Columnar run-log store.
+
+All runs of an experiment are written to one uncompressed NPZ file
+(``logs/runs.npz``) instead of one JSON file per run. Every key of the run
+dictionaries becomes a column of one of four kinds:
+
+- ``scalar``: one number per run, stored as a single ``(n_runs,)`` member
+  (``None`` is stored as NaN and the column is marked nullable),
+- ``array``: fixed-shape arrays such as ``final_prices``, stacked into one
+  ``(n_runs, ...)`` member,
+- ``history``: per-period arrays such as ``price_history``, stored as one
+  member per run so a reader touches only the runs it plots,
+- ``object``: anything else (strings, dicts), stored as JSON text per run.
+
+NPZ members are only read when accessed, so ``RunLog`` readers load just
+the columns they ask for. The store is written uncompressed, so a history
+can also be opened as an ``np.memmap`` over its bytes inside the archive;
+analyses then stream over it with ``iter_chunks`` instead of holding the
+whole history in memory. ``convert_json_logs`` rewrites an existing
+directory of ``run_*.json`` logs into the columnar format.
+"""
+
+import json
+import os
+import struct
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+RUN_LOG_FILE = "runs.npz"
+RUN_LOG_FORMAT = "calvano-runlog"
+RUN_LOG_VERSION = 1
+
+# Columns that always hold one row per period
+HISTORY_COLUMNS = ('price_history', 'profit_history')
+
+# Rows of a history processed at once by the streaming analyses
+HISTORY_CHUNK_ROWS = 65536
+
+# Size of the fixed part of a ZIP local file header
+_ZIP_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+
+def iter_chunks(history: np.ndarray, chunk_rows: Optional[int] = None,
+                overlap: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Walk a (possibly memory-mapped) history in fixed-size blocks of rows.
+
+    Args:
+        history: Array whose first axis is time
+        chunk_rows: Rows per block (default: HISTORY_CHUNK_ROWS)
+        overlap: Extra rows appended to each block from the next one, for
+            windows and transitions that straddle block boundaries
+
+    Yields:
+        Tuple (first row of the block, block as an in-memory array)
+    """
+    chunk_rows = chunk_rows or HISTORY_CHUNK_ROWS
+    n_rows = len(history)
+    for lo in range(0, max(n_rows - overlap, 0), chunk_rows):
+        yield lo, np.asarray(history[lo:min(lo + chunk_rows + overlap, n_rows)])
+
+
+def _as_array(value: Any) -> Optional[np.ndarray]:
+    """Numeric array of a run value, or None if the value is not a numeric array."""
+    if isinstance(value, np.ndarray):
+        return value if value.dtype.kind in 'biuf' else None
+    if isinstance(value, (list, tuple)):
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            return None
+        return array if array.dtype.kind in 'biuf' and array.ndim > 0 else None
+    return None
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoding of numpy values inside object columns."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating))
+
+
+def _scalar_column(values: List[Any]) -> Dict[str, Any]:
+    """Storage dtype of a scalar column; ints and bools keep their type when not nullable."""
+    present = [v for v in values if v is not None]
+    nullable = len(present) < len(values)
+    if all(isinstance(v, (bool, np.bool_)) for v in present):
+        dtype = 'bool'
+    elif all(isinstance(v, (bool, int, np.bool_, np.integer)) for v in present):
+        dtype = 'int'
+    else:
+        dtype = 'float'
+    return {'kind': 'scalar', 'dtype': dtype, 'nullable': nullable}
+
+
+def _classify(name: str, values: List[Any]) -> Dict[str, Any]:
+    """Column description of one key across all runs."""
+    if all(_is_scalar(v) for v in values):
+        return _scalar_column(values)
+    arrays = [_as_array(v) for v in values]
+    if all(a is not None for a in arrays):
+        shapes = {a.shape for a in arrays}
+        if name in HISTORY_COLUMNS or len(shapes) > 1:
+            return {'kind': 'history'}
+        return {'kind': 'array'}
+    return {'kind': 'object'}
+
+
+def write_run_log(run_results: Sequence[Dict[str, Any]], path: str) -> Path:
+    """
+    Write run dictionaries to a columnar NPZ store.
+
+    Args:
+        run_results: One result dictionary per run
+        path: Output file (conventionally ``<output_dir>/logs/runs.npz``)
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    names: List[str] = []
+    for result in run_results:
+        names.extend(key for key in result if key not in names)
+
+    members: Dict[str, np.ndarray] = {}
+    columns = []
+    for name in names:
+        values = [result.get(name) for result in run_results]
+        column = _classify(name, values)
+        kind = column['kind']
+        if kind == 'scalar':
+            if column['nullable'] or column['dtype'] == 'float':
+                data = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+            else:
+                data = np.array(values, dtype=bool if column['dtype'] == 'bool' else np.int64)
+            members[f"scalar/{name}"] = data
+        elif kind == 'array':
+            members[f"array/{name}"] = np.stack([_as_array(v) for v in values])
+        elif kind == 'history':
+            for run, value in enumerate(values):
+                members[f"history/{name}/{run:06d}"] = _as_array(value)
+        else:
+            members[f"object/{name}"] = np.array([json.dumps(v, default=_json_default) for v in values])
+        columns.append(dict(column, name=name))
+
+    meta = {
+        'format': RUN_LOG_FORMAT,
+        'version': RUN_LOG_VERSION,
+        'n_runs': len(run_results),
+        'columns': columns
+    }
+    members['meta'] = np.array(json.dumps(meta))
+
+    # Write to a temporary file and move it into place so readers never see a partial store;
+    # open() (unlike mkstemp) gives the file the umask's usual permissions
+    tmp_path = path.parent / f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'xb') as f:
+            np.savez(f, **members)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+class RunLog:
+    """Lazy reader of a columnar run-log store."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._npz = np.load(self.path, allow_pickle=False)
+        meta = json.loads(str(self._npz['meta']))
+        if meta.get('format') != RUN_LOG_FORMAT:
+            raise ValueError(f"Not a run log: {self.path}")
+        self.n_runs: int = meta['n_runs']
+        self._columns: Dict[str, Dict[str, Any]] = {c['name']: c for c in meta['columns']}
+
+    def __len__(self) -> int:
+        return self.n_runs
+
+    def __enter__(self) -> 'RunLog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in the key order of the original run dictionaries."""
+        return list(self._columns)
+
+    def kind(self, name: str) -> str:
+        """Storage kind of a column: 'scalar', 'array', 'history' or 'object'."""
+        return self._lookup(name)['kind']
+
+    def _lookup(self, name: str) -> Dict[str, Any]:
+        if name not in self._columns:
+            raise KeyError(f"Unknown run-log column: {name}")
+        return self._columns[name]
+
+    def column(self, name: str, mmap: bool = False) -> Any:
+        """
+        All runs of one column.
+
+        Args:
+            name: Column name
+            mmap: Memory-map history chunks instead of reading them
+
+        Returns:
+            ``(n_runs,)`` array for scalars, ``(n_runs, ...)`` array for
+            fixed-shape arrays, and a list with one entry per run otherwise
+        """
+        kind = self.kind(name)
+        if kind == 'scalar':
+            return self._npz[f"scalar/{name}"]
+        if kind == 'array':
+            return self._npz[f"array/{name}"]
+        if kind == 'history':
+            return [self.history(name, run, mmap=mmap) for run in range(self.n_runs)]
+        return [json.loads(text) for text in self._npz[f"object/{name}"]]
+
+    def history(self, name: str, run: int, mmap: bool = False) -> np.ndarray:
+        """
+        Per-period array of a single run.
+
+        Args:
+            name: History column
+            run: Run index
+            mmap: Return a read-only ``np.memmap`` into the store instead of
+                reading the array into memory
+        """
+        if self.kind(name) != 'history':
+            raise ValueError(f"Column {name} is not a history")
+        if not 0 <= run < self.n_runs:
+            raise IndexError(f"Run {run} out of range for {self.n_runs} runs")
+        member = f"history/{name}/{run:06d}"
+        if mmap:
+            return self._memmap(member)
+        return self._npz[member]
+
+    def _memmap(self, member: str) -> np.ndarray:
+        """Memory-map an uncompressed ``.npy`` member of the archive."""
+        info = self._npz.zip.getinfo(member + '.npy')
+        if info.compress_type != zipfile.ZIP_STORED:
+            return self._npz[member]
+        with open(self.path, 'rb') as f:
+            f.seek(info.header_offset)
+            fields = _ZIP_LOCAL_HEADER.unpack(f.read(_ZIP_LOCAL_HEADER.size))
+            name_length, extra_length = fields[-2:]
+            f.seek(name_length + extra_length, os.SEEK_CUR)
+            major, _ = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if major == 1
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            offset = f.tell()
+        if dtype.hasobject or 0 in shape:
+            return self._npz[member]
+        return np.memmap(self.path, dtype=dtype, mode='r', shape=shape,
+                         order='F' if fortran_order else 'C', offset=offset)
+
+    def scalars(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Table of scalar metrics, one row per run.
+
+        Args:
+            columns: Scalar columns to load (default: all scalar columns)
+        """
+        if columns is None:
+            columns = [name for name, c in self._columns.items() if c['kind'] == 'scalar']
+        data = {}
+        for name in columns:
+            if self.kind(name) != 'scalar':
+                raise ValueError(f"Column {name} is not a scalar")
+            data[name] = self._npz[f"scalar/{name}"]
+        return pd.DataFrame(data, index=pd.RangeIndex(self.n_runs, name='run'))
+
+    def _scalar_values(self, name: str) -> List[Any]:
+        """Scalar column as Python values, with NaN of nullable columns restored to None."""
+        column = self._columns[name]
+        values = self._npz[f"scalar/{name}"]
+        cast = {'bool': bool, 'int': int, 'float': float}[column['dtype']]
+        if column['nullable']:
+            return [None if np.isnan(v) else cast(v) for v in values]
+        return [cast(v) for v in values]
+
+    def runs(self, columns: Optional[Sequence[str]] = None, mmap: bool = False) -> List[Dict[str, Any]]:
+        """
+        Run dictionaries in the layout of the per-run JSON logs.
+
+        Args:
+            columns: Columns to load (default: all)
+            mmap: Memory-map histories instead of reading them
+
+        Returns:
+            One dictionary per run; array-valued columns are numpy arrays
+        """
+        columns = self.columns if columns is None else list(columns)
+        results: List[Dict[str, Any]] = [{} for _ in range(self.n_runs)]
+        for name in columns:
+            kind = self.kind(name)
+            if kind == 'scalar':
+                values = self._scalar_values(name)
+            elif kind == 'array':
+                values = list(self.column(name))
+            else:
+                values = self.column(name, mmap=mmap)
+            for result, value in zip(results, values):
+                result[name] = value
+        return results
+
+
+def find_run_log(log_dir: str) -> Optional[Path]:
+    """Run-log store in ``log_dir`` or its ``logs`` subdirectory, if any."""
+    for candidate in (Path(log_dir) / RUN_LOG_FILE, Path(log_dir) / "logs" / RUN_LOG_FILE):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def find_json_logs(log_dir: str) -> List[Path]:
+    """Per-run JSON logs in ``log_dir`` or its ``logs`` subdirectory."""
+    logs_path = Path(log_dir)
+    run_files = sorted(logs_path.glob("run_*.json"))
+    if not run_files and (logs_path / "logs").exists():
+        run_files = sorted((logs_path / "logs").glob("run_*.json"))
+    return run_files
+
+
+def convert_json_logs(log_dir: str, output: Optional[str] = None, remove: bool = False) -> Path:
+    """
+    Convert per-run JSON logs to a columnar run-log store.
+
+    Args:
+        log_dir: Run directory or its ``logs`` subdirectory
+        output: Output file (default: ``runs.npz`` next to the JSON logs)
+        remove: Delete the JSON logs after a successful conversion
+
+    Returns:
+        Path of the written store
+    """
+    run_files = find_json_logs(log_dir)
+    if not run_files:
+        raise FileNotFoundError(f"No run log files found in {log_dir}")
+
+    run_results = []
+    for log_file in run_files:
+        with open(log_file, 'r') as f:
+            run_results.append(json.load(f))
+
+    path = write_run_log(run_results, output or run_files[0].parent / RUN_LOG_FILE)
+    if remove:
+        for log_file in run_files:
+            log_file.unlink()
+    return path
@@ -0,0 +1,296 @@
+"""
+Dynamic session scheduler for parallel Q-learning runs.
+
+Session run times differ by orders of magnitude (early convergence vs. hitting
+``max_iterations``), so a static ``pool.map`` split leaves most workers idle
+while the slowest chunk finishes. The scheduler instead:
+
+- orders jobs longest-expected-first, so long sessions start early and
+  short ones fill the gaps at the end; the expected run time of a session
+  comes from the run times recorded for it, or for its experiment, by
+  earlier scheduled runs (``SessionTimes``),
+- hands jobs out one at a time (``imap_unordered`` with chunksize 1): an idle
+  worker pulls the next job as soon as it is done,
+- streams results back as they complete,
+- records per-worker busy time to report utilization,
+- publishes the read-only game tables once in shared memory
+  (``shared_tables``) instead of rebuilding them in every worker.
+
+Because every session draws from its own ``(experiment, session)`` substream,
+the order in which workers pick jobs up has no effect on the results.
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .params import SimParams
+from .shared_tables import SharedTablePublisher, publish_worker_tables
+
+
+@dataclass
+class WorkerStats:
+    """Work done by one worker process."""
+    pid: int
+    n_tasks: int = 0
+    busy_time: float = 0.0
+
+
+@dataclass
+class SchedulerStats:
+    """Per-worker utilization of one scheduled run."""
+    n_workers: int = 0
+    wall_time: float = 0.0
+    workers: Dict[int, WorkerStats] = field(default_factory=dict)
+
+    def utilization(self) -> Dict[int, float]:
+        """Fraction of the wall time each worker spent running sessions."""
+        if self.wall_time <= 0:
+            return {pid: 0.0 for pid in self.workers}
+        return {pid: w.busy_time / self.wall_time for pid, w in self.workers.items()}
+
+    @property
+    def mean_utilization(self) -> float:
+        """Busy time over available worker time (idle workers count as 0)."""
+        if self.wall_time <= 0 or self.n_workers == 0:
+            return 0.0
+        return sum(w.busy_time for w in self.workers.values()) / (self.wall_time * self.n_workers)
+
+    def summary(self) -> str:
+        """Human-readable utilization report."""
+        lines = [f"Scheduler: {self.n_workers} workers, wall time {self.wall_time:.2f}s, "
+                 f"mean utilization {self.mean_utilization:.1%}"]
+        for pid, utilization in sorted(self.utilization().items()):
+            worker = self.workers[pid]
+            lines.append(f"  worker {pid}: {worker.n_tasks} sessions, "
+                         f"busy {worker.busy_time:.2f}s ({utilization:.1%})")
+        return "\n".join(lines)
+
+
+class SessionTimes:
+    """
+    Run times of finished sessions, by experiment and session index.
+
+    Sessions are deterministic given their experiment and substream, so the
+    time a session took before is the best guess for its next run, and the
+    mean over an experiment's sessions is a guess for the others. With a
+    ``path`` the record is read from and saved to a JSON file, so it carries
+    over between processes (e.g. the points of a sweep).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.times: Dict[str, Dict[str, float]] = {}
+        # Mean time per experiment, computed on the first miss after a change
+        self._means: Dict[str, float] = {}
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.times = json.load(f)
+            except (OSError, ValueError):
+                # A damaged record only costs scheduling quality
+                self.times = {}
+
+    def record(self, experiment: str, session: int, seconds: float) -> None:
+        self.times.setdefault(experiment, {})[str(session)] = float(seconds)
+        self._means.pop(experiment, None)
+
+    def expected(self, experiment: str, session: int) -> Optional[float]:
+        """Recorded time of the session, else its experiment's mean, else None."""
+        sessions = self.times.get(experiment)
+        if not sessions:
+            return None
+        seconds = sessions.get(str(session))
+        if seconds is not None:
+            return seconds
+        if experiment not in self._means:
+            self._means[experiment] = float(np.mean(list(sessions.values())))
+        return self._means[experiment]
+
+    def save(self) -> None:
+        """Atomically write the record to ``path`` (no-op without a path)."""
+        if self.path is None:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.times, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+# In-process records, by file path (None: not persisted)
+_SESSION_TIMES: Dict[Optional[str], SessionTimes] = {}
+
+
+def get_session_times(path: Optional[str] = None) -> SessionTimes:
+    """Session-time record of this process for a file (loaded once)."""
+    if path not in _SESSION_TIMES:
+        _SESSION_TIMES[path] = SessionTimes(path)
+    return _SESSION_TIMES[path]
+
+
+def experiment_keys(params: SimParams, job_list: Sequence[Dict[str, Any]]) -> List[str]:
+    """
+    Digest of everything a job's sessions depend on except their index, for every job.
+
+    The parameters are serialized once and every experiment is hashed once.
+    """
+    spec = json.dumps({key: value for key, value in params.to_dict().items() if key != 'n_cores'},
+                      sort_keys=True, default=str)
+    digests: Dict[str, str] = {}
+    keys = []
+    for job_args in job_list:
+        job = json.dumps([job_args.get('i_experiment'), job_args.get('cod_experiment'), job_args.get('alpha'),
+                          np.atleast_1d(job_args.get('exploration_parameters', 1.0)).tolist(),
+                          job_args.get('delta')], default=str)
+        if job not in digests:
+            digests[job] = hashlib.sha256((spec + job).encode()).hexdigest()
+        keys.append(digests[job])
+    return keys
+
+
+def experiment_key(params: SimParams, job_args: Dict[str, Any]) -> str:
+    """``experiment_keys`` of a single job."""
+    return experiment_keys(params, [job_args])[0]
+
+
+def exploration_cost(job_args: Dict[str, Any]) -> float:
+    """
+    ``1 / (alpha * min exploration parameter)``, the run-time proxy of an unrecorded experiment.
+
+    Off-path cells are visited at a rate proportional to the exploration
+    parameter and learn at rate alpha, so sessions with little exploration
+    or slow learning take longest to settle.
+    """
+    exploration = np.min(np.asarray(job_args.get('exploration_parameters', 1.0), dtype=float))
+    rate = float(job_args.get('alpha', 1.0)) * exploration
+    return float('inf') if rate <= 0 else 1.0 / rate
+
+
+def job_sessions(job_args: Dict[str, Any], index: int) -> List[int]:
+    """Sessions a job runs: its ``sessions`` (batch jobs) or its ``i_session``, else its position."""
+    return list(job_args.get('sessions', [job_args.get('i_session', index)]))
+
+
+def expected_session_costs(job_list: Sequence[Dict[str, Any]], params: Optional[SimParams] = None,
+                           times: Optional[SessionTimes] = None) -> List[float]:
+    """
+    Expected run time of every job, used for longest-first ordering.
+
+    An explicit ``expected_cost`` key wins, then the recorded times of the
+    job's sessions, then the mean recorded time of its experiment. Experiments
+    without records fall back to ``exploration_cost``, scaled to seconds by
+    the recorded experiments of the same list (unscaled if there are none).
+    A batch job costs the sum over its sessions.
+
+    Args:
+        job_list: Job arguments as passed to ``run_simulation``
+        params: Simulation parameters (needed to look up recorded times)
+        times: Recorded session times
+
+    Returns:
+        Costs (larger runs first)
+    """
+    costs: List[Optional[float]] = []
+    ratios = []
+    keys = experiment_keys(params, job_list) if params is not None and times is not None else None
+    for index, job in enumerate(job_list):
+        sessions = job_sessions(job, index)
+        cost = job.get('expected_cost')
+        if cost is None and keys is not None:
+            key = keys[index]
+            # None for all sessions exactly when the experiment has no records
+            expected = [times.expected(key, session) for session in sessions]
+            if expected[0] is not None:
+                cost = sum(expected)
+                if 0 < exploration_cost(job) < float('inf'):
+                    ratios.append(cost / (len(sessions) * exploration_cost(job)))
+        costs.append(None if cost is None else float(cost))
+    scale = float(np.mean(ratios)) if ratios else 1.0
+    return [scale * len(job_sessions(job, index)) * exploration_cost(job) if cost is None else cost
+            for index, (job, cost) in enumerate(zip(job_list, costs))]
+
+
+def longest_first(job_list: Sequence[Dict[str, Any]], params: Optional[SimParams] = None,
+                  times: Optional[SessionTimes] = None) -> List[int]:
+    """Job indices by decreasing expected cost (ties keep list order)."""
+    costs = expected_session_costs(job_list, params, times)
+    return sorted(range(len(job_list)), key=lambda i: -costs[i])
+
+
+def _run_timed(indexed_job: Tuple[int, Dict[str, Any]]) -> Tuple[int, int, float, Any]:
+    """Worker-side wrapper: run one job (or batch job) and time it."""
+    from .learning_simulation import run_simulation, run_simulation_batch
+
+    index, job_args = indexed_job
+    task = run_simulation_batch if 'sessions' in job_args else run_simulation
+    start = time.perf_counter()
+    result = task(job_args)
+    return index, os.getpid(), time.perf_counter() - start, result
+
+
+def iter_scheduled_simulations(
+    params: SimParams,
+    job_list: Sequence[Dict[str, Any]],
+    n_workers: Optional[int] = None,
+    stats: Optional[SchedulerStats] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Run sessions on a process pool and yield results as they finish.
+
+    Args:
+        params: Simulation parameters (sent once to every worker)
+        job_list: Job arguments of every session, or batch jobs with a
+            ``sessions`` list (run by ``run_simulation_batch``)
+        n_workers: Number of processes (default: ``params.n_cores``, falling
+            back to the CPU count)
+        stats: Optional SchedulerStats filled in while the run progresses
+
+    Session run times are added to the record of
+    ``params.session_times_file`` (in-process only if unset) and order
+    later runs.
+
+    Yields:
+        Tuples (index into job_list, ``run_simulation`` result) in completion order
+    """
+    from .worker import init_worker
+
+    if n_workers is None:
+        n_workers = getattr(params, 'n_cores', None) or os.cpu_count() or 1
+    if stats is None:
+        stats = SchedulerStats()
+    stats.n_workers = n_workers
+
+    times = get_session_times(getattr(params, 'session_times_file', None))
+    order = longest_first(job_list, params, times)
+    keys = experiment_keys(params, job_list)
+    start = time.perf_counter()
+    with SharedTablePublisher() as publisher, mp.Pool(
+        processes=n_workers,
+        initializer=init_worker,
+        initargs=(0, params.rng_seed, params, publish_worker_tables(params, publisher))
+    ) as pool:
+        tasks = ((i, job_list[i]) for i in order)
+        try:
+            for index, pid, busy_time, result in pool.imap_unordered(_run_timed, tasks, chunksize=1):
+                worker = stats.workers.setdefault(pid, WorkerStats(pid=pid))
+                worker.n_tasks += 1
+                worker.busy_time += busy_time
+                stats.wall_time = time.perf_counter() - start
+                sessions = job_sessions(job_list[index], index)
+                for session in sessions:
+                    times.record(keys[index], session, busy_time / len(sessions))
+                yield index, result
+        finally:
+            times.save()
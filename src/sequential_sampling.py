@@ -0,0 +1,244 @@
+"""
+Sequential early stopping of replicate runs.
+
+A fixed number of runs is often more than the estimates need: once the
+confidence intervals of the convergence rate and the profit gain are tight,
+further runs only cost time. With ``sequential_targets`` in the config, the
+simulation runs in waves of ``sequential_wave_size`` runs and keeps running
+means and variances of the quantities ``aggregate_runs`` reports:
+
+- ``convergence_rate``: the share of runs with ``overall_converged``,
+- ``mean_profit``: the final profit averaged over agents,
+- ``profit_gain``: the percentage gain of the final profits over the Nash
+  profits (``gain_vs_nash``), averaged over agents.
+
+After every wave, and once at least ``sequential_min_runs`` runs are done,
+it stops if every targeted metric's confidence interval (level
+``sequential_confidence``) has a half-width at most its target. The
+convergence rate is a proportion and gets a Wilson score interval, which
+stays wide when every run so far agrees; the profit metrics get Student-t
+intervals whose standard deviation is floored at ``sequential_sd_floor``
+(per metric, in the metric's units), so a run of near-identical values
+cannot stop the runs on its own. ``n_runs`` becomes the maximum number of
+runs. Stopping is only checked at wave boundaries, so the runs kept do not
+depend on how a wave is executed.
+
+Example config::
+
+    "n_runs": 200,
+    "sequential_targets": {"convergence_rate": 0.05, "profit_gain": 2.0},
+    "sequential_wave_size": 10,
+    "sequential_sd_floor": {"profit_gain": 0.5}
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import stats
+
+# Handle imports for both package and standalone usage
+try:
+    from .analysis.profit_gain import gain_vs_nash
+    from .params import SimParams
+except ImportError:
+    from analysis.profit_gain import gain_vs_nash
+    from params import SimParams
+
+SEQUENTIAL_METRICS = ('convergence_rate', 'mean_profit', 'profit_gain')
+
+DEFAULT_WAVE_SIZE = 10
+DEFAULT_MIN_RUNS = 30
+DEFAULT_CONFIDENCE = 0.95
+
+# Smallest run-to-run standard deviation assumed for the continuous metrics
+DEFAULT_SD_FLOOR = {'mean_profit': 0.005, 'profit_gain': 1.0}
+
+
+@dataclass
+class RunningStats:
+    """Running mean and variance of a stream of values (Welford's algorithm)."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def push(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (NaN with fewer than two values)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+    def half_width(self, confidence: float = DEFAULT_CONFIDENCE, sd_floor: float = 0.0) -> float:
+        """
+        Half-width of the Student-t confidence interval of the mean (inf with fewer than two values).
+
+        Args:
+            confidence: Confidence level
+            sd_floor: Lower bound on the standard deviation used
+        """
+        if self.n < 2:
+            return float('inf')
+        t = stats.t.ppf(0.5 + confidence / 2, self.n - 1)
+        return float(t * math.sqrt(max(self.variance, sd_floor ** 2) / self.n))
+
+
+def wilson_half_width(rate: float, n: int, confidence: float = DEFAULT_CONFIDENCE) -> float:
+    """
+    Half-width of the Wilson score interval of a proportion.
+
+    Unlike the normal approximation it does not collapse to zero when the
+    observed rate is 0 or 1.
+
+    Args:
+        rate: Observed share of successes
+        n: Number of trials
+        confidence: Confidence level
+
+    Returns:
+        Half-width (inf without trials)
+    """
+    if n < 1:
+        return float('inf')
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    return float(z / (1 + z ** 2 / n) * math.sqrt(rate * (1 - rate) / n + z ** 2 / (4 * n ** 2)))
+
+
+def run_metrics(run: Dict[str, Any], params: SimParams) -> Dict[str, float]:
+    """
+    Per-run values of the sequential metrics.
+
+    Args:
+        run: Run result dictionary
+        params: Simulation parameters (for the Nash benchmark)
+
+    Returns:
+        Metric values; the profit metrics are missing if the run has no
+        final profits
+    """
+    metrics = {'convergence_rate': float(bool(run.get('overall_converged', False)))}
+    profits = run.get('final_profits')
+    if profits is not None and len(np.atleast_1d(profits)):
+        profits = np.atleast_1d(profits)
+        metrics['mean_profit'] = float(np.mean(profits))
+        metrics['profit_gain'] = float(np.mean(gain_vs_nash(profits, params)))
+    return metrics
+
+
+@dataclass
+class SequentialStopper:
+    """
+    Decides after each wave of runs whether the estimates are precise enough.
+
+    Args:
+        targets: Target confidence-interval half-width per metric
+        max_runs: Maximum number of runs
+        wave_size: Runs per wave
+        min_runs: Runs before stopping is considered
+        confidence: Confidence level of the intervals
+        sd_floor: Lower bound on the standard deviation of each continuous
+            metric (defaults from ``DEFAULT_SD_FLOOR``)
+    """
+    targets: Dict[str, float]
+    max_runs: int
+    wave_size: int = DEFAULT_WAVE_SIZE
+    min_runs: int = DEFAULT_MIN_RUNS
+    confidence: float = DEFAULT_CONFIDENCE
+    sd_floor: Dict[str, float] = field(default_factory=dict)
+    stats: Dict[str, RunningStats] = field(init=False)
+    waves: List[Dict[str, Any]] = field(init=False, default_factory=list)
+    n_runs: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        unknown = set(self.targets) - set(SEQUENTIAL_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown sequential metrics {sorted(unknown)}. Must be in {SEQUENTIAL_METRICS}")
+        if not self.targets or any(width <= 0 for width in self.targets.values()):
+            raise ValueError("sequential_targets must give a positive half-width for at least one metric")
+        if self.wave_size < 1:
+            raise ValueError(f"sequential_wave_size must be positive, got {self.wave_size}")
+        if not 0 < self.confidence < 1:
+            raise ValueError(f"sequential_confidence must be in (0, 1), got {self.confidence}")
+        if any(sd < 0 for sd in self.sd_floor.values()):
+            raise ValueError("sequential_sd_floor must not be negative")
+        self.sd_floor = {**DEFAULT_SD_FLOOR, **self.sd_floor}
+        self.stats = {metric: RunningStats() for metric in self.targets}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], max_runs: int) -> Optional['SequentialStopper']:
+        """Stopper selected by a config, or None if it sets no ``sequential_targets``."""
+        targets = config.get('sequential_targets')
+        if not targets:
+            return None
+        return cls(
+            targets={metric: float(width) for metric, width in targets.items()},
+            max_runs=max_runs,
+            wave_size=int(config.get('sequential_wave_size', DEFAULT_WAVE_SIZE)),
+            min_runs=int(config.get('sequential_min_runs', DEFAULT_MIN_RUNS)),
+            confidence=float(config.get('sequential_confidence', DEFAULT_CONFIDENCE)),
+            sd_floor={metric: float(sd) for metric, sd in config.get('sequential_sd_floor', {}).items()}
+        )
+
+    def update(self, metrics: Dict[str, float]) -> None:
+        """Add the metrics of one finished run."""
+        self.n_runs += 1
+        for metric, running in self.stats.items():
+            value = metrics.get(metric)
+            if value is not None and np.isfinite(value):
+                running.push(value)
+
+    def half_width(self, metric: str) -> float:
+        """Current confidence-interval half-width of a targeted metric."""
+        running = self.stats[metric]
+        if metric == 'convergence_rate':
+            return wilson_half_width(running.mean, running.n, self.confidence)
+        return running.half_width(self.confidence, self.sd_floor.get(metric, 0.0))
+
+    def half_widths(self) -> Dict[str, float]:
+        """Current confidence-interval half-width of every targeted metric."""
+        return {metric: self.half_width(metric) for metric in self.stats}
+
+    def precise(self) -> bool:
+        """Whether every targeted metric has reached its target half-width."""
+        return all(width <= self.targets[metric] for metric, width in self.half_widths().items())
+
+    def end_wave(self) -> bool:
+        """
+        Record the estimates at the end of a wave.
+
+        Returns:
+            True if the runs should stop
+        """
+        half_widths = self.half_widths()
+        self.waves.append({
+            'n_runs': self.n_runs,
+            'means': {metric: running.mean for metric, running in self.stats.items()},
+            'half_widths': half_widths
+        })
+        return self.n_runs >= self.min_runs and self.precise()
+
+    @property
+    def stop_reason(self) -> str:
+        """'precision' if the targets were reached, 'max_runs' otherwise."""
+        return 'precision' if self.n_runs >= self.min_runs and self.precise() else 'max_runs'
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the estimates and the waves."""
+        return {
+            'n_runs': self.n_runs,
+            'max_runs': self.max_runs,
+            'stop_reason': self.stop_reason,
+            'confidence': self.confidence,
+            'targets': dict(self.targets),
+            'sd_floor': {metric: self.sd_floor[metric] for metric in self.targets if metric in self.sd_floor},
+            'estimates': {
+                metric: {'mean': running.mean, 'half_width': self.half_width(metric), 'n': running.n}
+                for metric, running in self.stats.items()
+            },
+            'waves': self.waves
+        }
@@ -0,0 +1,146 @@
+"""
+Shared-memory tables for worker processes.
+
+Large read-only arrays (profit and transition tables, price grids, pre-trained
+Q matrices for strategy 'T') are published once by the parent process into
+``multiprocessing.shared_memory`` blocks. Workers receive only the small
+block descriptors through ``init_worker`` and attach zero-copy NumPy views, so
+memory use stays flat as the number of workers grows.
+"""
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .params import SimParams
+from .game_tables import GameTables, get_game_tables, register_game_tables
+from .init.QInit import register_pretrained_q
+
+# Key prefixes of the published arrays
+GAME_TABLE_PREFIX = 'game_tables'
+Q_INIT_PREFIX = 'q_init'
+
+# Blocks attached by this process; kept referenced so the views stay valid
+_ATTACHED: List[shared_memory.SharedMemory] = []
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Picklable descriptor of one array in shared memory."""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedTablePublisher:
+    """
+    Parent-side owner of the shared memory blocks of one run.
+
+    Use as a context manager so the blocks are unlinked when the run ends.
+    """
+
+    def __init__(self):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.specs: Dict[str, SharedArraySpec] = {}
+
+    def publish(self, key: str, array: np.ndarray) -> SharedArraySpec:
+        """
+        Copy an array into a new shared memory block.
+
+        Args:
+            key: Name under which workers look the array up
+            array: Array to publish
+
+        Returns:
+            Descriptor of the block
+        """
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        self._blocks.append(block)
+        spec = SharedArraySpec(name=block.name, shape=array.shape, dtype=array.dtype.str)
+        self.specs[key] = spec
+        return spec
+
+    def close(self) -> None:
+        """Release and unlink every published block."""
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+        self.specs.clear()
+
+    def __enter__(self) -> 'SharedTablePublisher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def attach_array(spec: SharedArraySpec) -> np.ndarray:
+    """
+    Attach a read-only view of a published array.
+
+    Args:
+        spec: Descriptor from SharedTablePublisher.publish
+
+    Returns:
+        Zero-copy, non-writeable NumPy view
+    """
+    block = shared_memory.SharedMemory(name=spec.name)
+    _ATTACHED.append(block)
+    view = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=block.buf)
+    view.flags.writeable = False
+    return view
+
+
+def publish_worker_tables(params: SimParams, publisher: SharedTablePublisher) -> Dict[str, SharedArraySpec]:
+    """
+    Publish the read-only tables every session of ``params`` needs.
+
+    Args:
+        params: Simulation parameters
+        publisher: Publisher owning the blocks
+
+    Returns:
+        Descriptors to pass to ``init_worker``
+    """
+    tables = get_game_tables(params)
+    prefix = f"{GAME_TABLE_PREFIX}/{tables.key}"
+    publisher.publish(f"{prefix}/prices", tables.prices)
+    publisher.publish(f"{prefix}/profits", tables.profits)
+    publisher.publish(f"{prefix}/next_state", tables.next_state)
+
+    q_init_path = getattr(params, 'q_init_path', None)
+    if params.q_strategy == 'T' and q_init_path is not None:
+        publisher.publish(f"{Q_INIT_PREFIX}/{q_init_path}", np.load(q_init_path))
+
+    return dict(publisher.specs)
+
+
+def install_worker_tables(specs: Dict[str, SharedArraySpec]) -> None:
+    """
+    Attach published tables in a worker and register them with their caches.
+
+    Game tables go into the ``game_tables`` memo and pre-trained Q matrices
+    into the strategy 'T' loader, so neither is rebuilt or reloaded.
+
+    Args:
+        specs: Descriptors returned by ``publish_worker_tables``
+    """
+    game_tables: Dict[str, Dict[str, np.ndarray]] = {}
+    for key, spec in specs.items():
+        prefix, rest = key.split('/', 1)
+        if prefix == GAME_TABLE_PREFIX:
+            table_key, field_name = rest.rsplit('/', 1)
+            game_tables.setdefault(table_key, {})[field_name] = attach_array(spec)
+        elif prefix == Q_INIT_PREFIX:
+            register_pretrained_q(rest, attach_array(spec))
+
+    for table_key, arrays in game_tables.items():
+        register_game_tables(GameTables(key=table_key, **arrays))
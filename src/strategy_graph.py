@@ -0,0 +1,257 @@
+"""
+Cycle/basin decomposition of deterministic strategies.
+
+Under a converged (greedy) strategy profile every state has exactly one
+successor, so the state space is a functional graph: each state runs along a
+transient tail into exactly one attractor cycle. ``StrategyGraph`` records
+that structure once per strategy:
+
+- the successor of every state,
+- the attractor cycle each state falls into and its distance to it,
+- the members of every cycle in path order.
+
+The decomposition uses binary lifting (jump tables ``f^(2^k)``) instead of
+walking each state and scanning the states visited so far, so it costs
+O(n_states log n_states) array operations rather than a quadratic scan per
+start state. Graphs are memoized by a hash of the strategy and transition
+tables, so repeated analysis passes over the same session reuse them. The
+memo is a least-recently-used cache capped at ``MEMORY_CACHE_MAX_BYTES``,
+so analysing many sessions does not keep every graph alive.
+"""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+# Size cap of the in-process memo (the most recent graph is always kept)
+MEMORY_CACHE_MAX_BYTES = 256 * 2 ** 20
+
+# Graphs built in this process, keyed by strategy_graph_key, least recently used first
+_MEMORY_CACHE: 'OrderedDict[str, StrategyGraph]' = OrderedDict()
+_memory_cache_bytes = 0
+
+
+@dataclass
+class StrategyGraph:
+    """Successor map of a strategy profile and its cycle/basin decomposition."""
+    successor: np.ndarray       # (n_states,) state reached from each state
+    on_cycle: np.ndarray        # (n_states,) True for states on a cycle
+    cycle_index: np.ndarray     # (n_states,) index into ``cycles`` of the attractor of each state
+    tail_length: np.ndarray     # (n_states,) steps until the attractor is reached
+    cycle_position: np.ndarray  # (n_states,) position within its cycle (-1 off the cycles)
+    cycles: List[np.ndarray]    # members of each cycle in path order, smallest state first
+    jumps: List[np.ndarray] = field(repr=False, default_factory=list)  # f^(2^k), k = 0..K
+
+    @property
+    def n_states(self) -> int:
+        return len(self.successor)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the graph's arrays, jump tables included."""
+        arrays = [self.successor, self.on_cycle, self.cycle_index, self.tail_length, self.cycle_position]
+        return sum(a.nbytes for a in arrays + self.cycles + self.jumps)
+
+    @property
+    def cycle_length(self) -> np.ndarray:
+        """Length of the attractor cycle of every state."""
+        lengths = np.array([len(cycle) for cycle in self.cycles], dtype=np.int64)
+        return lengths[self.cycle_index]
+
+    def advance(self, states: np.ndarray, n_steps: np.ndarray) -> np.ndarray:
+        """
+        Follow ``n_steps`` successors from every state at once.
+
+        Args:
+            states: Start states
+            n_steps: Number of steps per start state (broadcast against states)
+
+        Returns:
+            End states
+        """
+        position = np.array(states, dtype=np.int64, copy=True)
+        n_steps = np.broadcast_to(np.asarray(n_steps, dtype=np.int64), position.shape)
+        for k in range(int(n_steps.max(initial=0)).bit_length()):
+            take = ((n_steps >> k) & 1).astype(bool)
+            jump = self.jumps[k] if k < len(self.jumps) else self._jump(k)
+            position[take] = jump[position[take]]
+        return position
+
+    def _jump(self, k: int) -> np.ndarray:
+        """f^(2^k) for k beyond the stored tables (only reached on the cycles)."""
+        jump = self.jumps[-1]
+        for _ in range(k - len(self.jumps) + 1):
+            jump = jump[jump]
+        return jump
+
+    def entry_state(self, state: int) -> int:
+        """First cycle state reached from ``state``."""
+        return int(self.advance(np.array([state]), self.tail_length[state])[0])
+
+    def cycle_from(self, state: int) -> np.ndarray:
+        """
+        Attractor cycle of ``state`` in path order, starting at its entry state.
+
+        This is the sequence of states that repeats forever once the path
+        from ``state`` has reached its cycle.
+        """
+        entry = self.entry_state(state)
+        return np.roll(self.cycles[self.cycle_index[entry]], -self.cycle_position[entry])
+
+    def path(self, state: int) -> np.ndarray:
+        """Transient states from ``state`` (inclusive) up to, excluding, the entry state."""
+        states = []
+        current = state
+        for _ in range(self.tail_length[state]):
+            states.append(current)
+            current = self.successor[current]
+        return np.asarray(states, dtype=np.int64)
+
+    def basin(self, cycle: int) -> np.ndarray:
+        """All states whose attractor is ``cycles[cycle]``."""
+        return np.flatnonzero(self.cycle_index == cycle)
+
+
+def build_strategy_graph(successor: np.ndarray) -> StrategyGraph:
+    """
+    Decompose a successor map into attractor cycles and their basins.
+
+    Args:
+        successor: State reached from each state, shape (n_states,)
+
+    Returns:
+        StrategyGraph of the map
+    """
+    successor = np.asarray(successor, dtype=np.int64)
+    n_states = len(successor)
+    states = np.arange(n_states)
+
+    # Jump tables up to f^(2^K) with 2^K >= n_states, which maps every state onto its cycle
+    jumps = [successor]
+    while 2 ** (len(jumps) - 1) < n_states:
+        jumps.append(jumps[-1][jumps[-1]])
+
+    on_cycle = np.zeros(n_states, dtype=bool)
+    on_cycle[jumps[-1]] = True
+
+    # Label cycles by their smallest member: the minimum over 2^K steps covers the whole cycle
+    smallest = states.copy()
+    for f_k in jumps[:-1]:
+        smallest = np.minimum(smallest, smallest[f_k])
+    cycle_label = smallest[jumps[-1]]
+
+    # Distance to the cycle: longest jumps that stay off the cycle, plus one step
+    tail_length = np.zeros(n_states, dtype=np.int64)
+    position = states.copy()
+    off_cycle = ~on_cycle
+    for k in reversed(range(len(jumps) - 1)):
+        candidate = jumps[k][position]
+        move = off_cycle & ~on_cycle[candidate]
+        position[move] = candidate[move]
+        tail_length[move] += 2 ** k
+    tail_length[off_cycle] += 1
+
+    # Cycle members in path order; each cycle state is visited once
+    labels = np.flatnonzero(on_cycle & (cycle_label == states))
+    label_index = np.full(n_states, -1, dtype=np.int64)
+    label_index[labels] = np.arange(len(labels))
+    cycle_position = np.full(n_states, -1, dtype=np.int64)
+    cycles = []
+    for start in labels:
+        members = [start]
+        state = successor[start]
+        while state != start:
+            members.append(state)
+            state = successor[state]
+        members = np.asarray(members, dtype=np.int64)
+        cycle_position[members] = np.arange(len(members))
+        cycles.append(members)
+
+    return StrategyGraph(
+        successor=successor,
+        on_cycle=on_cycle,
+        cycle_index=label_index[cycle_label],
+        tail_length=tail_length,
+        cycle_position=cycle_position,
+        cycles=cycles,
+        jumps=jumps
+    )
+
+
+def strategy_successor(strategy: np.ndarray, next_state: np.ndarray,
+                       action_weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Joint action and successor state of every state under a strategy profile.
+
+    Args:
+        strategy: Price index of each agent in each state, shape (n_states, n_agents)
+        next_state: State reached after every joint action, shape (n_profiles,)
+        action_weights: Weight of each agent's price index in the joint action number
+
+    Returns:
+        Tuple (joint action number, successor state), each of shape (n_states,)
+    """
+    profile = np.asarray(strategy, dtype=np.int64) @ np.asarray(action_weights, dtype=np.int64)
+    return profile, np.asarray(next_state, dtype=np.int64)[profile]
+
+
+def strategy_graph_key(strategy: np.ndarray, next_state: np.ndarray, action_weights: np.ndarray) -> str:
+    """Hash of everything that determines the successor map of a strategy."""
+    digest = hashlib.sha256()
+    for array in (strategy, next_state, action_weights):
+        array = np.ascontiguousarray(array, dtype=np.int64)
+        digest.update(str(array.shape).encode('utf-8'))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def get_strategy_graph(strategy: np.ndarray, next_state: np.ndarray,
+                       action_weights: np.ndarray) -> StrategyGraph:
+    """
+    Memoized StrategyGraph of a strategy profile.
+
+    Args:
+        strategy: Price index of each agent in each state, shape (n_states, n_agents)
+        next_state: State reached after every joint action, shape (n_profiles,)
+        action_weights: Weight of each agent's price index in the joint action number
+
+    Returns:
+        StrategyGraph (shared between calls; treat as read-only)
+    """
+    global _memory_cache_bytes
+    key = strategy_graph_key(strategy, next_state, action_weights)
+    if key in _MEMORY_CACHE:
+        _MEMORY_CACHE.move_to_end(key)
+        return _MEMORY_CACHE[key]
+
+    _, successor = strategy_successor(strategy, next_state, action_weights)
+    graph = build_strategy_graph(successor)
+    _MEMORY_CACHE[key] = graph
+    _memory_cache_bytes += graph.nbytes
+    # Evict least recently used graphs beyond the cap
+    while _memory_cache_bytes > MEMORY_CACHE_MAX_BYTES and len(_MEMORY_CACHE) > 1:
+        _, evicted = _MEMORY_CACHE.popitem(last=False)
+        _memory_cache_bytes -= evicted.nbytes
+    return graph
+
+
+def strategy_graph_globals(optimal_strategy: np.ndarray, globals) -> StrategyGraph:
+    """
+    Memoized StrategyGraph of a strategy in the layout of the ``GlobalVars`` analyses.
+
+    The analyses use one-period memory, so the state reached after a joint
+    action is the joint action itself, numbered with ``globals.c_actions``.
+    """
+    if globals.num_states != globals.num_actions:
+        raise ValueError("Strategy graphs of GlobalVars strategies require one-period memory")
+    return get_strategy_graph(optimal_strategy, np.arange(globals.num_actions), np.asarray(globals.c_actions))
+
+
+def clear_strategy_graph_cache() -> None:
+    """Drop all memoized strategy graphs."""
+    global _memory_cache_bytes
+    _MEMORY_CACHE.clear()
+    _memory_cache_bytes = 0
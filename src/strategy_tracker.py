@@ -0,0 +1,228 @@
+"""
+Incremental greedy-strategy tracking for the learning loop.
+
+A Q update changes a single cell, so the greedy strategy of a row only needs
+work when that cell touches the row maximum. ``StrategyTracker`` caches the
+maximum, its first location and the number of tied maxima of every
+(agent, state) row:
+
+- a new value above the maximum replaces it in O(1),
+- a new value equal to the maximum adds a tie in O(1),
+- only lowering a cell that held the maximum triggers a rescan of the row.
+
+At a measurement the strategies are the cached argmaxes, set block-wise;
+only tied rows are resolved, with the pre-drawn deviate exactly like
+``QL_routines.max_loc_break_ties``. The tracker also counts for how many
+consecutive measurements the strategies stayed unchanged, which replaces
+keeping a history of strategy copies.
+
+For a LazyQTable the cache covers only the pages learning has written.
+Untouched rows still hold their initial values, so their statistics come
+from the table's initializer: one template row for 'F' and 'U', the page's
+regenerated rows for the random initializers. An untouched page without
+ties keeps its strategy, so it is regenerated at most once for measuring.
+"""
+
+from typing import List, Sequence, Set, Tuple
+
+import numpy as np
+
+# Handle imports for both package and standalone usage
+try:
+    from .q_storage import LazyQTable, row_statistics
+except ImportError:
+    from q_storage import LazyQTable, row_statistics
+
+
+class PagedRowMax(dict):
+    """
+    Row maxima of the loaded pages of a LazyQTable, keyed by state.
+
+    Other rows read the maximum of their initial values; the statistics of
+    the last such page are kept for the reads that follow.
+    """
+
+    def __init__(self, q: LazyQTable):
+        super().__init__()
+        self.q = q
+        self._initial: Tuple[int, np.ndarray] = (-1, np.empty(0))
+
+    def __missing__(self, state: int) -> float:
+        page, offset = divmod(state, self.q.page_rows)
+        if self._initial[0] != page:
+            self._initial = (page, self.q.initial_row_stats(page)[0])
+        return float(self._initial[1][offset])
+
+
+def greedy_actions(q_rows: np.ndarray, row_max: np.ndarray, row_argmax: np.ndarray,
+                   n_ties: np.ndarray, uniforms: np.ndarray) -> np.ndarray:
+    """
+    Greedy actions of a block of rows from their cached statistics.
+
+    A row with ``n`` tied maxima takes the ``int(u * n)``-th of them, as
+    ``max_loc_break_ties`` does.
+
+    Args:
+        q_rows: Q values of the rows, shape (n_rows, n_actions)
+        row_max: Row maxima
+        row_argmax: First argmax of every row
+        n_ties: Number of tied maxima of every row
+        uniforms: One tie-break deviate per row
+
+    Returns:
+        Actions, shape (n_rows,)
+    """
+    actions = row_argmax.astype(np.int32)
+    tied = np.flatnonzero(n_ties > 1)
+    if len(tied):
+        is_max = q_rows[tied] == row_max[tied, None]
+        rank = (uniforms[tied] * n_ties[tied]).astype(np.int64)
+        actions[tied] = np.argmax(np.cumsum(is_max, axis=1) > rank[:, None], axis=1)
+    return actions
+
+
+class StrategyTracker:
+    """Cached row maxima and greedy strategies of all agents."""
+
+    def __init__(self, q_matrices: Sequence[np.ndarray]):
+        """
+        Scan the initial Q matrices once.
+
+        Args:
+            q_matrices: Per-agent Q matrices of shape (n_states, n_actions),
+                dense or LazyQTable; the tracker reads them but never writes to them
+        """
+        self.q_matrices = q_matrices
+        self.lazy = isinstance(q_matrices[0], LazyQTable)
+        self.row_max: List = []
+        self.row_argmax: List = []
+        self.n_ties: List = []
+        # Untouched pages whose strategies are set and cannot change (lazy tables)
+        self.settled_pages: List[Set[int]] = [set() for _ in q_matrices]
+        for agent, q in enumerate(q_matrices):
+            if self.lazy:
+                self.row_max.append(PagedRowMax(q))
+                self.row_argmax.append({})
+                self.n_ties.append({})
+                for page in q.pages:
+                    self._load_page(agent, page)
+            else:
+                row_max, row_argmax, n_ties = row_statistics(q)
+                self.row_max.append(row_max.tolist())
+                self.row_argmax.append(row_argmax.tolist())
+                self.n_ties.append(n_ties.tolist())
+
+        self.strategies = [np.zeros(len(q), dtype=np.int32) for q in q_matrices]
+        self.unchanged_periods = 0
+        self.n_measurements = 0
+
+    def _load_page(self, agent: int, page: int) -> None:
+        """Cache the statistics of a materialized page of a lazy table."""
+        q = self.q_matrices[agent]
+        start = page * q.page_rows
+        states = range(start, start + len(q.pages[page]))
+        for cache, values in zip((self.row_max[agent], self.row_argmax[agent], self.n_ties[agent]),
+                                 row_statistics(q.pages[page])):
+            cache.update(zip(states, values.tolist()))
+
+    def _rescan(self, agent: int, state: int) -> None:
+        """Recompute the cached maximum of one row."""
+        row = self.q_matrices[agent][state]
+        max_val = np.max(row)
+        is_max = row == max_val
+        self.row_max[agent][state] = float(max_val)
+        self.row_argmax[agent][state] = int(np.argmax(is_max))
+        self.n_ties[agent][state] = int(np.sum(is_max))
+
+    def update(self, agent: int, state: int, action: int, old_value: float, new_value: float) -> None:
+        """
+        Account for a Q update that has already been written to the matrix.
+
+        Args:
+            agent: Agent index
+            state: Row of the updated cell
+            action: Column of the updated cell
+            old_value: Cell value before the update
+            new_value: Cell value after the update
+        """
+        if self.lazy and state not in self.row_max[agent]:
+            # First write to the page: its statistics are read with the update included
+            self._load_page(agent, state // self.q_matrices[agent].page_rows)
+            return
+        max_val = self.row_max[agent][state]
+        if new_value > max_val:
+            self.row_max[agent][state] = new_value
+            self.row_argmax[agent][state] = action
+            self.n_ties[agent][state] = 1
+        elif old_value == max_val:
+            if new_value < max_val:
+                # The cell was (one of) the maxima and dropped
+                if self.n_ties[agent][state] == 1:
+                    self._rescan(agent, state)
+                else:
+                    self.n_ties[agent][state] -= 1
+                    if self.row_argmax[agent][state] == action:
+                        self._rescan(agent, state)
+        elif new_value == max_val:
+            self.n_ties[agent][state] += 1
+            if action < self.row_argmax[agent][state]:
+                self.row_argmax[agent][state] = action
+
+    def measure(self, uniforms: Sequence[float]) -> List[np.ndarray]:
+        """
+        Refresh the greedy strategies at a measurement period.
+
+        Args:
+            uniforms: One tie-break deviate per (agent, state), agent-major,
+                as consumed by ``max_loc_break_ties``
+
+        Returns:
+            Per-agent strategies (updated in place)
+        """
+        uniforms = np.asarray(uniforms, dtype=np.float64)
+        changed = False
+        for agent, q in enumerate(self.q_matrices):
+            strategy = self.strategies[agent]
+            u = uniforms[agent * len(strategy):(agent + 1) * len(strategy)]
+            if self.lazy:
+                changed |= self._measure_pages(agent, u)
+                continue
+            actions = greedy_actions(q, np.array(self.row_max[agent]), np.array(self.row_argmax[agent]),
+                                     np.array(self.n_ties[agent]), u)
+            changed |= not np.array_equal(actions, strategy)
+            strategy[:] = actions
+
+        self.unchanged_periods = 0 if changed or self.n_measurements == 0 else self.unchanged_periods + 1
+        self.n_measurements += 1
+        return self.strategies
+
+    def _measure_pages(self, agent: int, uniforms: np.ndarray) -> bool:
+        """Refresh the strategy of a lazy table page by page; True if it changed."""
+        q = self.q_matrices[agent]
+        strategy = self.strategies[agent]
+        settled = self.settled_pages[agent]
+        row_max = self.row_max[agent]
+        changed = False
+        for page in range(q.n_pages):
+            start = page * q.page_rows
+            stop = min(start + q.page_rows, len(q))
+            if start in row_max:
+                states = range(start, stop)
+                stats = [np.fromiter(map(cache.__getitem__, states), dtype=dtype, count=len(states))
+                         for cache, dtype in ((row_max, np.float64), (self.row_argmax[agent], np.int64),
+                                              (self.n_ties[agent], np.int64))]
+                actions = greedy_actions(q.pages[page], *stats, uniforms[start:stop])
+            elif page in settled:
+                continue
+            else:
+                stats = q.initial_row_stats(page)
+                if np.all(stats[2] == 1):
+                    settled.add(page)
+                    actions = stats[1]
+                else:
+                    actions = greedy_actions(q.initial_rows(page), *stats, uniforms[start:stop])
+            block = strategy[start:stop]
+            if not np.array_equal(actions, block):
+                block[:] = actions
+                changed = True
+        return changed
@@ -3,16 +3,23 @@ Worker initialization for multiprocessing safety.
 Ensures each worker process has its own RNG state.
 """
 
-from typing import Any
-from .params import SimParams
-from .rng.Lecuyer import set_global_rng
+from typing import Any, Dict, Optional
+
+# Handle imports for both package and standalone usage
+try:
+    from .params import SimParams
+    from .rng.Lecuyer import set_global_rng, get_lecuyer_substream, get_global_raw_rng
+except ImportError:
+    from params import SimParams
+    from rng.Lecuyer import set_global_rng, get_lecuyer_substream, get_global_raw_rng
 
 # Global variables for worker processes
 RNG = None
 PARAMS = None
 
 
-def init_worker(rank: int, base_seed: int, sim_params: SimParams):
+def init_worker(rank: int, base_seed: int, sim_params: SimParams,
+                shared_tables: Optional[Dict[str, Any]] = None):
     """
     Initialize worker process with unique RNG state and parameters.
     
@@ -20,9 +27,15 @@ def init_worker(rank: int, base_seed: int, sim_params: SimParams):
         rank: Worker process rank/index
         base_seed: Base random seed
         sim_params: Simulation parameters
+        shared_tables: Descriptors of tables published in shared memory by
+            the parent (see ``shared_tables.publish_worker_tables``)
     """
     global RNG, PARAMS
     
+    if shared_tables:
+        from .shared_tables import install_worker_tables
+        install_worker_tables(shared_tables)
+    
     # Set unique RNG for this worker
     set_global_rng(base_seed, rank)
     
@@ -30,10 +43,24 @@ def init_worker(rank: int, base_seed: int, sim_params: SimParams):
     PARAMS = sim_params
     
     # For backward compatibility with existing code
-    from .rng.Lecuyer import get_global_raw_rng
     RNG = get_global_raw_rng()
 
 
+def init_session_rng(session: int, experiment: int = 0):
+    """
+    Switch the worker RNG to the substream of one session.
+    
+    The stream is keyed on (experiment, session) only, so results do not
+    depend on the worker rank, the number of workers or the scheduling order.
+    
+    Args:
+        session: Session index within the experiment
+        experiment: Experiment index
+    """
+    global RNG
+    RNG = get_lecuyer_substream(get_worker_params().rng_seed, experiment, session)
+
+
 def get_worker_rng():
     """Get the worker's RNG instance."""
     global RNG
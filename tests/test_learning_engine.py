@@ -0,0 +1,925 @@
+"""
+Unit tests for the Q-learning session engines:
+- Precomputed game tables
+- Batched multi-session engine vs. scalar compute_experiment
+- Compiled kernel backend vs. the Python loop
+- Dynamic session scheduler
+- Shared-memory worker tables
+- Incremental strategy tracking
+- Lazily materialized Q storage
+- Mixed-precision Q storage
+- Vectorized policy evaluation
+- Strategy cycle/basin decomposition
+- Batched impulse responses
+- Columnar run logs and the result cache
+- Sequential early stopping of replicate runs
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+import contextlib
+import io
+import sys
+import os
+import tempfile
+import json
+
+# Add repository root to path (the engines use package-relative imports)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.params import SimParams
+from src.worker import init_worker, init_session_rng
+from src.learning_simulation import compute_experiment, compute_session, run_parallel_simulations
+from src.batch_learning import compute_experiment_batch
+from src.game_tables import build_game_tables, get_game_tables, clear_game_table_cache, game_table_key
+from src.PI_routines import logit_demands, linear_demands
+from src.kernels import NUMBA_AVAILABLE, pairwise_sum, resolve_backend
+from src.scheduler import SchedulerStats, SessionTimes, experiment_key, experiment_keys, longest_first
+from src.strategy_tracker import StrategyTracker
+from src.q_storage import LazyQTable, QRowSource, init_lazy_Q, row_statistics
+from src.rng.Lecuyer import LecuyerCombined
+from src.dtype_policy import q_dtype
+from src.precision_check import validate_precision
+from src.shared_tables import SharedTablePublisher, publish_worker_tables, install_worker_tables
+from src.policy_evaluation import evaluate_strategy
+from src.strategy_graph import build_strategy_graph, get_strategy_graph, clear_strategy_graph_cache
+from src.convergence import compute_cycle_length
+from src.impulse_engine import PERMANENT_DEVIATION, impulse_grid, simulate_impulse_batch
+from src.run_logs import RunLog, convert_json_logs, find_run_log, write_run_log
+from src.result_cache import ResultCache, cache_key
+from src.sequential_sampling import (
+    DEFAULT_SD_FLOOR, RunningStats, SequentialStopper, run_metrics, wilson_half_width
+)
+
+
+def make_params(**overrides):
+    """Small 2-agent, 3-price experiment that runs in well under a second."""
+    config = dict(
+        n_agents=2, n_actions=3, n_states=9, q_strategy='R',
+        max_iterations=1500, n_perfect_measurement=10,
+        convergence_window=200, convergence_tolerance=1e-4,
+        exploration_type=1, a0=1.0, a=2.0, c=0.5, mu=0.1,
+        rng_seed=7, n_sessions=3, game_table_cache_dir=None
+    )
+    config.update(overrides)
+    return SimParams(config)
+
+
+def run_scalar_sessions(params, alpha, exploration_parameters, delta):
+    """Run compute_experiment once per session on its own substream."""
+    results = []
+    for session in range(params.n_sessions):
+        init_worker(0, params.rng_seed, params)
+        init_session_rng(session)
+        results.append(compute_experiment(0, 0, alpha, exploration_parameters, delta))
+    return results
+
+
+class TestGameTables(unittest.TestCase):
+    """Profit/transition tables built from the configured demand model."""
+
+    def test_logit_profits(self):
+        """Logit table rows equal PI_routines.logit_demands profits."""
+        params = make_params(n_actions=4, n_states=16)
+        tables = build_game_tables(params)
+        self.assertEqual(tables.profits.shape, (16, 2))
+
+        # Profile number 1 + 2*4: agent 0 plays price index 1, agent 1 index 2
+        prices = np.array([1 / 3, 2 / 3])
+        a, c = np.array([2.0, 2.0]), np.array([0.5, 0.5])
+        expected = (prices - c) * logit_demands(1.0, a, c, 0.1, prices)
+        np.testing.assert_allclose(tables.profits[1 + 2 * 4], expected, rtol=1e-12)
+        np.testing.assert_array_equal(tables.next_state, np.arange(16))
+
+    def test_singh_vives_profits(self):
+        """Singh-Vives table uses linear demands and the configured price grid."""
+        grid = [0.2, 0.5, 0.9]
+        params = make_params(demand_model='singh_vives', gamma=0.3, price_grid=grid)
+        tables = build_game_tables(params)
+        prices = np.array([0.9, 0.2])
+        np.testing.assert_allclose(tables.profits[2 + 0 * 3], prices * linear_demands(0.3, prices))
+
+    def test_cache_key_tracks_demand_parameters(self):
+        """Only demand parameters change the cache key."""
+        base = game_table_key(make_params())
+        self.assertEqual(base, game_table_key(make_params(alpha=0.5, max_iterations=10)))
+        self.assertNotEqual(base, game_table_key(make_params(mu=0.2)))
+
+    def test_disk_cache_roundtrip(self):
+        """A second process (empty memo) reads the tables back from disk."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params = make_params(game_table_cache_dir=tmp_dir)
+            clear_game_table_cache()
+            built = get_game_tables(params)
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, f"{built.key}.npz")))
+
+            clear_game_table_cache()
+            loaded = get_game_tables(params)
+            self.assertIsNot(built, loaded)
+            np.testing.assert_array_equal(built.profits, loaded.profits)
+            np.testing.assert_array_equal(built.next_state, loaded.next_state)
+            clear_game_table_cache()
+
+    def test_failed_cache_write_leaves_no_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            params = make_params(game_table_cache_dir=tmp_dir)
+            clear_game_table_cache()
+            with mock.patch("numpy.savez", side_effect=OSError(28, "No space left on device")):
+                get_game_tables(params)
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+            clear_game_table_cache()
+            umask = os.umask(0o022)
+            try:
+                key = get_game_tables(params).key
+            finally:
+                os.umask(umask)
+            self.assertEqual(os.stat(os.path.join(tmp_dir, f"{key}.npz")).st_mode & 0o777, 0o644)
+            clear_game_table_cache()
+
+
+class TestBatchedEngine(unittest.TestCase):
+    """Batched engine must reproduce the scalar path bit for bit."""
+
+    def assert_same_sessions(self, scalar_results, batch_results):
+        self.assertEqual(len(scalar_results), len(batch_results))
+        for scalar, batch in zip(scalar_results, batch_results):
+            for q_scalar, q_batch in zip(scalar[0], batch[0]):
+                np.testing.assert_array_equal(q_scalar, q_batch)
+            for s_scalar, s_batch in zip(scalar[1], batch[1]):
+                np.testing.assert_array_equal(s_scalar, s_batch)
+            np.testing.assert_array_equal(scalar[2], batch[2])
+            np.testing.assert_array_equal(scalar[3], batch[3])
+
+    def test_greedy_exploration_matches_scalar(self):
+        """Epsilon-greedy sessions are identical to the scalar path."""
+        params = make_params()
+        eps = np.array([0.05, 0.05])
+        batch_results, _ = compute_experiment_batch(params, 0.15, eps, 0.95)
+        self.assert_same_sessions(run_scalar_sessions(params, 0.15, eps, 0.95), batch_results)
+
+    def test_boltzmann_exploration_matches_scalar(self):
+        """Boltzmann sessions are identical to the scalar path."""
+        params = make_params(exploration_type=2)
+        temperature = np.array([0.1, 0.1])
+        batch_results, _ = compute_experiment_batch(params, 0.15, temperature, 0.95)
+        self.assert_same_sessions(run_scalar_sessions(params, 0.15, temperature, 0.95), batch_results)
+
+    def test_tied_initialization_matches_scalar(self):
+        """Uniform Q initialization exercises the random tie-breaking path."""
+        params = make_params(q_strategy='U', max_iterations=500)
+        eps = np.array([0.5, 0.5])
+        batch_results, _ = compute_experiment_batch(params, 0.15, eps, 0.95)
+        self.assert_same_sessions(run_scalar_sessions(params, 0.15, eps, 0.95), batch_results)
+
+    def test_session_stream_independent_of_batch(self):
+        """A session rerun alone reproduces its result from the full batch."""
+        params = make_params()
+        eps = np.array([0.05, 0.05])
+        full, _ = compute_experiment_batch(params, 0.15, eps, 0.95)
+        alone, _ = compute_experiment_batch(params, 0.15, eps, 0.95, sessions=[2])
+        self.assert_same_sessions(full[2:], alone)
+        self.assertFalse(np.array_equal(full[0][0][0], full[1][0][0]))
+
+    def test_converged_sessions_leave_batch(self):
+        """Sessions stop at their own convergence iteration."""
+        params = make_params(exploration_type=2)
+        _, n_iterations = compute_experiment_batch(params, 0.15, np.array([0.1, 0.1]), 0.95)
+        self.assertEqual(len(n_iterations), params.n_sessions)
+        self.assertTrue(np.all(n_iterations < params.max_iterations))
+
+
+class TestKernelBackend(unittest.TestCase):
+    """The compiled session loop must match the Python loop."""
+
+    def run_backend(self, params, backend, exploration_parameters):
+        results = []
+        for session in range(params.n_sessions):
+            init_worker(0, params.rng_seed, params)
+            init_session_rng(session)
+            results.append(compute_session(0.15, exploration_parameters, 0.95, backend=backend))
+        return results
+
+    def assert_backends_agree(self, params, exploration_parameters):
+        python_runs = self.run_backend(params, 'python', exploration_parameters)
+        numba_runs = self.run_backend(params, 'numba', exploration_parameters)
+        for (q_py, s_py, t_py), (q_nb, s_nb, t_nb) in zip(python_runs, numba_runs):
+            self.assertEqual(t_py, t_nb)
+            for agent in range(params.n_agents):
+                np.testing.assert_array_equal(s_py[agent], s_nb[agent])
+                np.testing.assert_allclose(q_py[agent], q_nb[agent], rtol=1e-12)
+
+    def test_pairwise_sum_matches_numpy(self):
+        """Kernel summation order is NumPy's pairwise order."""
+        values = np.random.default_rng(0).random(1000) * 1e3
+        for n in (3, 8, 13, 128, 129, 1000):
+            self.assertEqual(pairwise_sum(values, 0, n), np.sum(values[:n]))
+
+    def test_unknown_backend_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_backend('cuda')
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+    def test_greedy_backends_agree(self):
+        """Epsilon-greedy sessions: same strategies and convergence times."""
+        self.assert_backends_agree(make_params(), np.array([0.05, 0.05]))
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+    def test_boltzmann_backends_agree(self):
+        """Boltzmann sessions: same strategies and convergence times."""
+        self.assert_backends_agree(make_params(exploration_type=2, n_actions=9, n_states=81),
+                                   np.array([0.1, 0.1]))
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+    def test_tied_initialization_backends_agree(self):
+        """Uniform Q initialization exercises kernel tie-breaking."""
+        self.assert_backends_agree(make_params(q_strategy='U', max_iterations=500),
+                                   np.array([0.5, 0.5]))
+
+
+class TestScheduler(unittest.TestCase):
+    """Work-stealing scheduler: ordering, results and utilization."""
+
+    def make_jobs(self, alphas):
+        return [dict(i_experiment=0, cod_experiment=0, alpha=alpha,
+                     exploration_parameters=np.array([0.05, 0.05]), delta=0.95)
+                for alpha in alphas]
+
+    def test_longest_first_order(self):
+        """Slow learners (small alpha) are scheduled first; explicit costs win."""
+        jobs = self.make_jobs([0.3, 0.05, 0.15])
+        self.assertEqual(longest_first(jobs), [1, 2, 0])
+        jobs[0]['expected_cost'] = 1e9
+        self.assertEqual(longest_first(jobs)[0], 0)
+
+    def test_recorded_times_order_sessions(self):
+        """Sessions of one experiment differ only in their recorded run times."""
+        params = make_params()
+        jobs = [dict(job, i_session=session) for session, job in enumerate(self.make_jobs([0.15] * 3))]
+        self.assertEqual(longest_first(jobs, params, SessionTimes()), [0, 1, 2])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "session_times.json")
+            times = SessionTimes(path)
+            key = experiment_key(params, jobs[0])
+            for session, seconds in enumerate([0.5, 2.0]):
+                times.record(key, session, seconds)
+            times.save()
+            times = SessionTimes(path)
+        # Session 2 is unrecorded and takes its experiment's mean
+        self.assertEqual(longest_first(jobs, params, times), [1, 2, 0])
+        self.assertEqual(experiment_keys(params, jobs), [key] * 3)
+        self.assertEqual((times.expected(key, 0), times.expected(key, 2)), (0.5, 1.25))
+        times.record(key, 1, 3.5)
+        self.assertEqual(times.expected(key, 2), 2.0)
+
+        # An unrecorded experiment learning at a third of the rate is expected to take 3 * 1.25s
+        other = dict(self.make_jobs([0.05])[0], i_session=0)
+        self.assertEqual(longest_first(jobs + [other], params, times), [3, 1, 2, 0])
+
+    def test_parallel_results_match_serial(self):
+        """Results come back in job order and equal a serial rerun of each session."""
+        params = make_params(n_cores=2)
+        jobs = self.make_jobs([0.15, 0.1, 0.2, 0.15])
+        stats = SchedulerStats()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            parallel = run_parallel_simulations(params, jobs, stats=stats)
+        self.assertEqual(out.getvalue().strip(), stats.summary())
+
+        for session, job in enumerate(jobs):
+            init_worker(0, params.rng_seed, params)
+            init_session_rng(session)
+            serial = compute_experiment(0, 0, job['alpha'], job['exploration_parameters'], job['delta'])
+            for q_parallel, q_serial in zip(parallel[session][0], serial[0]):
+                np.testing.assert_array_equal(q_parallel, q_serial)
+
+        self.assertEqual(stats.n_workers, 2)
+        self.assertEqual(sum(w.n_tasks for w in stats.workers.values()), len(jobs))
+        self.assertTrue(0.0 < stats.mean_utilization <= 1.0)
+
+    def test_batch_engine_matches_session_engine(self):
+        """Lockstep batches per experiment return the same results in job order."""
+        jobs = self.make_jobs([0.15, 0.1, 0.15, 0.15, 0.1])
+        sessions = run_parallel_simulations(make_params(n_cores=2), jobs, verbose=False)
+        stats = SchedulerStats()
+        batches = run_parallel_simulations(make_params(n_cores=2, engine='batch'), jobs, stats=stats, verbose=False)
+        # Experiments alpha=0.15 (3 sessions) and alpha=0.1 (2), in batches of at most 3
+        self.assertEqual(sum(w.n_tasks for w in stats.workers.values()), 2)
+        for session, batch in zip(sessions, batches):
+            for part_session, part_batch in zip(session, batch):
+                for a, b in zip(part_session, part_batch):
+                    np.testing.assert_array_equal(a, b)
+
+        with self.assertRaises(ValueError):
+            run_parallel_simulations(make_params(engine='lockstep'), jobs, verbose=False)
+
+
+class TestSharedTables(unittest.TestCase):
+    """Tables published in shared memory are attached zero-copy."""
+
+    def test_worker_uses_published_tables(self):
+        params = make_params()
+        built = get_game_tables(params)
+        with SharedTablePublisher() as publisher:
+            specs = publish_worker_tables(params, publisher)
+            clear_game_table_cache()
+            install_worker_tables(specs)
+
+            attached = get_game_tables(params)
+            self.assertIsNot(attached, built)
+            self.assertFalse(attached.profits.flags.writeable)
+            self.assertFalse(attached.profits.flags.owndata)
+            np.testing.assert_array_equal(attached.profits, built.profits)
+            np.testing.assert_array_equal(attached.next_state, built.next_state)
+            clear_game_table_cache()
+
+
+class TestStrategyTracker(unittest.TestCase):
+    """Incremental argmax must equal a full tie-breaking sweep."""
+
+    def test_matches_full_sweep_with_ties(self):
+        rng = np.random.default_rng(3)
+        # Few distinct values so ties appear, disappear and move around
+        q_matrices = [rng.integers(0, 3, size=(5, 4)).astype(float) for _ in range(2)]
+        tracker = StrategyTracker(q_matrices)
+
+        for step in range(2000):
+            agent, state, action = rng.integers(2), rng.integers(5), rng.integers(4)
+            old_value = q_matrices[agent][state, action]
+            new_value = float(rng.integers(0, 3))
+            q_matrices[agent][state, action] = new_value
+            tracker.update(agent, state, action, old_value, new_value)
+
+            if step % 50 == 0:
+                u = rng.random(10)
+                tracker.measure(u)
+                for agent_check in range(2):
+                    for state_check in range(5):
+                        row = q_matrices[agent_check][state_check]
+                        max_indices = np.flatnonzero(row == row.max())
+                        expected = max_indices[int(u[agent_check * 5 + state_check] * len(max_indices))]
+                        self.assertEqual(tracker.strategies[agent_check][state_check], expected)
+                        self.assertEqual(tracker.row_max[agent_check][state_check], row.max())
+
+    def test_unchanged_counter(self):
+        q_matrices = [np.array([[0.0, 1.0], [2.0, 0.0]])]
+        tracker = StrategyTracker(q_matrices)
+        for _ in range(3):
+            tracker.measure([0.5, 0.5])
+        self.assertEqual(tracker.unchanged_periods, 2)
+
+        q_matrices[0][0, 0] = 3.0
+        tracker.update(0, 0, 0, 0.0, 3.0)
+        tracker.measure([0.5, 0.5])
+        self.assertEqual(tracker.unchanged_periods, 0)
+        np.testing.assert_array_equal(tracker.strategies[0], [0, 0])
+
+    def test_lazy_tables_cache_only_written_pages(self):
+        params = make_params(n_actions=5, n_states=25)
+        u = np.random.default_rng(4).random(25)
+        for strategy in ('R', 'U'):
+            with self.subTest(strategy=strategy):
+                q = init_lazy_Q(strategy, params, LecuyerCombined(11), page_rows=4)
+                tracker = StrategyTracker([q])
+                dense = StrategyTracker([np.asarray(q)])
+                self.assertEqual(len(tracker.row_argmax[0]), 0)
+                self.assertEqual([tracker.row_max[0][s] for s in range(25)], dense.row_max[0])
+
+                q[9, 2] = 5.0
+                tracker.update(0, 9, 2, 0.0, 5.0)
+                self.assertEqual(sorted(tracker.row_argmax[0]), [8, 9, 10, 11])
+                self.assertEqual(tracker.row_max[0][9], 5.0)
+
+                dense = StrategyTracker([np.asarray(q)])
+                np.testing.assert_array_equal(tracker.measure(u)[0], dense.measure(u)[0])
+                self.assertEqual(list(q.pages), [2])
+
+
+class TestLazyQStorage(unittest.TestCase):
+    """Lazy Q tables must learn exactly like dense ones."""
+
+    def run_storage(self, params, exploration_parameters):
+        results = []
+        for session in range(params.n_sessions):
+            init_worker(0, params.rng_seed, params)
+            init_session_rng(session)
+            results.append(compute_session(0.15, exploration_parameters, 0.95, backend='python'))
+        return results
+
+    def assert_storages_agree(self, exploration_parameters, **overrides):
+        dense_runs = self.run_storage(make_params(**overrides), exploration_parameters)
+        lazy_params = make_params(q_storage='lazy', q_page_rows=4, **overrides)
+        lazy_runs = self.run_storage(lazy_params, exploration_parameters)
+        for (q_dense, s_dense, t_dense), (q_lazy, s_lazy, t_lazy) in zip(dense_runs, lazy_runs):
+            self.assertEqual(t_dense, t_lazy)
+            for agent in range(lazy_params.n_agents):
+                self.assertIsInstance(q_lazy[agent], LazyQTable)
+                self.assertLessEqual(q_lazy[agent].n_materialized_rows, lazy_params.n_states)
+                np.testing.assert_array_equal(s_dense[agent], s_lazy[agent])
+                np.testing.assert_array_equal(q_dense[agent], np.asarray(q_lazy[agent]))
+
+    def test_random_initialization(self):
+        self.assert_storages_agree(np.array([0.05, 0.05]))
+
+    def test_gaussian_initialization(self):
+        """Box-Muller pairs straddle states; odd page ends keep them aligned."""
+        self.assert_storages_agree(np.array([0.05, 0.05]), q_strategy='O')
+
+    def test_tied_initializations(self):
+        for strategy in ('U', 'G', 'F'):
+            with self.subTest(strategy=strategy):
+                self.assert_storages_agree(np.array([0.5, 0.5]), q_strategy=strategy,
+                                           max_iterations=500)
+
+    def test_boltzmann_exploration(self):
+        self.assert_storages_agree(np.array([0.1, 0.1]), exploration_type=2,
+                                   n_actions=5, n_states=25)
+
+    def test_untouched_rows_stay_virtual(self):
+        params = make_params(q_storage='lazy', q_page_rows=2, n_actions=9, n_states=81)
+        init_worker(0, params.rng_seed, params)
+        init_session_rng(0)
+        q_matrices, _, _ = compute_session(0.15, np.array([0.01, 0.01]), 0.95, backend='python')
+        q0 = q_matrices[0]
+        touched = len(q0.pages)
+        self.assertLess(q0.n_materialized_rows, params.n_states)
+        for expected, actual in zip(row_statistics(np.asarray(q0)), row_statistics(q0)):
+            np.testing.assert_array_equal(expected, actual)
+        self.assertEqual(len(q0.pages), touched)
+
+    def test_row_sources_must_define_rows(self):
+        with self.assertRaises(TypeError):
+            QRowSource()
+
+    def test_numba_backend_rejected(self):
+        params = make_params(q_storage='lazy')
+        init_worker(0, params.rng_seed, params)
+        init_session_rng(0)
+        with self.assertRaises(ValueError):
+            compute_session(0.15, np.array([0.05, 0.05]), 0.95, backend='numba')
+
+
+class TestPrecisionPolicy(unittest.TestCase):
+    """float32 Q storage with double-precision updates, on every engine."""
+
+    def test_unknown_precision_rejected(self):
+        with self.assertRaises(ValueError):
+            q_dtype('half')
+
+    def test_engines_agree_in_mixed_precision(self):
+        """Scalar, batched and lazy engines round the same updates the same way."""
+        for exploration_type, exploration in ((1, np.array([0.05, 0.05])), (2, np.array([0.1, 0.1]))):
+            with self.subTest(exploration_type=exploration_type):
+                params = make_params(precision='mixed', exploration_type=exploration_type)
+                scalar_runs = run_scalar_sessions(params, 0.15, exploration, 0.95)
+                batch_runs, _ = compute_experiment_batch(params, 0.15, exploration, 0.95)
+                lazy_runs = run_scalar_sessions(make_params(precision='mixed', q_storage='lazy', q_page_rows=4,
+                                                            exploration_type=exploration_type),
+                                                0.15, exploration, 0.95)
+                for scalar, batch, lazy in zip(scalar_runs, batch_runs, lazy_runs):
+                    for agent in range(params.n_agents):
+                        self.assertEqual(scalar[0][agent].dtype, np.float32)
+                        np.testing.assert_array_equal(scalar[0][agent], batch[0][agent])
+                        np.testing.assert_array_equal(scalar[0][agent], np.asarray(lazy[0][agent]))
+                        np.testing.assert_array_equal(scalar[1][agent], batch[1][agent])
+                        np.testing.assert_array_equal(scalar[1][agent], lazy[1][agent])
+
+    def test_double_precision_is_its_own_reference(self):
+        report = validate_precision(make_params(), 0.15, np.array([0.05, 0.05]), 0.95, precision='double')
+        self.assertEqual(report.n_sessions, 3)
+        self.assertEqual(report.strategy_mismatches, 0)
+        self.assertEqual(report.convergence_mismatches, 0)
+        self.assertEqual(report.max_q_error, 0.0)
+
+    def test_mixed_precision_report(self):
+        report = validate_precision(make_params(), 0.15, np.array([0.05, 0.05]), 0.95)
+        self.assertEqual(report.precision, 'mixed')
+        self.assertGreater(report.max_q_error, 0.0)
+        self.assertLess(report.max_q_error, 1e-4)
+        self.assertGreaterEqual(report.state_mismatch_rate, 0.0)
+        self.assertLessEqual(report.state_mismatch_rate, 1.0)
+        self.assertIn("mixed", report.summary())
+
+
+class TestPolicyEvaluation(unittest.TestCase):
+    """Closed-form true Q must match simulating the strategy path."""
+
+    @staticmethod
+    def simulate_value(strategy, profits, next_state, delta, weights, state, n_periods=3000):
+        value = np.zeros(profits.shape[1])
+        discount = 1.0
+        for _ in range(n_periods):
+            profile = strategy[state] @ weights
+            value += discount * profits[profile]
+            discount *= delta
+            state = next_state[profile]
+        return value
+
+    def test_matches_path_simulation(self):
+        rng = np.random.default_rng(11)
+        n_agents, n_prices, delta = 2, 4, 0.95
+        n_profiles = n_prices ** n_agents
+        weights = n_prices ** np.arange(n_agents)
+        profits = rng.normal(size=(n_profiles, n_agents))
+        next_state = rng.permutation(n_profiles)
+        strategy = rng.integers(0, n_prices, size=(n_profiles, n_agents))
+
+        evaluation = evaluate_strategy(strategy, profits, next_state, delta, weights)
+
+        for state in range(n_profiles):
+            np.testing.assert_allclose(
+                evaluation.values[state],
+                self.simulate_value(strategy, profits, next_state, delta, weights, state)
+            )
+            for agent in range(n_agents):
+                for price in range(n_prices):
+                    deviation = strategy[state].copy()
+                    deviation[agent] = price
+                    profile = deviation @ weights
+                    continuation = self.simulate_value(
+                        strategy, profits, next_state, delta, weights, next_state[profile]
+                    )
+                    self.assertAlmostEqual(
+                        evaluation.q_true[state, price, agent],
+                        profits[profile, agent] + delta * continuation[agent]
+                    )
+
+    def test_shares_memoized_graph(self):
+        strategy = np.array([[1], [2], [1], [3]])
+        first = evaluate_strategy(strategy, np.ones((4, 1)), np.arange(4), 0.9, [1])
+        second = evaluate_strategy(strategy, np.zeros((4, 1)), np.arange(4), 0.5, [1])
+        self.assertIs(first.graph, second.graph)
+        np.testing.assert_allclose(first.values[:, 0], 10.0)
+
+
+class TestStrategyGraph(unittest.TestCase):
+    """Cycle/basin decomposition must match walking each state's path."""
+
+    def setUp(self):
+        clear_strategy_graph_cache()
+
+    def test_small_graph(self):
+        # 0 -> 1 -> 2 -> 1 and 3 -> 3
+        graph = build_strategy_graph(np.array([1, 2, 1, 3]))
+        np.testing.assert_array_equal(graph.on_cycle, [False, True, True, True])
+        np.testing.assert_array_equal(graph.cycle_index, [0, 0, 0, 1])
+        np.testing.assert_array_equal(graph.cycle_length, [2, 2, 2, 1])
+        np.testing.assert_array_equal(graph.tail_length, [1, 0, 0, 0])
+        self.assertEqual([c.tolist() for c in graph.cycles], [[1, 2], [3]])
+        self.assertEqual(graph.cycle_from(2).tolist(), [2, 1])
+        np.testing.assert_array_equal(graph.basin(0), [0, 1, 2])
+
+    def test_matches_path_walk(self):
+        rng = np.random.default_rng(5)
+        for n_states in (1, 2, 7, 64, 200):
+            successor = rng.integers(0, n_states, size=n_states)
+            graph = build_strategy_graph(successor)
+            for state in range(n_states):
+                visited = [state]
+                while successor[visited[-1]] not in visited:
+                    visited.append(successor[visited[-1]])
+                entry = visited.index(successor[visited[-1]])
+                self.assertEqual(graph.tail_length[state], entry)
+                self.assertEqual(graph.path(state).tolist(), visited[:entry])
+                self.assertEqual(graph.cycle_from(state).tolist(), visited[entry:])
+                self.assertEqual(graph.advance(np.array([state]), 1000)[0],
+                                 visited[entry + (1000 - entry) % (len(visited) - entry)])
+
+    def test_memoized_by_strategy(self):
+        strategy = np.array([[0, 1], [1, 1], [0, 0], [1, 0]])
+        weights = np.array([2, 1])
+        graph = get_strategy_graph(strategy, np.arange(4), weights)
+        self.assertIs(get_strategy_graph(strategy.copy(), np.arange(4), weights), graph)
+        other = strategy.copy()
+        other[0] = [1, 1]
+        self.assertIsNot(get_strategy_graph(other, np.arange(4), weights), graph)
+
+    def test_memo_is_bounded(self):
+        from src import strategy_graph
+
+        weights = np.array([2, 1])
+        strategies = [np.array([[a, b], [1, 1], [0, 0], [1, 0]]) for a in (0, 1) for b in (0, 1)]
+        saved = strategy_graph.MEMORY_CACHE_MAX_BYTES
+        try:
+            sizes = [build_strategy_graph(np.arange(4)[s @ weights]).nbytes for s in strategies]
+            # Room for the last two graphs only
+            strategy_graph.MEMORY_CACHE_MAX_BYTES = sizes[2] + sizes[3]
+            graphs = [get_strategy_graph(s, np.arange(4), weights) for s in strategies]
+            first = graphs[0]
+            self.assertEqual(len(strategy_graph._MEMORY_CACHE), 2)
+            # The most recently used graphs survive
+            self.assertIs(get_strategy_graph(strategies[3], np.arange(4), weights), graphs[3])
+            self.assertIsNot(get_strategy_graph(strategies[0], np.arange(4), weights), first)
+        finally:
+            strategy_graph.MEMORY_CACHE_MAX_BYTES = saved
+            clear_strategy_graph_cache()
+
+    def test_compute_cycle_length(self):
+        params = SimParams({'n_agents': 2, 'n_actions': 2, 'n_states': 4})
+        # Little-endian joint actions: state 0 -> 2 -> 1 -> 2
+        strategy = np.array([[0, 1], [0, 1], [1, 0], [0, 0]])
+        self.assertEqual(compute_cycle_length(strategy, 0, params), (2, [2, 1]))
+        self.assertEqual(compute_cycle_length(strategy, 3, params), (2, [2, 1]))
+
+
+def reference_impulse(strategy, weights, initial_state, agent, price, dev_length, pre_cycle):
+    """Step one impulse response and detect the cycle by scanning visited states."""
+    actions = strategy[initial_state].copy()
+    actions[agent] = price
+    visited = []
+    for period in range(len(strategy) + dev_length + 1):
+        state = actions @ weights
+        if state in pre_cycle:
+            return visited + [state], period + 1, period + 1
+        if state in visited:
+            return visited + [state], visited.index(state) + 1, 0
+        visited.append(state)
+        actions = strategy[state].copy()
+        if dev_length == PERMANENT_DEVIATION or period + 1 < dev_length:
+            actions[agent] = price
+    raise AssertionError("no cycle found")
+
+
+class TestImpulseEngine(unittest.TestCase):
+    """Batched impulse responses must match stepping each trajectory."""
+
+    def test_matches_single_trajectories(self):
+        rng = np.random.default_rng(2)
+        n_agents, n_prices = 2, 4
+        n_states = n_prices ** n_agents
+        weights = n_prices ** np.arange(n_agents)
+        strategies = rng.integers(0, n_prices, size=(4, n_states, n_agents))
+        profits = rng.normal(size=(n_states, n_agents))
+        pre_cycles = [get_strategy_graph(strategy, np.arange(n_states), weights).cycle_from(0)
+                      for strategy in strategies]
+
+        grid = impulse_grid(pre_cycles, range(n_agents), range(n_prices), [1, 3, PERMANENT_DEVIATION])
+        batch = simulate_impulse_batch(strategies, profits, np.arange(n_states), weights, *grid,
+                                       n_periods=6, chunk_size=5)
+
+        for j, (session, state, agent, price, length) in enumerate(zip(*grid)):
+            graph = get_strategy_graph(strategies[session], np.arange(n_states), weights)
+            visited, shock_length, punishment = reference_impulse(
+                strategies[session], weights, state, agent, price, length, list(pre_cycles[session])
+            )
+            self.assertEqual(batch.shock_length[j], shock_length)
+            self.assertEqual(batch.punishment_length[j], punishment)
+            self.assertEqual(batch.shock_end_state[j], visited[-1])
+            self.assertEqual(batch.post_length[j], graph.cycle_length[visited[-1]])
+            n_recorded = min(len(visited), 6)
+            np.testing.assert_array_equal(batch.states[j, :n_recorded], visited[:n_recorded])
+
+        np.testing.assert_array_equal(batch.profits, profits[batch.price_index @ weights])
+
+    def test_rejects_off_cycle_start(self):
+        strategy = np.array([[1], [2], [1], [3]])
+        with self.assertRaises(ValueError):
+            simulate_impulse_batch(strategy, np.zeros((4, 1)), np.arange(4), [1], 0, 0, 0, 3, 1, n_periods=3)
+
+    def test_ir_analysis_requires_one_period_memory(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+        from impulse_response import compute_ir_analysis
+        from globals import GlobalVars
+
+        # Two-period memory (4 prices, 2 agents) and no memory at all
+        for num_states in (4 ** 4, 1):
+            globals_ = GlobalVars()
+            globals_.num_actions, globals_.num_states = 16, num_states
+            with self.assertRaises(ValueError):
+                compute_ir_analysis(0, 0, 1, globals_)
+
+
+def make_run_results(n_runs, rng):
+    """Run dictionaries shaped like the output of ``q_learning.run_simulation``."""
+    results = []
+    for i in range(n_runs):
+        n_periods = 5 + i
+        results.append({
+            'price_converged': bool(i % 2),
+            'final_prices': rng.random(2),
+            'price_history': rng.random((n_periods, 2)),
+            'nash_distance': float(rng.random()),
+            'convergence_time': None if i == 1 else 100 * i,
+            'n_episodes': 1000 + i,
+            'label': {'run': i}
+        })
+    return results
+
+
+class TestRunLogs(unittest.TestCase):
+    """Columnar run-log store."""
+
+    def test_round_trip(self):
+        results = make_run_results(4, np.random.default_rng(0))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_run_log(results, os.path.join(tmp, 'logs', 'runs.npz'))
+            self.assertEqual(find_run_log(tmp), path)
+            with RunLog(path) as log:
+                self.assertEqual(log.columns, list(results[0]))
+                self.assertEqual(log.kind('final_prices'), 'array')
+                self.assertEqual(log.kind('price_history'), 'history')
+                loaded = log.runs()
+
+        for original, restored in zip(results, loaded):
+            self.assertEqual(set(original), set(restored))
+            for key, value in original.items():
+                if isinstance(value, np.ndarray):
+                    np.testing.assert_array_equal(restored[key], value)
+                else:
+                    self.assertEqual(restored[key], value)
+                    self.assertIs(type(restored[key]), type(value))
+
+    def test_store_has_default_permissions(self):
+        umask = os.umask(0o022)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = write_run_log(make_run_results(2, np.random.default_rng(0)), os.path.join(tmp, 'runs.npz'))
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+                self.assertEqual(os.listdir(tmp), ['runs.npz'])
+        finally:
+            os.umask(umask)
+
+    def test_column_access(self):
+        results = make_run_results(3, np.random.default_rng(1))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_run_log(results, os.path.join(tmp, 'runs.npz'))
+            with RunLog(path) as log:
+                table = log.scalars(['nash_distance', 'convergence_time'])
+                self.assertEqual(list(table.columns), ['nash_distance', 'convergence_time'])
+                self.assertTrue(np.isnan(table['convergence_time'][1]))
+                self.assertEqual(log.column('final_prices').shape, (3, 2))
+                np.testing.assert_array_equal(log.history('price_history', 2), results[2]['price_history'])
+                subset = log.runs(['n_episodes'])
+                self.assertEqual(subset[2], {'n_episodes': 1002})
+                with self.assertRaises(KeyError):
+                    log.column('missing')
+
+    def test_convert_json_logs(self):
+        results = make_run_results(3, np.random.default_rng(2))
+        with tempfile.TemporaryDirectory() as tmp:
+            logs_dir = os.path.join(tmp, 'logs')
+            os.makedirs(logs_dir)
+            for i, result in enumerate(results):
+                serializable = {key: value.tolist() if isinstance(value, np.ndarray) else value
+                                for key, value in result.items()}
+                with open(os.path.join(logs_dir, f'run_{i:04d}.json'), 'w') as f:
+                    json.dump(serializable, f)
+
+            path = convert_json_logs(tmp, remove=True)
+            self.assertEqual(path, find_run_log(tmp))
+            self.assertFalse(any(name.endswith('.json') for name in os.listdir(logs_dir)))
+            with RunLog(path) as log:
+                np.testing.assert_allclose(log.history('price_history', 1), results[1]['price_history'])
+                self.assertEqual(log.runs(['convergence_time'])[1]['convergence_time'], None)
+
+
+class TestResultCache(unittest.TestCase):
+    """Content-addressed run-log cache with LRU eviction."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, "cache"), max_bytes=10 ** 9)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_entry(self, key, n_bytes):
+        path = os.path.join(self.tmp.name, key)
+        with open(path, "wb") as f:
+            f.write(b"x" * n_bytes)
+        return self.cache.put(key, path)
+
+    def test_key(self):
+        params = make_params().to_dict()
+        key = cache_key(params, 7, 10)
+        self.assertEqual(key, cache_key(dict(reversed(list(params.items()))), 7, 10))
+        self.assertEqual(key, cache_key(dict(params, result_cache_dir="/tmp", game_table_cache_dir="/tmp"), 7, 10))
+        self.assertNotEqual(key, cache_key(params, 8, 10))
+        self.assertNotEqual(key, cache_key(params, 7, 11))
+        self.assertNotEqual(key, cache_key(dict(params, alpha=0.2), 7, 10))
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get("ab" * 32))
+        path = self.write_entry("ab" * 32, 100)
+        self.assertEqual(self.cache.get("ab" * 32), path)
+        target = os.path.join(self.tmp.name, "restored.npz")
+        self.assertTrue(self.cache.restore("ab" * 32, target))
+        self.assertEqual(os.path.getsize(target), 100)
+        stats = self.cache.stats()
+        self.assertEqual((stats.n_entries, stats.total_bytes), (1, 100))
+
+    def test_entries_of_other_users(self):
+        umask = os.umask(0o022)
+        try:
+            path = self.write_entry("cd" * 32, 10)
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        self.assertEqual(os.listdir(path.parent), [path.name])
+
+        target = os.path.join(self.tmp.name, "restored.npz")
+        # An entry that cannot be touched is still used, one that cannot be read is a miss
+        with mock.patch("os.utime", side_effect=PermissionError):
+            self.assertEqual(self.cache.get("cd" * 32), path)
+            self.assertTrue(self.cache.restore("cd" * 32, target))
+        with mock.patch("shutil.copyfile", side_effect=PermissionError):
+            self.assertFalse(self.cache.restore("cd" * 32, target))
+
+    def test_lru_eviction(self):
+        keys = [c * 64 for c in "abcd"]
+        for i, key in enumerate(keys[:3]):
+            path = self.write_entry(key, 100)
+            os.utime(path, (1000 + i, 1000 + i))
+        # Reading the oldest entry makes it the most recently used
+        self.cache.get(keys[0])
+        self.cache.max_bytes = 300
+        self.write_entry(keys[3], 100)
+        self.assertIsNone(self.cache.get(keys[1]))
+        for key in (keys[0], keys[2], keys[3]):
+            self.assertIsNotNone(self.cache.get(key))
+        self.assertEqual(self.cache.prune(0), (3, 300))
+        self.assertEqual(self.cache.stats().n_entries, 0)
+
+
+class TestSequentialStopping(unittest.TestCase):
+    """Running confidence intervals and the wave-by-wave stopping rule."""
+
+    def test_running_stats(self):
+        from scipy import stats
+
+        values = np.random.default_rng(0).normal(3.0, 2.0, 50)
+        running = RunningStats()
+        self.assertEqual(running.half_width(), float('inf'))
+        for value in values:
+            running.push(value)
+        self.assertAlmostEqual(running.mean, values.mean())
+        self.assertAlmostEqual(running.variance, values.var(ddof=1))
+        low, high = stats.t.interval(0.95, len(values) - 1, loc=values.mean(), scale=stats.sem(values))
+        self.assertAlmostEqual(running.half_width(0.95), (high - low) / 2)
+
+    def test_stops_once_targets_are_met(self):
+        stopper = SequentialStopper({'convergence_rate': 0.1}, max_runs=100, wave_size=10, min_runs=20)
+        rng = np.random.default_rng(1)
+        while stopper.n_runs < stopper.max_runs:
+            for _ in range(stopper.wave_size):
+                stopper.update({'convergence_rate': float(rng.random() < 0.9)})
+            if stopper.end_wave():
+                break
+        report = stopper.report()
+        self.assertEqual(report['stop_reason'], 'precision')
+        self.assertLess(report['n_runs'], 100)
+        self.assertGreaterEqual(report['n_runs'], 20)
+        self.assertLessEqual(report['estimates']['convergence_rate']['half_width'], 0.1)
+        # Earlier waves were not yet precise enough
+        self.assertGreater(report['waves'][-2]['half_widths']['convergence_rate'], 0.1)
+
+    def test_unanimous_runs_do_not_stop_at_once(self):
+        from scipy import stats
+
+        # Wilson interval of 0 successes in 10 trials is [0, 0.2775]
+        self.assertAlmostEqual(wilson_half_width(0.0, 10), 0.2775 / 2, places=3)
+        self.assertEqual(wilson_half_width(0.0, 0), float('inf'))
+
+        # Every run converging leaves the rate uncertain until enough runs agree
+        stopper = SequentialStopper({'convergence_rate': 0.05}, max_runs=100, wave_size=5, min_runs=10)
+        while stopper.n_runs < stopper.max_runs:
+            for _ in range(stopper.wave_size):
+                stopper.update({'convergence_rate': 1.0})
+            if stopper.end_wave():
+                break
+        self.assertEqual(stopper.n_runs, 35)
+        self.assertGreater(stopper.waves[-2]['half_widths']['convergence_rate'], 0.05)
+
+        # Identical profit gains are floored at the default standard deviation
+        stopper = SequentialStopper({'profit_gain': 0.5}, max_runs=100, wave_size=5, min_runs=10)
+        for _ in range(10):
+            stopper.update({'profit_gain': 5.0})
+        self.assertFalse(stopper.end_wave())
+        self.assertAlmostEqual(stopper.half_width('profit_gain'),
+                               stats.t.ppf(0.975, 9) * DEFAULT_SD_FLOOR['profit_gain'] / np.sqrt(10))
+        stopper = SequentialStopper({'profit_gain': 0.5}, max_runs=100, sd_floor={'profit_gain': 0.0})
+        for _ in range(30):
+            stopper.update({'profit_gain': 5.0})
+        self.assertTrue(stopper.end_wave())
+
+    def test_config_and_run_metrics(self):
+        self.assertIsNone(SequentialStopper.from_config({}, 10))
+        stopper = SequentialStopper.from_config(
+            {'sequential_targets': {'profit_gain': 2}, 'sequential_wave_size': 4}, 40)
+        self.assertEqual((stopper.wave_size, stopper.max_runs, stopper.targets), (4, 40, {'profit_gain': 2.0}))
+        with self.assertRaises(ValueError):
+            SequentialStopper({'nash_gap': 0.1}, 10)
+        with self.assertRaises(ValueError):
+            SequentialStopper({'profit_gain': 0.0}, 10)
+
+        params = make_params()
+        metrics = run_metrics({'overall_converged': True, 'final_profits': np.array([0.3, 0.3])}, params)
+        self.assertEqual(metrics['convergence_rate'], 1.0)
+        self.assertAlmostEqual(metrics['mean_profit'], 0.3)
+        self.assertIn('profit_gain', metrics)
+        self.assertEqual(run_metrics({'overall_converged': False}, params), {'convergence_rate': 0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,14 +18,14 @@ sys.path.insert(0, src_path)
 # Import using the module names without src prefix after adding to path
 from rng.Lecuyer import (
     get_rng, get_lecuyer_raw, LecuyerCombined,
-    set_global_rng, get_global_rng
+    set_global_rng, get_global_rng, get_lecuyer_substream, LecuyerStreams
 )
 from init.QInit import (
     init_Q, init_all_agents_Q, validate_Q_matrix,
     STRATEGY_TYPES
 )
 from convergence import (
-    has_converged, compute_nash_distance, compute_cooperative_distance,
+    has_converged, has_strategy_converged, ConvergenceDetector, compute_nash_distance, compute_cooperative_distance,
     analyze_convergence
 )
 from params import SimParams
@@ -81,6 +81,56 @@ class TestLecuyerRNG(unittest.TestCase):
             self.assertGreaterEqual(val, 0.0)
             self.assertLess(val, 1.0)
     
+    def test_ran2_block_matches_scalar_stream(self):
+        """ran2_block reproduces successive ran2() calls, across block boundaries."""
+        rng_scalar = get_lecuyer_raw(12345)
+        rng_block = get_lecuyer_raw(12345)
+        
+        for n in (1, 7, 0, 500, 33, 2000):
+            expected = [rng_scalar.ran2() for _ in range(n)]
+            np.testing.assert_array_equal(rng_block.ran2_block(n), expected)
+        
+        # Generator state is left where the scalar stream is
+        self.assertEqual(rng_block.ran2(), rng_scalar.ran2())
+        np.testing.assert_array_equal(rng_block.iv, rng_scalar.iv)
+    
+    def test_stream_blocks_match_scalar_streams(self):
+        """LecuyerStreams.ran2_block gives each selected stream its next n draws, in order."""
+        generators = [get_lecuyer_substream(12345, session=session) for session in range(4)]
+        streams = LecuyerStreams([get_lecuyer_substream(12345, session=session) for session in range(4)])
+        subset = np.array([0, 2, 3])
+        for n in (5, 0, 40):
+            block = streams.ran2_block(n, subset)
+            self.assertEqual(block.shape, (3, n))
+            for row, session in zip(block, subset):
+                np.testing.assert_array_equal(row, generators[session].ran2_block(n))
+        # Streams left out did not advance; the others continue where the block ended
+        np.testing.assert_array_equal(streams.ran2(), [g.ran2() for g in generators])
+    
+    def test_raw_lecuyer_seeds_differ(self):
+        """Different seeds start different ran2() streams."""
+        self.assertNotEqual(get_lecuyer_raw(12345).ran2(), get_lecuyer_raw(12346).ran2())
+    
+    def test_jump_ahead_matches_stepping(self):
+        """jump_ahead(n) lands where n ran2() calls leave both components."""
+        rng_jump = get_lecuyer_raw(12345)
+        rng_step = get_lecuyer_raw(12345)
+        rng_jump.jump_ahead(1000)
+        for _ in range(1000):
+            rng_step.ran2()
+        rng_step._fill_shuffle_table()
+        np.testing.assert_array_equal(rng_jump.ran2_block(100), rng_step.ran2_block(100))
+    
+    def test_substreams_are_keyed_by_session(self):
+        """Substreams depend on (experiment, session) only."""
+        first = get_lecuyer_substream(12345, experiment=1, session=3).ran2_block(50)
+        again = get_lecuyer_substream(12345, experiment=1, session=3).ran2_block(50)
+        other = get_lecuyer_substream(12345, experiment=1, session=4).ran2_block(50)
+        np.testing.assert_array_equal(first, again)
+        self.assertFalse(np.array_equal(first, other))
+        with self.assertRaises(ValueError):
+            get_lecuyer_substream(12345, session=-1)
+    
     def test_thread_safety(self):
         """Test thread-local RNG functionality."""
         # Set global RNG
@@ -198,6 +248,19 @@ class TestQInitialization(unittest.TestCase):
         for Q in Q_matrices:
             validate_Q_matrix(Q, self.params)
     
+    def test_stacked_initialization_matches_list(self):
+        """The stacked fast path draws exactly what the per-agent path draws."""
+        for strategies in (['R', 'R'], ['G', 'O'], ['O', 'F']):
+            with self.subTest(strategies=strategies):
+                rng_list = get_lecuyer_raw(12345)
+                rng_stack = get_lecuyer_raw(12345)
+                Q_list = init_all_agents_Q(strategies, self.params, rng_list)
+                Q_stack = init_all_agents_Q(strategies, self.params, rng_stack, stacked=True)
+                
+                self.assertEqual(Q_stack.shape, (2, self.params.n_states, self.params.n_actions))
+                np.testing.assert_array_equal(Q_stack, np.stack(Q_list))
+                self.assertEqual(rng_list.ran2(), rng_stack.ran2())
+    
     def test_validation(self):
         """Test Q matrix validation."""
         # Valid matrix
@@ -228,6 +291,33 @@ class TestConvergence(unittest.TestCase):
         """Set up test parameters."""
         self.params = SimParams(n_agents=2, n_prices=11)
     
+    def test_streaming_detector_matches_batch_check(self):
+        """ConvergenceDetector agrees with has_converged after every measurement."""
+        rng = np.random.default_rng(0)
+        # Noisy start, a stable stretch too short to converge, then a stable tail
+        noise = rng.integers(0, 3, size=(300, 2)) / 10
+        price_hist = np.vstack([noise, np.full((30, 2), 0.5), noise[:20], np.full((80, 2), 0.3)])
+        window, tol = 50, 1e-4
+        
+        detector = ConvergenceDetector(2, window, tol)
+        first = None
+        for t, prices in enumerate(price_hist):
+            streaming = detector.update(prices, iteration=10 * t)
+            self.assertEqual(streaming, bool(has_converged(price_hist[:t + 1], window, tol)))
+            if streaming and first is None:
+                first = 10 * t
+        self.assertIsNotNone(first)
+        self.assertEqual(detector.convergence_iteration, first)
+    
+    def test_streaming_strategy_criterion(self):
+        """strategy_converged agrees with has_strategy_converged."""
+        strategies = [np.array([0, 1])] * 3 + [np.array([1, 1])] * 4
+        detector = ConvergenceDetector(1, window=3)
+        for t, strategy in enumerate(strategies):
+            changed = t > 0 and not np.array_equal(strategy, strategies[t - 1])
+            detector.update(np.zeros(1), strategy_changed=changed)
+            self.assertEqual(detector.strategy_converged, has_strategy_converged(strategies[:t + 1], 3))
+    
     def test_convergence_flag(self):
         """Test convergence detection with artificial data."""
         # Create convergent price history
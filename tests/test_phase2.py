@@ -261,6 +261,92 @@ class TestStateFrequency(unittest.TestCase):
         # Should detect very few or no cycles in random data
         total_cycles = sum(cycles.values())
         self.assertLessEqual(total_cycles, 5)  # Allow some spurious detection
+    
+    def test_detect_cycles_matches_window_comparison(self):
+        """Test lag-equality cycle counts against comparing every pair of windows."""
+        rng = np.random.default_rng(5)
+        price_hist = np.array([0.2, 0.5])[rng.integers(0, 2, size=(60, 2))]
+        
+        expected = {}
+        for period in range(1, 5):
+            expected[period] = sum(
+                np.allclose(price_hist[s:s + period], price_hist[s + period:s + 2 * period], atol=1e-4)
+                for s in range(len(price_hist) - 2 * period + 1)
+            )
+        expected = {period: count for period, count in expected.items() if count >= 2}
+        
+        self.assertEqual(detect_cycles(price_hist, max_period=4), expected)
+    
+    def test_cycle_detector_streaming(self):
+        """Test that streaming updates of state codes give the batch counts."""
+        from analysis.state_frequency import CycleDetector
+        
+        states = np.tile([3, 1, 4, 1, 5], 20)
+        states[37] = 9
+        
+        detector = CycleDetector(max_period=6)
+        for lo in range(0, len(states), 3):
+            detector.update(states[lo:lo + 3])
+        
+        self.assertEqual(detector.n_periods, len(states))
+        self.assertEqual(detector.counts(), detect_cycles(states, max_period=6))
+        self.assertIn(5, detector.counts())
+    
+    def test_vectorized_state_encoding(self):
+        """Test grid snapping and state encoding against the per-price argmin."""
+        from analysis.state_frequency import encode_states, price_grid_indices, compute_state_transition_matrix
+        
+        price_grid = np.linspace(1.4, 2.0, 7)
+        rng = np.random.default_rng(4)
+        price_hist = rng.uniform(1.3, 2.1, size=(40, 3))
+        
+        expected = np.array([[np.argmin(np.abs(price_grid - p)) for p in row] for row in price_hist])
+        np.testing.assert_array_equal(price_grid_indices(price_hist, price_grid), expected)
+        np.testing.assert_array_equal(encode_states(price_hist, price_grid), expected @ (7 ** np.arange(3)))
+        
+        # Three agents: the transition matrix stays sparse with one entry per distinct transition
+        states = encode_states(price_hist, price_grid)
+        transitions = compute_state_transition_matrix(price_hist, price_grid)
+        self.assertEqual(transitions.shape, (7 ** 3, 7 ** 3))
+        self.assertEqual(transitions.nnz, len(set(zip(states[:-1], states[1:]))))
+        np.testing.assert_allclose(transitions.sum(axis=1).A.ravel()[np.unique(states[:-1])], 1.0)
+    
+    def test_memmapped_history_in_chunks(self):
+        """Test that memory-mapped histories give the same results when read in chunks."""
+        from unittest import mock
+        import run_logs
+        from analysis.state_frequency import compute_state_transition_matrix, analyze_state_persistence
+        from analysis.learning_trajectory import compute_incentive_compatibility
+        
+        price_grid = np.array([0.0, 0.5, 1.0])
+        rng = np.random.default_rng(3)
+        price_hist = price_grid[rng.integers(0, 3, size=(50, 2))]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = run_logs.write_run_log([{'price_history': price_hist}], os.path.join(tmp, 'runs.npz'))
+            with run_logs.RunLog(path) as log:
+                mapped = log.history('price_history', 0, mmap=True)
+                self.assertIsInstance(mapped, np.memmap)
+                
+                expected = (
+                    count_state_freq(price_hist, price_grid, normalize=False),
+                    compute_state_transition_matrix(price_hist, price_grid).toarray(),
+                    analyze_state_persistence(price_hist, price_grid)['state_persistence'],
+                    compute_incentive_compatibility(price_hist, np.array([0.5, 0.5]))
+                )
+                with mock.patch.object(run_logs, 'HISTORY_CHUNK_ROWS', 7):
+                    chunked = (
+                        count_state_freq(mapped, price_grid, normalize=False),
+                        compute_state_transition_matrix(mapped, price_grid).toarray(),
+                        analyze_state_persistence(mapped, price_grid)['state_persistence'],
+                        compute_incentive_compatibility(mapped, np.array([0.5, 0.5]))
+                    )
+                del mapped
+        
+        np.testing.assert_array_equal(chunked[0], expected[0])
+        np.testing.assert_allclose(chunked[1], expected[1])
+        self.assertEqual(chunked[2], expected[2])
+        np.testing.assert_allclose(chunked[3], expected[3])
 
 
 class TestBestResponse(unittest.TestCase):
@@ -368,32 +454,65 @@ class TestImpulseResponse(unittest.TestCase):
         shock_price = 0.8
         shock_agent = 0
         steps = 50
+        q_matrices = np.random.default_rng(0).random((2, 121, 11))
         
-        # This is a simplified test since full implementation is TODO Phase-3
-        try:
-            result_df = simulate_impulse(self.params, shock_price, shock_agent, 
-                                       shock_duration=1, steps=steps)
-            
-            # Check basic DataFrame structure
-            self.assertIsInstance(result_df, pd.DataFrame)
-            self.assertIn('time', result_df.columns)
-            self.assertIn('shock_active', result_df.columns)
-            self.assertIn('nash_gap', result_df.columns)
-            self.assertIn('coop_gap', result_df.columns)
-            
-            # Check that we have the right number of time steps
-            self.assertEqual(len(result_df), steps)
-            
-            # Check that shock is only active for first step
-            shock_steps = result_df['shock_active'].sum()
-            self.assertEqual(shock_steps, 1)
-            
-        except Exception as e:
-            # If Phase-3 TODO not implemented, just pass
-            if "Phase-3" in str(e) or "TODO" in str(e):
-                self.skipTest("Phase-3 impulse response not fully implemented yet")
-            else:
-                raise e
+        result_df = simulate_impulse(self.params, shock_price, shock_agent,
+                                     shock_duration=1, steps=steps, q_matrices=q_matrices)
+        
+        # Check basic DataFrame structure
+        self.assertIsInstance(result_df, pd.DataFrame)
+        self.assertIn('time', result_df.columns)
+        self.assertIn('shock_active', result_df.columns)
+        self.assertIn('nash_gap', result_df.columns)
+        self.assertIn('coop_gap', result_df.columns)
+        
+        # Check that we have the right number of time steps
+        self.assertEqual(len(result_df), steps)
+        
+        # Check that shock is only active for first step
+        shock_steps = result_df['shock_active'].sum()
+        self.assertEqual(shock_steps, 1)
+        self.assertAlmostEqual(result_df['agent_0_price'].iloc[0], 0.8)
+        
+        # After the shock both agents follow the greedy strategy
+        strategy = np.argmax(q_matrices, axis=-1).T
+        grid = np.linspace(0, 1, 11)
+        states = result_df['state'].to_numpy()
+        for t in range(1, steps):
+            expected = grid[strategy[states[t - 1]]]
+            actual = result_df[['agent_0_price', 'agent_1_price']].iloc[t].to_numpy()
+            np.testing.assert_allclose(actual, expected)
+    
+    def test_simulate_impulse_many_shocks(self):
+        """Several shocks are simulated in one call and stacked row-wise."""
+        strategy = np.zeros((121, 2), dtype=int)
+        result_df = simulate_impulse(self.params, [0.2, 0.9], [0, 1], shock_duration=[1, 3],
+                                     steps=10, strategy=strategy)
+        
+        self.assertEqual(len(result_df), 20)
+        self.assertEqual(result_df.groupby('shock')['shock_active'].sum().tolist(), [1, 3])
+        self.assertEqual(result_df['shock_agent'].tolist(), [0] * 10 + [1] * 10)
+    
+    def test_simulate_impulse_requires_strategy(self):
+        with self.assertRaises(ValueError):
+            simulate_impulse(self.params, 0.8, 0)
+    
+    def test_simulate_impulse_with_only_src_on_path(self):
+        """The CLI and sweep workers put only src/ on sys.path."""
+        import subprocess
+        src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+        code = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "import numpy as np\n"
+            "from params import SimParams\n"
+            "from analysis.impulse_response import simulate_impulse\n"
+            "params = SimParams({'n_agents': 2, 'n_actions': 11, 'n_states': 121, 'demand_model': 'logit'})\n"
+            "df = simulate_impulse(params, 0.8, 0, steps=5, strategy=np.zeros((121, 2), dtype=int))\n"
+            "assert len(df) == 5\n" % src_dir
+        )
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
 
 
 class TestIntegration(unittest.TestCase):
@@ -189,5 +189,244 @@ class TestSweepAggregate(unittest.TestCase):
             print(f"Warning: Sweep result aggregation test failed: {e}")
 
 
+class TestSweepExecutor(unittest.TestCase):
+    """Warm worker pool: in-memory records, timeouts and failures."""
+    
+    def setUp(self):
+        import sys
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+        self.test_dir = tempfile.mkdtemp()
+        with open(os.path.join(os.path.dirname(__file__), "ci_small.json")) as f:
+            self.base_config = json.load(f)
+        # Keep the result cache of these runs out of the user's cache
+        self.saved_cache_dir = os.environ.get("CALVANO_CACHE_DIR")
+        os.environ["CALVANO_CACHE_DIR"] = os.path.join(self.test_dir, "cache")
+    
+    def tearDown(self):
+        if self.saved_cache_dir is None:
+            os.environ.pop("CALVANO_CACHE_DIR", None)
+        else:
+            os.environ["CALVANO_CACHE_DIR"] = self.saved_cache_dir
+        shutil.rmtree(self.test_dir)
+    
+    def config(self, **overrides):
+        config = dict(self.base_config, n_runs=1)
+        config.update(overrides)
+        return config
+    
+    def test_pool_records_timeouts_and_failures(self):
+        from experiments.sweep import SweepWorkerPool
+        
+        tasks = [
+            (self.config(), self.test_dir, "0000"),
+            (self.config(n_runs="many"), self.test_dir, "0001"),
+            (self.config(max_episodes=10 ** 8), self.test_dir, "0002"),
+            (self.config(alpha=0.2), self.test_dir, "0003"),
+        ]
+        with SweepWorkerPool(n_workers=2, timeout=5) as pool:
+            records = {r['run_id']: r for r in pool.imap_unordered(tasks)}
+            # The pool stays usable after replacing the timed-out worker
+            again = list(pool.imap_unordered([(self.config(), self.test_dir, "0004")]))
+        
+        self.assertEqual(records["0000"]['status'], "success")
+        self.assertEqual(records["0000"]['simulation_results']['n_runs'], 1)
+        self.assertTrue(os.path.exists(os.path.join(records["0000"]['output_dir'], "logs", "runs.npz")))
+        self.assertEqual(records["0001"]['status'], "failed")
+        self.assertIn("TypeError", records["0001"]['error_msg'])
+        self.assertEqual(records["0002"]['status'], "timeout")
+        self.assertEqual(records["0003"]['status'], "success")
+        self.assertEqual(records["0003"]['config']['alpha'], 0.2)
+        self.assertEqual([r['status'] for r in again], ["success"])
+    
+    def test_pool_and_subprocess_sweeps_agree(self):
+        from experiments.sweep import run_parameter_sweep
+        
+        grid_path = os.path.join(self.test_dir, "grid.json")
+        with open(grid_path, "w") as f:
+            json.dump({"alpha": [0.1, 0.2], "n_runs": [1]}, f)
+        config_path = os.path.join(self.test_dir, "base.json")
+        with open(config_path, "w") as f:
+            json.dump(dict(self.base_config, result_cache_dir=None), f)
+        
+        summaries = {}
+        for executor in ("pool", "subprocess"):
+            output_dir = os.path.join(self.test_dir, executor)
+            summaries[executor] = run_parameter_sweep(grid_path, config_path, output_dir,
+                                                      n_jobs=2, timeout=60, executor=executor)
+        for executor, summary in summaries.items():
+            self.assertEqual(summary['successful_runs'], 2, executor)
+            self.assertEqual([r['run_id'] for r in summary['results']], ["0000", "0001"])
+            self.assertEqual([r['simulation_results']['n_runs'] for r in summary['results']], [1, 1])
+        
+        with self.assertRaises(ValueError):
+            run_parameter_sweep(grid_path, config_path, self.test_dir, executor="threads")
+
+    
+    def test_resume_skips_journaled_points(self):
+        from experiments.sweep import (SWEEP_JOURNAL_FILE, config_hash, load_sweep_journal,
+                                       run_parameter_sweep)
+        from experiments.aggregate_sweep import load_sweep_results
+        
+        self.assertEqual(config_hash({"a": 1, "b": [0.1, 2]}), config_hash({"b": [0.1, 2], "a": 1}))
+        self.assertNotEqual(config_hash({"a": 1}), config_hash({"a": 2}))
+        
+        grid_path = os.path.join(self.test_dir, "grid.json")
+        with open(grid_path, "w") as f:
+            json.dump({"alpha": [0.1, 0.15, 0.2], "n_runs": [1]}, f)
+        config_path = os.path.join(self.test_dir, "base.json")
+        with open(config_path, "w") as f:
+            json.dump(self.base_config, f)
+        output_dir = os.path.join(self.test_dir, "runs")
+        first = run_parameter_sweep(grid_path, config_path, output_dir, n_jobs=1, timeout=60)
+        sweep_dir = first['output_directory']
+        
+        # Simulate a crash while the last point was being journaled
+        os.remove(os.path.join(sweep_dir, "sweep_summary.json"))
+        journal_path = os.path.join(sweep_dir, SWEEP_JOURNAL_FILE)
+        with open(journal_path) as f:
+            lines = f.readlines()
+        with open(journal_path, "w") as f:
+            f.writelines(lines[:2])
+            f.write(lines[2][:40])
+        
+        partial = load_sweep_results(sweep_dir)['sweep_summary']
+        self.assertTrue(partial['partial'])
+        self.assertEqual([r['run_id'] for r in partial['results']], ["0000", "0001"])
+        
+        resumed = run_parameter_sweep(grid_path, config_path, output_dir, n_jobs=1, timeout=60,
+                                      resume="latest")
+        self.assertEqual(resumed['output_directory'], sweep_dir)
+        self.assertEqual(resumed['resumed_runs'], 2)
+        self.assertEqual(resumed['successful_runs'], 3)
+        self.assertEqual([r['run_id'] for r in resumed['results']], ["0000", "0001", "0002"])
+        self.assertEqual(len(load_sweep_journal(sweep_dir)), 3)
+        self.assertFalse(load_sweep_results(sweep_dir)['sweep_summary'].get('partial', False))
+
+    
+    def test_result_cache_skips_simulation(self):
+        import numpy as np
+        import main
+        from experiments.sweep import run_parameter_sweep
+        from result_cache import ResultCache
+        
+        config = self.config(n_runs=2)
+        first = main.run_simulation_mode(dict(config), os.path.join(self.test_dir, "first"))
+        self.assertEqual(ResultCache().stats().n_entries, 1)
+        second = main.run_simulation_mode(dict(config), os.path.join(self.test_dir, "second"))
+        self.assertEqual(len(second), 2)
+        np.testing.assert_array_equal(first[1]['price_history'], second[1]['price_history'])
+        self.assertEqual(first[0]['convergence_time'], second[0]['convergence_time'])
+        with open(os.path.join(self.test_dir, "second", "logs", "summary.json")) as f:
+            self.assertEqual(json.load(f)['n_runs'], 2)
+        
+        # A different seed or a disabled cache runs again
+        main.run_simulation_mode(dict(config, rng_seed=7), os.path.join(self.test_dir, "third"))
+        main.run_simulation_mode(dict(config, alpha=0.3, result_cache_dir=None), os.path.join(self.test_dir, "fourth"))
+        self.assertEqual(ResultCache().stats().n_entries, 2)
+        
+        # Sweeps restore cached points instead of running them
+        grid_path = os.path.join(self.test_dir, "grid.json")
+        with open(grid_path, "w") as f:
+            json.dump({"alpha": [0.1, 0.2], "n_runs": [1]}, f)
+        config_path = os.path.join(self.test_dir, "base.json")
+        with open(config_path, "w") as f:
+            json.dump(self.base_config, f)
+        output_dir = os.path.join(self.test_dir, "runs")
+        cold = run_parameter_sweep(grid_path, config_path, output_dir, n_jobs=1, timeout=60)
+        warm = run_parameter_sweep(grid_path, config_path, os.path.join(self.test_dir, "again"),
+                                   n_jobs=1, timeout=60)
+        self.assertEqual(cold['cached_runs'], 0)
+        self.assertEqual(warm['cached_runs'], 2)
+        self.assertEqual(warm['successful_runs'], 2)
+        for record in warm['results']:
+            self.assertTrue(os.path.exists(os.path.join(record['output_dir'], "logs", "runs.npz")))
+    
+    def test_sequential_runs_stop_early(self):
+        import main
+        
+        # Each replicate is seeded on its own, so the runs differ; no mock run
+        # converges, and the Wilson interval of a zero rate only narrows to
+        # 0.06 after 29 runs
+        config = self.config(n_runs=60, result_cache_dir=None,
+                             sequential_targets={"convergence_rate": 0.06, "profit_gain": 6.0},
+                             sequential_wave_size=4, sequential_min_runs=10)
+        output_dir = os.path.join(self.test_dir, "sequential")
+        runs = main.run_simulation_mode(config, output_dir)
+        self.assertEqual(len({tuple(run['final_profits']) for run in runs}), len(runs))
+        with open(os.path.join(output_dir, "logs", "summary.json")) as f:
+            summary = json.load(f)
+        sequential = summary['sequential']
+        self.assertEqual(sequential['stop_reason'], "precision")
+        self.assertEqual(summary['n_runs'], len(runs))
+        self.assertEqual(len(runs), 32)
+        self.assertEqual([w['n_runs'] for w in sequential['waves']], list(range(4, 33, 4)))
+        self.assertGreater(sequential['estimates']['profit_gain']['half_width'], 0)
+        for metric, target in sequential['targets'].items():
+            self.assertLessEqual(sequential['estimates'][metric]['half_width'], target)
+        self.assertTrue(any(width > sequential['targets'][metric]
+                            for metric, width in sequential['waves'][-2]['half_widths'].items()))
+        
+        # Without reachable targets the runs go on to n_runs
+        runs = main.run_simulation_mode(dict(config, n_runs=6, sequential_min_runs=100),
+                                        os.path.join(self.test_dir, "capped"))
+        self.assertEqual(len(runs), 6)
+    
+    def test_adaptive_grid_refines_steepest_edges(self):
+        from experiments.adaptive_sweep import AdaptiveGrid
+        
+        grid = AdaptiveGrid([{"alpha": a, "n_runs": 5, "q_init_strategy": "R"} for a in (0.0, 0.5, 1.0)],
+                            min_spacing=0.1)
+        self.assertEqual(grid.refined_axes, ["alpha"])
+        self.assertEqual(len(grid.edges), 2)
+        # No metrics yet: nothing to refine
+        self.assertEqual(grid.propose(2), [])
+        
+        for point, value in zip(grid.points, (0.0, 0.1, 1.0)):
+            grid.record(point, value)
+        self.assertAlmostEqual(grid.max_score(), 0.9)
+        self.assertEqual(grid.propose(1), [(0.75, 5, "R")])
+        grid.record((0.75, 5, "R"), 0.2)
+        self.assertEqual(grid.propose(1), [(0.875, 5, "R")])
+        grid.record((0.875, 5, "R"), 0.9)
+        # Edges shorter than twice min_spacing are not split, flat edges are never split
+        self.assertEqual(grid.propose(5), [(0.25, 5, "R"), (0.625, 5, "R")])
+        
+        with self.assertRaises(ValueError):
+            AdaptiveGrid([])
+    
+    def test_adaptive_sweep_records_history(self):
+        from experiments.adaptive_sweep import run_adaptive_sweep
+        from experiments.aggregate_sweep import aggregate_parameter_sweep
+        
+        grid_path = os.path.join(self.test_dir, "grid.json")
+        with open(grid_path, "w") as f:
+            json.dump({"a_param": [1.0, 2.0], "lambda_param": [0.2, 0.8], "n_runs": [1]}, f)
+        config_path = os.path.join(self.test_dir, "base.json")
+        with open(config_path, "w") as f:
+            json.dump(self.base_config, f)
+        output_dir = os.path.join(self.test_dir, "runs")
+        
+        with self.assertRaises(ValueError):
+            run_adaptive_sweep(grid_path, config_path, output_dir, budget=3)
+        
+        summary = run_adaptive_sweep(grid_path, config_path, output_dir, metric="mean_profit",
+                                     budget=7, batch_size=2, n_jobs=1, timeout=60)
+        self.assertEqual(summary['successful_runs'], 7)
+        self.assertEqual(summary['adaptive']['stop_reason'], "budget")
+        self.assertEqual([r['n_points'] for r in summary['adaptive']['rounds']], [4, 2, 1])
+        self.assertEqual([r['refinement_round'] for r in summary['results']], [0, 0, 0, 0, 1, 1, 2])
+        for record in summary['results']:
+            self.assertIsNotNone(record['metrics']['mean_profit'])
+        # Profit grows with a_param, so the first round splits the a_param edges
+        self.assertEqual(sorted(r['config']['a_param'] for r in summary['results'][4:6]), [1.5, 1.5])
+        
+        sweep_dir = summary['output_directory']
+        outputs = aggregate_parameter_sweep(sweep_dir, sweep_dir)
+        history = pd.read_csv(outputs['refinement_history_csv'])
+        self.assertEqual(len(history), 7)
+        self.assertEqual(list(history.columns[:2]), ["run_id", "refinement_round"])
+        self.assertEqual(set(history.columns[2:4]), {"a_param", "lambda_param"})
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file